@@ -0,0 +1,76 @@
+"""
+Benchmark of loading a large custom dictionary of compound words.
+
+    python benchmarks/dictionary_load.py [--compounds N] [--references N] [--processes N] [--repeat N]
+
+Builds a synthetic dictionary of nouns from the master dictionary, N compounds of two of these nouns
+with ``Roots`` metadata, such as ``atkuyruğu [A:CompoundP3sg; Roots:at-kuyruk]``, and abbreviations
+referring to the nouns with ``Ref`` metadata. Compounds and references are late entries, resolved after
+all other lines. Prints the time of loading the dictionary and of resolving the late entries, with
+the lexicon fingerprint, which should not change between versions.
+"""
+import argparse
+import statistics
+import time
+
+from zeyrek.lexicon import RootLexicon, TextLexiconProcessor
+
+
+def base_nouns(count: int) -> list[str]:
+    """ Returns first `count` nouns of the master dictionary without metadata. """
+    nouns = []
+    with open(RootLexicon.RESOURCES_DIR / "tr" / "master-dictionary.dict", encoding='utf8') as f:
+        for line in f:
+            line = line.strip()
+            if line and ' ' not in line and not line.startswith('#') and not line.endswith(('mek', 'mak')):
+                nouns.append(line)
+                if len(nouns) == count:
+                    break
+    return nouns
+
+
+def synthetic_dictionary(compounds: int, references: int, nouns: int = 5000) -> list[str]:
+    words = base_nouns(nouns)
+    lines = list(words)
+    for i in range(compounds):
+        first, second = words[i % len(words)], words[(i * 7919 + i // len(words)) % len(words)]
+        lines.append(f"{first}{second}ı [A:CompoundP3sg; Roots:{first}-{second}]")
+    for i in range(references):
+        word = words[i % len(words)]
+        lines.append(f"{word[:2]}{i} [P:Noun,Abbrv; Pr:{word}; Ref:{word}]")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--compounds", type=int, default=100000, help="number of compound lines")
+    parser.add_argument("--references", type=int, default=10000, help="number of lines with references")
+    parser.add_argument("--processes", type=int, default=1, help="number of worker processes parsing lines")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions of the measurement")
+    args = parser.parse_args()
+
+    lines = synthetic_dictionary(args.compounds, args.references)
+    totals, late = [], []
+    for _ in range(args.repeat):
+        processor = TextLexiconProcessor()
+        resolve = processor._process_late_entries
+        resolve_times = []
+
+        def timed_resolve():
+            start = time.perf_counter()
+            resolve()
+            resolve_times.append(time.perf_counter() - start)
+
+        processor._process_late_entries = timed_resolve
+        start = time.perf_counter()
+        lexicon = processor.process_lines(lines, args.processes)
+        totals.append(time.perf_counter() - start)
+        late.append(resolve_times[0])
+    print(f"{len(lines)} lines, {len(lexicon.id_dict)} items, fingerprint {lexicon.fingerprint}")
+    print(f"load: {statistics.median(totals):.2f} s, late entries: {statistics.median(late):.2f} s")
+    if lexicon.diagnostics:
+        print(lexicon.diagnostics)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Searches for inputs that make the analyzer expand the most search paths.
+
+    python benchmarks/fuzz.py [--count N] [--seed S] [--top K] [--output FILE]
+
+Candidate inputs are generated in four ways:
+
+- random walks over the morphotactics graph starting from real stems,
+- real stems followed by long chains of repeated suffixes,
+- long strings without vowels,
+- strings mixing Turkish, other scripts, digits and punctuation.
+
+Each candidate is analyzed with an instrumented ``RuleBasedAnalyzer`` that counts expanded and created
+search paths. Inputs with the most expanded paths and the longest analysis times are reported, and can be
+written to a file to be used as a regression corpus for worst case latency.
+"""
+import argparse
+import logging
+import random
+import time
+from pathlib import Path
+
+from zeyrek.generator import RandomWordGenerator
+from zeyrek.morphology import MorphAnalyzer, _normalize
+from zeyrek.morphotactics import SearchPath
+from zeyrek.rulebasedanalyzer import RuleBasedAnalyzer
+
+REPEATED_SUFFIXES = [
+    "lar", "ler", "lık", "lik", "sız", "siz", "laş", "leş", "tır", "dır", "ım", "ın", "ki", "de", "da",
+    "ca", "ce", "cı", "ci", "la", "le", "ı", "i", "yor", "acak", "miş", "mış", "ken", "sa", "se",
+]
+CONSONANTS = "bcçdfgğhjklmnprsştvyz"
+MIXED_ALPHABET = "abcçdefgğhıijklmnoöprsştuüvyzâîûqwxабвгдежзαβγδε0123456789-.'’_"
+
+
+class InstrumentedAnalyzer(RuleBasedAnalyzer):
+    """ RuleBasedAnalyzer that counts search paths expanded and created by `advance`. """
+
+    def __init__(self, morphotactics):
+        super().__init__(morphotactics)
+        self.expanded = 0
+        self.created = 0
+
+    def advance(self, path: SearchPath, debug: bool = False):
+        new_paths = super().advance(path, debug)
+        self.expanded += 1
+        self.created += len(new_paths)
+        return new_paths
+
+
+def generate_candidates(analyzer: MorphAnalyzer, count: int, rng: random.Random) -> list[str]:
+    # lexicon order depends on string hashing, stems are sorted to repeat candidates for a seed.
+    stems = sorted(st.surface for st in analyzer.morphotactics.stem_transitions.all_transitions())
+    per_kind = max(1, count // 4)
+    walks = RandomWordGenerator(
+        analyzer.morphotactics, seed=rng.random(), max_derivations=4, max_suffixes=25, stop_probability=0.1
+    )
+    candidates = list(walks.generate(per_kind))
+    for _ in range(per_kind):
+        stem = rng.choice(stems)
+        suffixes = rng.choices(REPEATED_SUFFIXES, k=rng.randint(1, 4))
+        candidates.append(stem + "".join(suffixes) * rng.randint(2, 8))
+    for _ in range(per_kind):
+        candidates.append("".join(rng.choices(CONSONANTS, k=rng.randint(5, 40))))
+    for _ in range(count - len(candidates)):
+        candidates.append("".join(rng.choices(MIXED_ALPHABET, k=rng.randint(3, 30))))
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000, help="number of generated inputs")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--top", type=int, default=20, help="number of worst inputs to report")
+    parser.add_argument("--output", type=Path, help="write the worst inputs to this file, one per line")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    analyzer = MorphAnalyzer()
+    instrumented = InstrumentedAnalyzer(analyzer.morphotactics)
+    candidates = generate_candidates(analyzer, args.count, random.Random(args.seed))
+
+    measurements = []
+    for word in dict.fromkeys(candidates):
+        normalized = _normalize(word)
+        instrumented.expanded = instrumented.created = 0
+        start = time.perf_counter()
+        analyses = instrumented.analyze(normalized)
+        seconds = time.perf_counter() - start
+        measurements.append((instrumented.expanded, instrumented.created, seconds, len(analyses), word))
+
+    by_expanded = sorted(measurements, reverse=True)[:args.top]
+    by_time = sorted(measurements, key=lambda m: m[2], reverse=True)[:args.top]
+    for title, worst in (("Most expanded paths", by_expanded), ("Longest analysis time", by_time)):
+        print(f"\n{title}:")
+        print(f"{'expanded':>10}{'created':>10}{'ms':>10}{'results':>9}  input")
+        for expanded, created, seconds, results, word in worst:
+            print(f"{expanded:>10}{created:>10}{seconds * 1000:>10.2f}{results:>9}  {word}")
+
+    if args.output:
+        words = dict.fromkeys(m[4] for m in by_expanded + by_time)
+        with open(args.output, 'w', encoding='utf8') as f:
+            f.writelines(f"{word}\n" for word in words)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Reports memory used by the default analyzer and its most numerous objects.
+
+    python -m benchmarks.memory_report [--words N]
+
+Prints memory traced while constructing ``MorphAnalyzer``, per instance sizes of dictionary items,
+stem transitions, surface transitions and search paths, and memory allocated while analyzing
+the first N words of the bundled vocabulary.
+"""
+import argparse
+import gc
+import logging
+import sys
+import tracemalloc
+
+from zeyrek.lexicon import RootLexicon
+
+
+def instance_size(obj) -> int:
+    """ Size of the object itself and its attribute dictionary, if it has one. """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, default=2000, help="number of words to analyze")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    tracemalloc.start()
+    from zeyrek.morphology import MorphAnalyzer
+    from zeyrek.morphotactics import SearchPath, SurfaceTransition
+    analyzer = MorphAnalyzer()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"MorphAnalyzer(): current {mb(current)}, peak {mb(peak)}")
+
+    stems = analyzer.morphotactics.stem_transitions
+    stem_list = [s for s in stems.single_stems.values()]
+    stem_list += [s for multi in stems.multi_stems.values() for s in multi]
+    items = list(analyzer.lexicon.items)
+    item_size = sum(instance_size(i) for i in items)
+    stem_size = sum(instance_size(s) for s in stem_list)
+    print(f"{len(items)} dictionary items: {mb(item_size)} ({item_size // len(items)} bytes each)")
+    print(f"{len(stem_list)} stem transitions: {mb(stem_size)} ({stem_size // len(stem_list)} bytes each)")
+
+    stem = stem_list[0]
+    path = SearchPath.initial(stem, "")
+    print(f"SurfaceTransition: {instance_size(SurfaceTransition('', stem))} bytes each")
+    print(f"SearchPath: {instance_size(path)} bytes each")
+
+    with open(RootLexicon.RESOURCES_DIR / "tr" / "first-10K", encoding='utf8') as f:
+        words = [line.strip() for line in f if line.strip()][:args.words]
+    gc.collect()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    for word in words:
+        analyzer.analyzer.analyze(word)
+    _, peak = tracemalloc.get_traced_memory()
+    print(f"Analyzing {len(words)} words: peak {mb(peak - before)} above the analyzer")
+
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmarks of zeyrek startup, per word latency and throughput.
+
+    python -m benchmarks.run [--vocabulary FILE] [--words N] [--save FILE] [--compare FILE] [--max-regression R]
+
+All measurements use the bundled resources, so they run offline:
+
+- import time of ``zeyrek`` and ``MorphAnalyzer()`` construction time and peak memory, measured in
+  fresh interpreters,
+- latency percentiles of analyzing each of the first N words of ``resources/tr/first-10K``
+  (or another word list, such as ``worst_case_words.txt`` found by ``fuzz.py``)
+  and the slowest of these words,
+- throughput of ``analyze`` and ``lemmatize`` for the same words, without tokenization.
+
+Results can be saved to a JSON file and compared with a saved baseline. A digest of the analyses
+is compared as well, so changes of analysis results are reported with the timings.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from zeyrek.lexicon import RootLexicon
+
+VOCABULARY = RootLexicon.RESOURCES_DIR / "tr" / "first-10K"
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import zeyrek
+print(time.perf_counter() - start)
+"""
+
+CONSTRUCTION_SCRIPT = """
+import json, resource, time
+import zeyrek
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+zeyrek.MorphAnalyzer()
+seconds = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is in kilobytes on Linux
+print(json.dumps({"seconds": seconds, "peak_mb": (after - before) / 1024}))
+"""
+
+# metrics where a higher value is better, others are times and memory.
+HIGHER_IS_BETTER = {"analyze_words_per_second", "lemmatize_words_per_second"}
+
+
+def run_script(script: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout.strip().splitlines()[-1]
+
+
+def measure_startup(repeat: int) -> dict:
+    import_seconds = min(float(run_script(IMPORT_SCRIPT)) for _ in range(repeat))
+    constructions = [json.loads(run_script(CONSTRUCTION_SCRIPT)) for _ in range(repeat)]
+    return {
+        "import_seconds": import_seconds,
+        "construction_seconds": min(c["seconds"] for c in constructions),
+        "construction_peak_mb": min(c["peak_mb"] for c in constructions),
+    }
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    index = min(len(sorted_values) - 1, round(p / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def measure_words(analyzer, words: list[str], worst: int) -> tuple[dict, list, str]:
+    latencies = []
+    digest = hashlib.sha1()
+    analysis_count = 0
+    for word in words:
+        start = time.perf_counter()
+        analyses = analyzer._parse(word)
+        latencies.append((time.perf_counter() - start, word))
+        analysis_count += len(analyses)
+        digest.update(word.encode('utf8'))
+        for formatted in sorted(analyzer.formatter.format(a) for a in analyses):
+            digest.update(formatted.encode('utf8'))
+    seconds = sorted(latency for latency, _ in latencies)
+    metrics = {
+        "latency_mean_ms": statistics.fmean(seconds) * 1000,
+        "latency_p50_ms": percentile(seconds, 50) * 1000,
+        "latency_p90_ms": percentile(seconds, 90) * 1000,
+        "latency_p99_ms": percentile(seconds, 99) * 1000,
+        "latency_max_ms": seconds[-1] * 1000,
+        "analysis_count": analysis_count,
+    }
+    worst_words = [(word, latency * 1000) for latency, word in sorted(latencies, reverse=True)[:worst]]
+    return metrics, worst_words, digest.hexdigest()
+
+
+def measure_throughput(analyzer, words: list[str]) -> dict:
+    result = {}
+    for name, method in (("analyze", analyzer._analyze_words), ("lemmatize", analyzer._lemmatize_words)):
+        start = time.perf_counter()
+        method(words)
+        result[f"{name}_words_per_second"] = len(words) / (time.perf_counter() - start)
+    return result
+
+
+def compare(results: dict, baseline: dict, max_regression: "float | None") -> bool:
+    """ Prints metrics with their change from the baseline, returns False if there is a regression. """
+    ok = True
+    print(f"\n{'metric':<30}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, value in results["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            print(f"{name:<30}{'-':>12}{value:>12.3f}")
+            continue
+        change = (value - base) / base if base else 0.0
+        worse = -change if name in HIGHER_IS_BETTER else change
+        flag = ""
+        if name != "analysis_count" and max_regression is not None and worse > max_regression:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{name:<30}{base:>12.3f}{value:>12.3f}{change:>+10.1%}{flag}")
+    if results["words"] != baseline.get("words"):
+        print(f"Baseline analyzed {baseline.get('words')} words, results are not comparable.")
+    elif results["digest"] != baseline.get("digest"):
+        print("Analysis results differ from the baseline.")
+        ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vocabulary", type=Path, default=VOCABULARY, help="word list, one word per line")
+    parser.add_argument("--words", type=int, default=10000, help="number of words from the vocabulary")
+    parser.add_argument("--worst", type=int, default=10, help="number of slowest words to report")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions of startup measurements")
+    parser.add_argument("--save", type=Path, help="save results to a JSON file")
+    parser.add_argument("--compare", type=Path, help="compare results with a saved JSON file")
+    parser.add_argument("--max-regression", type=float,
+                        help="exit with an error if a metric is worse than the baseline by this ratio")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with open(args.vocabulary, encoding='utf8') as f:
+        words = [line.strip() for line in f if line.strip()][:args.words]
+
+    metrics = measure_startup(args.repeat)
+    from zeyrek.morphology import MorphAnalyzer
+    analyzer = MorphAnalyzer()
+    word_metrics, worst_words, digest = measure_words(analyzer, words, args.worst)
+    metrics.update(word_metrics)
+    metrics.update(measure_throughput(analyzer, words))
+    results = {"words": len(words), "metrics": metrics, "digest": digest, "worst_words": worst_words}
+
+    for name, value in metrics.items():
+        print(f"{name:<30}{value:>12.3f}")
+    print("\nSlowest words:")
+    for word, latency in worst_words:
+        print(f"  {word:<28}{latency:>10.2f} ms")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf8') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,7 @@
 import pytest
 
 from zeyrek.attributes import SecondaryPos, PrimaryPos, calculate_phonetic_attributes, RootAttribute, PhoneticAttribute
-from zeyrek.lexicon import DictionaryItem, RootLexicon
+from zeyrek.lexicon import DictionaryItem, LexiconOverlay, RootLexicon
 from zeyrek.morphology import MorphAnalyzer
 from zeyrek.morphotactics import StemTransition, SearchPath, root_S, noun_S, MorphemeState, p2sg_S, loc_ST, a3pl_S, \
     SuffixTransition, morphemes, equ_ST, TurkishMorphotactics, adjectiveRoot_ST
@@ -113,3 +113,409 @@ def test_single_lemma():
     analyzer = MorphAnalyzer()
     res = analyzer.lemmatize("Şu dünyadaki sevilen kişi sevmeyi bilendir.")
     assert res == ['şu', 'dünya', 'sevmek', 'kişi', 'sevmek', 'bilmek', '.']
+
+
+def test_suffix_phonetic_attributes():
+    from zeyrek.attributes import suffix_phonetic_attributes, intern_attributes
+    attrs = calculate_phonetic_attributes('kitap')
+    attrs.add(PhoneticAttribute.CannotTerminate)
+    # returned sets are not shared
+    assert PhoneticAttribute.CannotTerminate not in calculate_phonetic_attributes('kitap')
+
+    stem_attrs = intern_attributes(calculate_phonetic_attributes('kitap'))
+    for suffix in ['lar', 'ım', 'ta', 'çı', 'm', 'n']:
+        result = suffix_phonetic_attributes(stem_attrs, suffix)
+        assert result == calculate_phonetic_attributes(suffix, stem_attrs)
+        assert result is suffix_phonetic_attributes(stem_attrs, suffix)
+    # vowel-less suffix keeps vowel attributes of the predecessor
+    assert PhoneticAttribute.LastVowelBack in suffix_phonetic_attributes(stem_attrs, 'm')
+
+
+def test_stem_generation_does_not_depend_on_attribute_order():
+    lexicon = RootLexicon.from_lines(['ret [A:Voicing, Doubling]'])
+    morphotactics = TurkishMorphotactics(lexicon=lexicon)
+    transitions = morphotactics.stem_transitions.transitions_from_item(lexicon.get_item_by_id('ret_Noun'))
+    assert sorted(t.surface for t in transitions) == ['redd', 'ret']
+
+
+def test_surface_transitions_are_shared(lex_from_lines):
+    analyzer = MorphAnalyzer(lexicon=lex_from_lines)
+    first = analyzer.analyzer.search(
+        [SearchPath.initial(st, 'lar') for st in analyzer.morphotactics.stem_transitions.prefix_matches('elmalar')]
+    )
+    second = analyzer.analyzer.search(
+        [SearchPath.initial(st, 'lar') for st in analyzer.morphotactics.stem_transitions.prefix_matches('elmalar')]
+    )
+    assert len(first) > 0
+    for a, b in zip(first, second):
+        assert all(x is y for x, y in zip(a.transitions[1:], b.transitions[1:]))
+
+
+def test_morpheme_list():
+    from zeyrek.morphology import MorphemeList, Parse
+    from zeyrek.morphotactics import morpheme_list
+    assert [m.index for m in morpheme_list] == list(range(len(morpheme_list)))
+    ids = MorphemeList([morphemes['Noun'], morphemes['A3sg'], morphemes['P1sg']])
+    assert ids == ['Noun', 'A3sg', 'P1sg']
+    parse = Parse('benim', 'ben', 'Noun', ids, '[ben:Noun] ben:Noun+A3sg+im:P1sg')
+    assert 'P1sg' in parse
+    assert 'Acc' not in parse
+    assert 'Unk' not in parse
+
+
+def test_pos_constrained_analysis():
+    from zeyrek.morphology import _pos_set
+    analyzer = MorphAnalyzer(lexicon=RootLexicon.from_lines(["ok", "okumak", "beyaz [P:Adj]", "yüz", "yüzmek"]))
+    morphotactics = analyzer.morphotactics
+    assert PrimaryPos.Verb in morphotactics.final_pos(noun_S)
+    assert PrimaryPos.Verb not in morphotactics.final_pos(equ_ST)
+    for word in ['okuma', 'yüzler', 'beyazlaştı', 'yüzmeyi', 'okun']:
+        analyses = analyzer._parse(word)
+        for pos in [PrimaryPos.Noun, PrimaryPos.Verb, PrimaryPos.Adjective]:
+            expected = [a for a in analyses if a.pos == pos]
+            assert analyzer.analyzer.analyze(word, frozenset([pos])) == expected
+            assert analyzer._parse(word, _pos_set(pos.value)) == expected
+    verb_lemmas = analyzer._lemmatize_words(['okuma', 'yüz'], _pos_set('Verb'))
+    assert verb_lemmas == ['okumak', 'yüzmek']
+    assert analyzer._analyze_words(['beyaz'], _pos_set(['Verb']))[0][0].lemma == 'Unk'
+    with pytest.raises(ValueError):
+        _pos_set('Nouns')
+
+
+def test_morpheme_query(lex_from_lines):
+    from zeyrek.rulebasedanalyzer import MorphemeQuery
+    analyzer = MorphAnalyzer(lexicon=lex_from_lines)
+    queries = ['Abl', 'A3pl', 'Nom', ['Dat', 'Loc'], lambda morphemes: morphemes[-1].id_ == 'A3pl']
+    for word in ['elmalardan', 'elmalar', 'elmada', 'beyazlaştı', 'meyvesiz', 'xyz']:
+        analyses = analyzer.analyzer.analyze(word)
+        for query in queries:
+            predicate = MorphemeQuery(query)
+            matches = [predicate.matches_analysis(a) for a in analyses]
+            assert analyzer.query(word, query) == any(matches)
+            assert analyzer.query(word, predicate, all_analyses=True) == (len(matches) > 0 and all(matches))
+    assert analyzer.query('Elmalardan', 'Abl')
+    assert not analyzer.query('elmalar', 'Nom')
+    with pytest.raises(ValueError):
+        analyzer.query('elma', 'Ablative')
+
+
+def test_lazy_parse(lex_from_lines):
+    from zeyrek.morphology import LazyParse, Parse
+    analyzer = MorphAnalyzer(lexicon=lex_from_lines)
+    calls = []
+    format_ = analyzer.formatter.format
+    analyzer.formatter.format = lambda a: calls.append(a) or format_(a)
+    result = analyzer._analyze_words(['elmalar', 'xyz', 'meyve'], lazy=True)
+    assert len(result) == 3
+    assert [p.lemma for p in result[1]] == ['Unk']
+    parse = result[0][0]
+    assert isinstance(parse, LazyParse)
+    assert parse.lemma == 'elma' and parse.pos == 'Noun' and 'A3pl' in parse
+    assert calls == []
+    assert parse.formatted == '[elma:Noun] elma:Noun+lar:A3pl'
+    assert len(calls) == 1
+
+    eager = analyzer._analyze_words(['elmalar'])[0][0]
+    assert type(eager) is Parse and parse.to_parse() == eager
+    assert eager == ('elmalar', 'elma', 'Noun', ['Noun', 'A3pl'], '[elma:Noun] elma:Noun+lar:A3pl')
+    assert "%s %s %s %s %s" % eager == "elmalar elma Noun ['Noun', 'A3pl'] [elma:Noun] elma:Noun+lar:A3pl"
+
+
+def test_parallel_lexicon_processing(monkeypatch):
+    from zeyrek.lexicon import TextLexiconProcessor
+    lines = (RootLexicon.RESOURCES_DIR / "tr" / "master-dictionary.dict").read_text(encoding='utf8').split('\n')
+    lines = lines[:400] + [
+        "dakika", "dk [Pr:dakika; Ref:dakika_Noun; P:Abbrv]", "ada", "çay", "adaçayı [A:CompoundP3sg; Roots:ada-çay]",
+        "## comment", "", "yüz", "yüz [P:Num]", "yüzmek",
+    ]
+    serial = RootLexicon.from_lines(lines)
+    monkeypatch.setattr(TextLexiconProcessor, 'CHUNK_SIZE', 50)
+    parallel = RootLexicon.from_lines(lines, processes=2)
+    assert parallel.fingerprint == serial.fingerprint
+    for item in serial.items:
+        other = parallel.get_item_by_id(item.id_)
+        assert other.attributes == item.attributes
+        assert other.root == item.root and other.primary_pos == item.primary_pos
+        assert (other.ref_item is None) == (item.ref_item is None)
+    assert parallel.get_item_by_id('dk_Noun_Abbrv').ref_item.id_ == 'dakika_Noun'
+
+
+def test_lexicon_overlay(lex_from_lines, tmp_path):
+    analyzer = MorphAnalyzer(lexicon=lex_from_lines)
+    fingerprint = analyzer.lexicon.fingerprint
+    customer = analyzer.overlay(RootLexicon.from_lines(["kiraz", "elma"]).items)
+    assert {a.dict_item.id_ for a in customer._parse('kirazlar')} == {'kiraz_Noun'}
+    assert customer._parse('elmalar') == analyzer._parse('elmalar')
+    assert customer.lexicon.get_item_by_id('elma_Noun') is lex_from_lines.get_item_by_id('elma_Noun')
+    assert len(customer.lexicon) == len(lex_from_lines) + 1
+    assert customer.generate('kiraz_Noun', ['A3pl', 'Abl']) == ['kirazlardan']
+
+    dictionary = tmp_path / 'user.dict'
+    dictionary.write_text("armut\n", encoding='utf8')
+    request = customer.overlay()
+    assert request.lexicon.fingerprint == customer.lexicon.fingerprint != fingerprint
+    request.add_dictionary(str(dictionary))
+    assert request._parse('armutlar') and request._parse('kirazlar')
+    assert request.lexicon.fingerprint != customer.lexicon.fingerprint
+
+    # base analyzers are not modified.
+    assert customer._parse('armutlar') == analyzer._parse('armutlar') == analyzer._parse('kirazlar') == []
+    assert analyzer.lexicon.fingerprint == fingerprint
+    assert analyzer.lexicon.get_item_by_id('kiraz_Noun') is None
+    with pytest.raises(ValueError):
+        customer.lexicon.remove(lex_from_lines.get_item_by_id('elma_Noun'))
+
+
+def test_add_update_remove_items(lex_from_lines):
+    analyzer = MorphAnalyzer(lexicon=lex_from_lines)
+    stems = analyzer.morphotactics.stem_transitions
+    analyzer.add_items(RootLexicon.from_lines(["kitap", "kitap [P:Adj]", "elmas"]).items)
+    assert {a.dict_item.id_ for a in analyzer._parse('kitaplar')} == {'kitap_Noun', 'kitap_Adj'}
+    assert {a.dict_item.id_ for a in analyzer._parse('kitabı')} == {'kitap_Noun'}
+    assert len(stems.transitions_from_stem('kitap')) == 2
+    assert analyzer.paradigm('elmas_Noun')[('A3pl', 'Pnon', 'Nom')] == ['elmaslar']
+
+    analyzer.remove_items(['kitap_Adj', lex_from_lines.get_item_by_id('elmas_Noun')])
+    assert {a.dict_item.id_ for a in analyzer._parse('kitaplar')} == {'kitap_Noun'}
+    assert [t.dict_item.id_ for t in stems.transitions_from_stem('kitap')] == ['kitap_Noun']
+    assert analyzer._parse('elmaslar') == [] and stems.transitions_from_stem('elmas') == []
+    assert lex_from_lines.get_matching_items('elmas') == []
+    with pytest.raises(ValueError):
+        analyzer.paradigm('elmas_Noun')
+    with pytest.raises(ValueError):
+        analyzer.remove_items(['elmas_Noun'])
+
+    # updated item is indexed with its new attributes.
+    analyzer.update_items(RootLexicon.from_lines(["kitap [A:NoVoicing]"]).items)
+    assert RootAttribute.NoVoicing in lex_from_lines.get_item_by_id('kitap_Noun').attributes
+    assert {a.dict_item.id_ for a in analyzer._parse('kitapı')} == {'kitap_Noun'}
+    assert analyzer._parse('kitabı') == [] and stems.transitions_from_stem('kitab') == []
+    assert [item.id_ for item in stems.different_stem_items] == ['adak_Noun']
+
+
+def test_dictionary_profiles(monkeypatch, tmp_path):
+    from zeyrek.lexicon import DictionaryProfile
+    (tmp_path / 'core.dict').write_text("elma\nkitap\n", encoding='utf8')
+    (tmp_path / 'names.dict').write_text("Elif [P:Noun,Prop]\n", encoding='utf8')
+    (tmp_path / 'places.dict').write_text("Kars\n", encoding='utf8')
+    monkeypatch.setattr(RootLexicon, 'RESOURCES_DIR', tmp_path)
+    monkeypatch.setattr(RootLexicon, 'CORE_DICTIONARY_RESOURCES', ['core.dict'])
+    monkeypatch.setattr(RootLexicon, 'OPTIONAL_DICTIONARY_RESOURCES', {'names': 'names.dict', 'places': 'places.dict'})
+    monkeypatch.setattr(RootLexicon, 'PROFILES', {
+        'minimal': DictionaryProfile(),
+        'standard': DictionaryProfile(deferred=('names',)),
+        'full': DictionaryProfile(loaded=('names', 'places')),
+    })
+    assert len(RootLexicon.from_profile('full').id_dict) == 4
+    with pytest.raises(ValueError):
+        RootLexicon.from_profile('large')
+    with pytest.raises(ValueError):
+        MorphAnalyzer(lexicon=RootLexicon.from_lines(["elma"]), profile='minimal')
+
+    minimal = MorphAnalyzer(profile='minimal')
+    assert minimal._parse_many(['Elife', 'Kars', 'elmalar'])[:2] == [[], []]
+
+    standard = MorphAnalyzer(profile='standard')
+    assert len(standard.lexicon.id_dict) == 2
+    assert standard._parse('elife') == [] and standard._deferred_analyzer is None
+    assert not standard.query('elife', 'Dat') and standard._deferred_analyzer is None
+    analyses = standard._parse_many(['kitaplar', 'Elife', 'elife', 'Kars'])
+    assert [a.dict_item.id_ for a in analyses[1]] == ['Elif_Noun_Prop']
+    assert analyses[2] == analyses[3] == []
+    assert standard.query('Elife', 'Dat')
+    assert standard.generate('Elif_Noun_Prop', ['Dat']) == ['elife']
+    assert standard.lexicon.get_item_by_id('Elif_Noun_Prop') is None
+
+    # changing items of the analyzer updates the loaded overlay of the deferred dictionaries.
+    deferred = standard.deferred_analyzer
+    standard.add_items(RootLexicon.from_lines(["armut", "Elif [P:Noun,Prop]"]).items)
+    assert standard.deferred_analyzer is deferred
+    assert deferred.lexicon.overlay_items == [] and deferred.lexicon.get_item_by_id('Elif_Noun_Prop')
+    assert [a.dict_item.id_ for a in standard._parse('Elife')] == ['Elif_Noun_Prop']
+    assert {a.dict_item.id_ for a in standard._parse('armutlar')} == {'armut_Noun'}
+    assert len(deferred.morphotactics.stem_transitions.transitions_from_stem('elif')) == 1
+    standard.remove_items(['elma_Noun'])
+    assert standard.deferred_analyzer is deferred and deferred._parse('elmalar') == []
+
+
+def test_lexicon_secondary_indexes():
+    lex = RootLexicon.from_lines(["gelmek", "kalmak [A:Aorist_I]", "gitmek [A:Voicing, Aorist_A]", "elma",
+                                  "Ankara", "kitap", "kitap [P:Adj]"])
+    assert [item.id_ for item in lex.items][:3] == ['gelmek_Verb', 'kalmak_Verb', 'gitmek_Verb']
+    verbs = lex.find_items(PrimaryPos.Verb)
+    assert not isinstance(verbs, list)
+    assert [item.id_ for item in verbs] == ['gelmek_Verb', 'kalmak_Verb', 'gitmek_Verb']
+    assert [item.id_ for item in lex.find_items(PrimaryPos.Verb, attributes=[RootAttribute.Aorist_I])] == \
+        ['kalmak_Verb']
+    assert [item.id_ for item in lex.find_items(attributes=[RootAttribute.Voicing, RootAttribute.Aorist_A])] == \
+        ['gitmek_Verb']
+    assert [item.id_ for item in lex.find_items(secondary_pos=SecondaryPos.ProperNoun)] == ['Ankara_Noun_Prop']
+    assert [item.id_ for item in lex.find_items(root='kitap')] == ['kitap_Noun', 'kitap_Adj']
+    assert [item.id_ for item in lex.find_items(PrimaryPos.Adjective, root='kitap')] == ['kitap_Adj']
+    assert list(lex.find_items(PrimaryPos.Verb, root='kitap')) == []
+
+    # indexes are updated when items are added and removed.
+    lex.remove(lex.get_item_by_id('kalmak_Verb'))
+    lex.add(DictionaryItem('koşmak', 'koş', PrimaryPos.Verb, SecondaryPos.NONE, {RootAttribute.Aorist_I}, 'koş', 0))
+    assert [item.id_ for item in lex.find_items(PrimaryPos.Verb, attributes=[RootAttribute.Aorist_I])] == \
+        ['koşmak_Verb']
+    for item in list(lex.items)[:4]:
+        lex.remove(item)
+    assert [item.id_ for item in lex.find_items(PrimaryPos.Verb)] == ['koşmak_Verb']
+    assert [item.id_ for item in lex.items] == ['kitap_Noun', 'kitap_Adj', 'koşmak_Verb']
+
+
+def test_overlay_compaction_keeps_base_items_out():
+    base = RootLexicon.from_lines(["elma", "armut", "kiraz"])
+    overlay = LexiconOverlay(base, RootLexicon.from_lines(["ayva", "erik", "incir"]).items)
+    assert [item.id_ for item in overlay.find_items(root='elma')] == ['elma_Noun']
+    # removing more than half of the overlay items compacts them.
+    overlay.remove(overlay.get_item_by_id('ayva_Noun'))
+    overlay.remove(overlay.get_item_by_id('erik_Noun'))
+    assert [item.id_ for item in overlay.overlay_items] == ['incir_Noun']
+    assert [item.id_ for item in overlay.items] == ['elma_Noun', 'armut_Noun', 'kiraz_Noun', 'incir_Noun']
+    assert [item.id_ for item in overlay.find_items(root='elma')] == ['elma_Noun']
+    assert [item.id_ for item in overlay.find_items(PrimaryPos.Noun)] == \
+        ['elma_Noun', 'armut_Noun', 'kiraz_Noun', 'incir_Noun']
+    assert [item.id_ for item in base.items] == ['elma_Noun', 'armut_Noun', 'kiraz_Noun']
+
+
+def test_interned_root_attributes():
+    lex = RootLexicon.from_lines(["elma", "armut", "kuyruk", "ayva", "atkuyruğu [A:CompoundP3sg; Roots:at-kuyruk]"])
+    assert lex.get_item_by_id('elma_Noun').attributes is lex.get_item_by_id('ayva_Noun').attributes
+    with pytest.raises(AttributeError):
+        lex.get_item_by_id('elma_Noun').attributes.add(RootAttribute.Voicing)
+    fake_root = lex.get_item_by_id('atkuyruk_Noun')
+    assert RootAttribute.Voicing in lex.get_item_by_id('kuyruk_Noun').attributes
+    assert {RootAttribute.Dummy, RootAttribute.CompoundP3sgRoot} <= fake_root.attributes
+    assert RootAttribute.Voicing not in fake_root.attributes
+    assert fake_root.ref_item.id_ == 'atkuyruğu_Noun'
+
+
+def test_streaming_dictionary_reader(monkeypatch, tmp_path):
+    from zeyrek.lexicon import TextLexiconProcessor
+    monkeypatch.setattr(TextLexiconProcessor, 'CHUNK_SIZE', 3)
+    path = tmp_path / 'custom.dict'
+    path.write_text("elma\narmut [P:Foo]\ndk [Pr:dakika; Ref:dakika_Noun; P:Abbrv]\nkitap\n\ndakika\nbeyaz [P:Adj]\n"
+                    "mavi [A:Bar]\n", encoding='utf8')
+    for processes in [1, 2]:
+        processor = TextLexiconProcessor()
+        reports = []
+        with open(path, encoding='utf8') as f:
+            lexicon = processor.process_stream(f, processes, progress=lambda *report: reports.append(report))
+        assert sorted(lexicon.id_dict) == ['beyaz_Adj', 'dakika_Noun', 'dk_Noun_Abbrv', 'elma_Noun', 'kitap_Noun']
+        assert lexicon.get_item_by_id('dk_Noun_Abbrv').ref_item.id_ == 'dakika_Noun'
+        assert reports == [(3, 1), (6, 3), (8, 4)]
+        assert processor.error_count == 2
+        assert [(e.line_number, e.line) for e in processor.errors] == [(2, 'armut [P:Foo]'), (8, 'mavi [A:Bar]')]
+    with pytest.raises(ValueError, match="line .*custom.dict:2 "):
+        RootLexicon.from_path(path)
+
+    # lines are numbered in each file, references are resolved across files.
+    (tmp_path / 'first.dict').write_text("dk [Pr:dakika; Ref:dakika_Noun; P:Abbrv]\nelma\n", encoding='utf8')
+    (tmp_path / 'second.dict').write_text("dakika\nkitap\n", encoding='utf8')
+    processor = TextLexiconProcessor()
+    lexicon = processor.process_files([tmp_path / 'first.dict', tmp_path / 'second.dict'])
+    assert lexicon.get_item_by_id('dk_Noun_Abbrv').ref_item.id_ == 'dakika_Noun'
+    assert processor.errors == [] and processor.line_count == 4
+    (tmp_path / 'second.dict').write_text("dakika\nmavi [A:Bar]\n", encoding='utf8')
+    monkeypatch.setattr(RootLexicon, 'RESOURCES_DIR', tmp_path)
+    with pytest.raises(ValueError, match="line .*second.dict:2 'mavi"):
+        RootLexicon.from_resources(['first.dict', 'second.dict', 'custom.dict'])
+
+
+def test_load_diagnostics(monkeypatch, tmp_path, capsys):
+    from zeyrek.diagnostics import LoadDiagnostics
+    from zeyrek.lexicon import TextLexiconProcessor
+    monkeypatch.setattr(TextLexiconProcessor, 'CHUNK_SIZE', 2)
+    path = tmp_path / 'custom.dict'
+    path.write_text("elma\nelma\nsn [Pr:saniye; Ref:saniye; P:Abbrv]\nbç€\nkiraz [P:Foo]\nkitap\n", encoding='utf8')
+    for processes in [1, 2]:
+        processor = TextLexiconProcessor()
+        with open(path, encoding='utf8') as f:
+            diagnostics = processor.process_stream(f, processes).diagnostics
+        assert diagnostics is processor.diagnostics
+        assert dict(diagnostics.counts) == {
+            LoadDiagnostics.ALREADY_DEFINED: 1,
+            LoadDiagnostics.DUPLICATE_ID: 1,
+            LoadDiagnostics.MISSING_REFERENCE: 1,
+            LoadDiagnostics.UNKNOWN_LETTER: 1,
+            LoadDiagnostics.PARSE_ERROR: 1,
+        }
+        assert diagnostics.examples(LoadDiagnostics.DUPLICATE_ID) == ['elma_Noun']
+        assert diagnostics.examples(LoadDiagnostics.MISSING_REFERENCE) == ['saniye_Noun']
+    assert capsys.readouterr().out == ''
+
+    diagnostics = LoadDiagnostics(max_examples=2)
+    for i in range(3):
+        diagnostics.add(LoadDiagnostics.DUPLICATE_ID, i)
+    diagnostics.merge(diagnostics)
+    assert diagnostics.count(LoadDiagnostics.DUPLICATE_ID) == 6
+    assert diagnostics.examples(LoadDiagnostics.DUPLICATE_ID) == [0, 1]
+    assert str(diagnostics) == "duplicate-id: 6 (0, 1)"
+
+    path.write_text("blokzincir\nblokzincir\nkitap\n", encoding='utf8')
+    analyzer = MorphAnalyzer(profile='minimal')
+    assert not analyzer.lexicon.diagnostics
+    assert analyzer.add_dictionary(path).examples(LoadDiagnostics.DUPLICATE_ID) == ['blokzincir_Noun']
+    assert analyzer.lexicon.diagnostics.examples(LoadDiagnostics.DUPLICATE_ID) == ['blokzincir_Noun', 'kitap_Noun']
+
+
+def test_late_entry_resolution(monkeypatch):
+    from zeyrek.lexicon import TextLexiconProcessor
+    monkeypatch.setattr(TextLexiconProcessor, 'CHUNK_SIZE', 2)
+    lines = [
+        "beyaz [P:Adj]", "beyaz [P:Adj; A:NoVoicing]", "beyaz [P:Adj]",
+        "axkuyruğu [A:CompoundP3sg; Roots:a-xkuyruk]",
+        "xkuyruğu [A:CompoundP3sg, Ext; Roots:x-kuyruk]",
+        "bxkuyruğu [A:CompoundP3sg; Roots:b-xkuyruk]",
+        "dk [P:Noun,Abbrv; Pr:dakika; Ref:dakika]", "dakika",
+    ]
+    for processes in [1, 2]:
+        lexicon = RootLexicon.from_lines(lines, processes)
+        # homonyms with different attributes get the next free index, same ones are skipped.
+        assert lexicon.get_item_by_id('beyaz_Adj_1').attributes == {RootAttribute.NoVoicing}
+        assert lexicon.diagnostics.examples('already-defined') == ['beyaz_Adj']
+        # dummy roots added by earlier late entries are used as reference items.
+        assert RootAttribute.Ext not in lexicon.get_item_by_id('axkuyruk_Noun').attributes
+        assert RootAttribute.Ext in lexicon.get_item_by_id('bxkuyruk_Noun').attributes
+        assert lexicon.get_item_by_id('bxkuyruk_Noun').ref_item.id_ == 'bxkuyruğu_Noun'
+        assert lexicon.get_item_by_id('dk_Noun_Abbrv').ref_item is lexicon.get_item_by_id('dakika_Noun')
+
+
+def test_binary_dictionary(tmp_path):
+    import json
+    import struct
+    text = tmp_path / 'custom.dict'
+    text.write_text("beyaz [P:Adj]\nbeyaz [P:Adj; A:NoVoicing]\nsöylemek [A:Aorist_I]\nblokzincir\n"
+                    "dk [P:Noun,Abbrv; Pr:dakika; Ref:dakika]\ndakika\n"
+                    "atkuyruğu [A:CompoundP3sg; Roots:at-kuyruk]\n", encoding='utf8')
+    binary = tmp_path / 'custom.bin'
+    lexicon = RootLexicon.from_path(text)
+    lexicon.write_binary(binary)
+    loaded = RootLexicon.from_path(binary)
+    assert [item.id_ for item in loaded.items] == [item.id_ for item in lexicon.items]
+    assert loaded.fingerprint == lexicon.fingerprint
+    for item in lexicon.items:
+        restored = loaded.get_item_by_id(item.id_)
+        assert (restored.root, restored.normalized_lemma, restored.attributes) == \
+            (item.root, item.normalized_lemma, item.attributes)
+        assert (restored.ref_item and restored.ref_item.id_) == (item.ref_item and item.ref_item.id_)
+    assert loaded.get_item_by_id('atkuyruk_Noun').ref_item is loaded.get_item_by_id('atkuyruğu_Noun')
+
+    data = binary.read_bytes()
+    for length in (len(data) - 1, 10, len(RootLexicon.BINARY_MAGIC) + 6):
+        binary.write_bytes(data[:length])
+        with pytest.raises(ValueError, match="truncated"):
+            RootLexicon.from_binary(binary)
+    metadata = json.dumps({'kind': 'analyses'}).encode('utf8')
+    binary.write_bytes(RootLexicon.BINARY_MAGIC + struct.pack("<I", len(metadata)) + metadata + bytes(4))
+    with pytest.raises(ValueError, match="does not contain a dictionary"):
+        RootLexicon.from_binary(binary)
+    with pytest.raises(ValueError, match="not a zeyrek binary dictionary"):
+        RootLexicon.from_binary(text)
+
+    lexicon.write_binary(binary)
+    analyzer = MorphAnalyzer(profile='minimal')
+    analyzer.add_dictionary(binary)
+    assert {analysis.dict_item.id_ for analysis in analyzer.analyzer.analyze('blokzincirler')} == {'blokzincir_Noun'}
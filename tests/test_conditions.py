@@ -136,6 +136,31 @@ def test_has_phonetic_attributes(searchpath_dict_item_with_tail_and_RA_voicing):
     assert not not_have(PhoneticAttribute.LastVowelBack).accept(path)
 
 
+def test_partial_stem_conditions(searchpath_dict_item_with_tail_and_RA_voicing):
+    """Tests evaluating stem dependent parts of conditions using stem signature"""
+    path = searchpath_dict_item_with_tail_and_RA_voicing
+    voicing = has(RootAttribute.Voicing)
+    aorist = has(RootAttribute.Aorist_A)
+    phonetic = not_have(PhoneticAttribute.LastVowelFrontal)
+    # unregistered stem conditions are not evaluated.
+    assert voicing.partial(0) is voicing
+
+    conditions = [voicing.and_(phonetic), aorist.and_(phonetic), voicing.or_(phonetic), voicing.not_()]
+    for condition in conditions:
+        condition.register()
+    assert HasRootAttribute(RootAttribute.Voicing).bit is None
+    assert voicing.bit == conditions[2].conditions[0].bit
+
+    signature = path.stem_transition.condition_signature
+    assert voicing.partial(signature) is True
+    assert [c.partial(signature) for c in conditions] == [phonetic, False, True, False]
+    assert phonetic.partial(signature) is phonetic
+
+    transition = SuffixTransition(noun_S, a3sg_S, "", aorist.or_(phonetic))
+    assert transition.stem_condition(path.stem_transition) is phonetic
+    assert transition.can_pass(path)
+
+
 def test_DictionaryItemIs(searchpath_dict_item_with_tail_and_RA_voicing,
                           lex_from_lines):
     """Tests DictionaryItemIs"""
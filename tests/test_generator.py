@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `zeyrek.generator` module."""
+import pytest
+
+from zeyrek.attributes import PrimaryPos
+from zeyrek.generator import RandomWordGenerator, advance, can_terminate, initial_path, surface
+from zeyrek.lexicon import RootLexicon
+from zeyrek.morphology import MorphAnalyzer
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return MorphAnalyzer(lexicon=RootLexicon.from_lines(["elma", "kitap", "beyaz [P:Adj]", "gelmek", "okumak"]))
+
+
+def test_advance(analyzer):
+    elma = analyzer.morphotactics.stem_transitions.transitions_from_item(analyzer.lexicon.get_item_by_id('elma_Noun'))
+    paths = [initial_path(elma[0])]
+    words = set()
+    for _ in range(4):
+        paths = [new_path for path in paths for new_path in advance(path)]
+        words.update(surface(path) for path in paths if can_terminate(path))
+    assert {'elma', 'elmalar', 'elmaya', 'elmam', 'elmalarım'} <= words
+
+
+def test_generated_words_are_analyzed(analyzer):
+    generator = RandomWordGenerator(analyzer.morphotactics, seed=3)
+    for word, analysis in generator.generate(300, with_analysis=True):
+        assert analysis in analyzer.analyzer.analyze(word), word
+
+
+def test_random_generator_options(analyzer):
+    words = list(RandomWordGenerator(analyzer.morphotactics, seed=1).generate(50))
+    assert words == list(RandomWordGenerator(analyzer.morphotactics, seed=1).generate(50))
+
+    generator = RandomWordGenerator(analyzer.morphotactics, seed=2, max_derivations=0, pos_weights={PrimaryPos.Verb: 1})
+    for word, analysis in generator.generate(50, with_analysis=True):
+        assert analysis.dict_item.primary_pos == PrimaryPos.Verb
+        assert len(analysis.group_boundaries) == 1
+
+    with pytest.raises(ValueError):
+        RandomWordGenerator(analyzer.morphotactics, pos_weights={PrimaryPos.Numeral: 1})
+
+
+def test_word_generator(analyzer):
+    assert analyzer.generate('elma_Noun', ['A3pl', 'P1pl', 'Dat']) == ['elmalarımıza']
+    assert analyzer.generate('elma_Noun', ['Noun', 'A3pl', 'P1pl', 'Dat']) == ['elmalarımıza']
+    assert analyzer.generate('kitap_Noun', ['P1sg', 'Acc']) == ['kitabımı']
+    assert analyzer.generate('gelmek_Verb', ['Prog1', 'A1sg']) == ['geliyorum']
+    assert analyzer.generate('elma_Noun', []) == ['elma']
+    assert analyzer.generate('elma_Noun', ['Prog1']) == []
+    with pytest.raises(ValueError):
+        analyzer.generate('armut_Noun', ['Dat'])
+    with pytest.raises(ValueError):
+        analyzer.generate('elma_Noun', ['Dative'])
+
+
+def test_paradigm(analyzer):
+    paradigm = analyzer.paradigm('kitap_Noun')
+    assert len(paradigm) == 98
+    assert paradigm[('A3sg', 'Pnon', 'Dat')] == ['kitaba']
+    assert paradigm[('A3pl', 'P3sg', 'Abl')] == ['kitaplarından']
+    assert analyzer.paradigm('okumak_Verb')[('Fut', 'A1pl')] == ['okuyacağız']
+    assert analyzer.paradigm('elma_Noun', [['Loc'], ['A3pl']]) == {('Loc',): ['elmada'], ('A3pl',): ['elmalar']}
+
+    item = analyzer.lexicon.get_item_by_id('kitap_Noun')
+    generated = analyzer.generator.paradigm(item)
+    assert analyzer.generator.paradigm(item) is generated
+    for results in generated.values():
+        for result in results:
+            assert result.analysis in analyzer.analyzer.analyze(result.surface)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `zeyrek.vocabulary`, `zeyrek.lemmaindex` and `zeyrek.cache` modules."""
+import pytest
+
+from zeyrek.cache import AnalysisCache
+from zeyrek.lemmaindex import LemmaIndex, LemmaIndexBuilder, build_lemma_index
+from zeyrek.lexicon import RootLexicon
+from zeyrek.morphology import MorphAnalyzer
+from zeyrek.vocabulary import AnalysisTable, MappedTable, compile_vocabulary, decode_analyses, encode_analyses
+
+
+@pytest.fixture
+def analyzer():
+    return MorphAnalyzer(lexicon=RootLexicon.from_lines(["adak", "elma", "beyaz [P:Adj]", "meyve"]))
+
+
+def test_mapped_table(tmp_path):
+    path = tmp_path / 'table'
+    entries = {'elma': b'1', 'armut': b'', 'çilek': b'33'}
+    MappedTable.write(path, entries, {'kind': 'test'})
+    table = MappedTable(path)
+    assert table.metadata == {'kind': 'test'}
+    assert len(table) == 3
+    for key, value in entries.items():
+        assert table.get_bytes(key) == value
+    assert table.get_bytes('muz') is None
+    assert 'zzz' not in table
+    assert sorted(table.keys()) == sorted(entries)
+    table.close()
+
+
+def test_encode_decode_analyses(analyzer):
+    analyses = analyzer.analyzer.analyze('beyazlaştırıcı')
+    assert len(analyses) > 0
+    decoded = decode_analyses(encode_analyses(analyses), analyzer.lexicon)
+    assert decoded == analyses
+    assert decode_analyses(encode_analyses([]), analyzer.lexicon) == []
+
+
+def test_analyzer_uses_table(analyzer, tmp_path):
+    path = tmp_path / 'vocabulary'
+    assert compile_vocabulary(['elmalı', 'Meyvesiz', 'xyz'], path, analyzer=analyzer) == 3
+    table = AnalysisTable(path)
+    assert 'meyvesiz' in table
+    expected = analyzer._parse('elmalı')
+    analyzer.load_analysis_table(table)
+    assert analyzer._parse('elmalı') == expected
+    assert analyzer._parse('xyz') == []
+    assert analyzer.query('elmalı', 'With')
+    assert not analyzer.query('xyz', 'With')
+
+    other = MorphAnalyzer(lexicon=RootLexicon.from_lines(["elma"]))
+    with pytest.raises(ValueError):
+        other.load_analysis_table(table)
+
+    # dictionaries are added to an overlay of the given analyzer, not to the analyzer itself.
+    (tmp_path / 'user.dict').write_text("armut\n", encoding='utf8')
+    fingerprint = analyzer.lexicon.fingerprint
+    compile_vocabulary(['armutlu'], tmp_path / 'user', [tmp_path / 'user.dict'], analyzer=analyzer)
+    assert analyzer.lexicon.fingerprint == fingerprint and analyzer._parse('armutlu') == []
+    user_table = AnalysisTable(tmp_path / 'user')
+    assert user_table.metadata['fingerprint'] != fingerprint and user_table.get_bytes('armutlu') != b''
+    user_table.close()
+
+    # analyses are encoded differently by other versions.
+    AnalysisTable.write(tmp_path / 'old', {}, {**table.metadata, 'version': '0.1.2'})
+    with pytest.raises(ValueError, match="0.1.2"):
+        analyzer.load_analysis_table(tmp_path / 'old')
+
+
+def test_analysis_cache(analyzer, tmp_path):
+    cache = AnalysisCache(tmp_path / 'cache.sqlite')
+    analyzer.cache = cache
+    expected = analyzer._parse_many(['elmalı', 'beyazlaştı', 'elmalı', 'xyz'])
+    assert len(cache) == 3
+    assert cache.get_many(['elmalı', 'xyz', 'armut'], analyzer.lexicon) == {'elmalı': expected[0], 'xyz': []}
+
+    # another analyzer with the same lexicon is served from the cache.
+    other = MorphAnalyzer(lexicon=RootLexicon.from_lines(["adak", "elma", "beyaz [P:Adj]", "meyve"]),
+                          cache=tmp_path / 'cache.sqlite')
+    assert [a[0].dict_item.id_ for a in other._parse_many(['elmalı', 'beyazlaştı'])] == ['elma_Noun', 'beyaz_Adj']
+    assert other.cache.get_many(['elmalı'], RootLexicon.from_lines(["elma"])) == {}
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lexicon_changes_keep_unaffected_analyses(analyzer, tmp_path):
+    path = tmp_path / 'vocabulary'
+    compile_vocabulary(['elmalı', 'adaklar', 'beyazlaştı'], path, analyzer=analyzer)
+    analyzer.load_analysis_table(path)
+    analyzer.cache = AnalysisCache(tmp_path / 'cache.sqlite')
+    analyzer._parse_many(['meyvesiz', 'adaya', 'elmas'])
+    original = analyzer.lexicon.fingerprint
+    assert analyzer.cache.get_many(['adaya'], analyzer.lexicon) == {'adaya': []}
+
+    analyzer.add_items(RootLexicon.from_lines(["ada", "elmas"]).items)
+    cached = analyzer.cache.get_many(['meyvesiz', 'adaya', 'elmas'], analyzer.lexicon)
+    assert list(cached) == ['meyvesiz']
+    assert {a.dict_item.id_ for a in analyzer._parse('adaklar')} == {'adak_Noun'}
+    assert {a.dict_item.id_ for a in analyzer._parse('adaya')} == {'ada_Noun'}
+    assert analyzer._parse('beyazlaştı') == analyzer.analysis_table.get('beyazlaştı', analyzer.lexicon)
+
+    analyzer.remove_items(['elma_Noun'])
+    assert analyzer._parse('elmalı') == []
+    assert not analyzer.query('elmalı', 'With')
+    # entries of the original lexicon are kept, entries of the intermediate one are superseded.
+    keys = [key for key, in analyzer.cache.connection.execute("SELECT DISTINCT key FROM analyses")]
+    assert sorted(keys) == sorted([AnalysisCache.key(original), AnalysisCache.key(analyzer.lexicon)])
+    assert set(analyzer.cache.get_many(['meyvesiz', 'elmalı'], analyzer.lexicon)) == {'meyvesiz', 'elmalı'}
+
+
+def test_lemma_index(analyzer, tmp_path):
+    path = tmp_path / 'index'
+    tokens = ['Elmalar', 'elma', 'elmalar', 'meyve', 'beyazlar', 'xyz', ' ', 'elmalar']
+    builder = build_lemma_index(tokens, path, analyzer, chunk_size=2)
+    assert builder.token_count == 7
+    index = LemmaIndex(path)
+    assert index.metadata['fingerprint'] == analyzer.lexicon.fingerprint
+    assert index.surface_form_counts('elma_Noun') == [('elmalar', 3), ('elma', 1)]
+    assert index.surface_forms('beyaz_Adj') == ['beyazlar']
+    assert index.surface_forms('adak_Noun') == []
+    assert index.item_ids('elmalar') == ['elma_Noun']
+    assert index.item_ids('xyz') == []
+    assert sorted(index.indexed_item_ids()) == ['beyaz_Adj', 'elma_Noun', 'meyve_Noun']
+    assert 'meyve' in set(index.indexed_surfaces())
+    index.close()
+
+    other = LemmaIndexBuilder()
+    other.add_all([('elmaya', analyzer._parse('elmaya'))])
+    builder.merge(other)
+    builder.write(path)
+    index = LemmaIndex(path)
+    assert index.surface_forms('elma_Noun') == ['elmalar', 'elma', 'elmaya']
+    index.close()
+
+    MappedTable.write(tmp_path / 'table', {'a': b''})
+    with pytest.raises(ValueError):
+        LemmaIndex(tmp_path / 'table')
+
+
+def test_lemma_index_with_deferred_dictionaries(monkeypatch, tmp_path):
+    from zeyrek.lexicon import DictionaryProfile
+    (tmp_path / 'core.dict').write_text("ev\nelif\n", encoding='utf8')
+    (tmp_path / 'names.dict').write_text("Elif [P:Noun,Prop]\n", encoding='utf8')
+    monkeypatch.setattr(RootLexicon, 'RESOURCES_DIR', tmp_path)
+    monkeypatch.setattr(RootLexicon, 'CORE_DICTIONARY_RESOURCES', ['core.dict'])
+    monkeypatch.setattr(RootLexicon, 'OPTIONAL_DICTIONARY_RESOURCES', {'names': 'names.dict'})
+    monkeypatch.setattr(RootLexicon, 'PROFILES', {'standard': DictionaryProfile(deferred=('names',))})
+    analyzer = MorphAnalyzer(profile='standard')
+    build_lemma_index(['Elife', 'ev', 'elife', 'Elife'], tmp_path / 'index', analyzer)
+    index = LemmaIndex(tmp_path / 'index')
+    # capitalized tokens are indexed as the analyzer analyzes them, with the deferred proper nouns.
+    expected = {a.dict_item.id_ for a in analyzer._parse('Elife')}
+    assert 'Elif_Noun_Prop' in expected
+    assert sorted(index.item_ids('elife')) == sorted(expected)
+    assert index.surface_form_counts('Elif_Noun_Prop') == [('elife', 2)]
+    assert index.surface_form_counts('elif_Noun') == [('elife', 3)]
+    assert index.item_ids('ev') == ['ev_Noun']
+    index.close()
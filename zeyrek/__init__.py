@@ -4,7 +4,7 @@
 
 __author__ = """Olga Bulat"""
 __email__ = 'obulat@gmail.com'
-__version__ = '0.1.2'
+__version__ = '0.1.4-alpha'
 
 from .morphology import MorphAnalyzer
 
@@ -1,6 +1,5 @@
-import functools
 from enum import Enum, auto
-from typing import Set, NamedTuple
+from typing import Iterable, NamedTuple
 
 
 from zeyrek import tr
@@ -281,10 +280,47 @@ no_vowel_attrs = [PhoneticAttribute.LastLetterConsonant, PhoneticAttribute.First
                   PhoneticAttribute.HasNoVowel]
 
 
-@functools.lru_cache(maxsize=128, typed=False)
+# Interned phonetic and root attribute combinations. There are only a few hundred distinct ones,
+# and sharing them saves memory of dictionary items and makes hashing and comparing attributes of
+# search paths cheap.
+_interned_attributes: dict[frozenset, frozenset] = {}
+
+
+def intern_attributes(attrs: "Iterable[PhoneticAttribute | RootAttribute]") -> frozenset:
+    """ Returns the shared immutable instance of the attribute combination. """
+    if type(attrs) is frozenset:
+        interned = _interned_attributes.get(attrs)
+        if interned is not None:
+            return interned
+    attrs = frozenset(attrs)
+    return _interned_attributes.setdefault(attrs, attrs)
+
+
+# (predecessor attributes, appended surface) -> phonetic attributes.
+# Both predecessor attribute combinations and suffix surfaces are limited, so the table stays small.
+_suffix_attributes: dict[tuple[frozenset, str], frozenset[PhoneticAttribute]] = {}
+
+
+def suffix_phonetic_attributes(
+    predecessor_attrs: frozenset[PhoneticAttribute],
+    surface: str
+) -> frozenset[PhoneticAttribute]:
+    """
+    Calculates phonetic attributes after `surface` is appended to a word with `predecessor_attrs`.
+    Only the appended surface is scanned, result is looked up in a table after the first calculation.
+    :return: interned attributes, they should not be modified.
+    """
+    key = (predecessor_attrs, surface)
+    result = _suffix_attributes.get(key)
+    if result is None:
+        result = intern_attributes(calculate_phonetic_attributes(surface, predecessor_attrs))
+        _suffix_attributes[key] = result
+    return result
+
+
 def calculate_phonetic_attributes(
     word: str,
-    predecessor_attrs: "tuple[PhoneticAttribute] | None" = None
+    predecessor_attrs: "Iterable[PhoneticAttribute] | None" = None
 ) -> set[PhoneticAttribute]:
     p_attrs = set() if predecessor_attrs is None else set(predecessor_attrs)
     # the word should be in lower case
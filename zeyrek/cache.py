@@ -0,0 +1,138 @@
+"""
+Persistent cache of analyses.
+
+:class:`AnalysisCache` stores serialized analyses in a SQLite database, so they survive restarts and
+can be shared by processes analyzing the same vocabulary. Database is opened in WAL mode, which allows
+concurrent readers while another process writes.
+
+Every entry is stored with the lexicon fingerprint and zeyrek version it was created with.
+Entries of another lexicon (for example, before ``add_dictionary`` call) are never returned.
+"""
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable
+
+from zeyrek import __version__
+from zeyrek.lexicon import RootLexicon
+from zeyrek.rulebasedanalyzer import SingleAnalysis
+from zeyrek.vocabulary import decode_analyses, encode_analyses
+
+
+def starts_with_any(word: str, prefixes: "set[str] | frozenset[str]") -> bool:
+    """ Checks if the `word` starts with one of the `prefixes`, in time depending on the word length only. """
+    return bool(prefixes) and any(word[:i] in prefixes for i in range(1, len(word) + 1))
+
+
+class AnalysisCache:
+    """
+    SQLite backed cache of word analyses.
+    :param path: path to the database file, it is created if it does not exist.
+    :param timeout: seconds to wait for a lock held by another process.
+    """
+    # SQLite has a limit on the number of query parameters.
+    BATCH_SIZE = 500
+
+    def __init__(self, path: "str | Path", timeout: float = 30.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._connection: "sqlite3.Connection | None" = None
+        self._pid: "int | None" = None
+        # keys of entries created by `carry_over`, deleted when they are carried over again.
+        self._carried: set[str] = set()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # sqlite connections cannot be shared with forked processes, so each process opens its own.
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=self.timeout)
+            self._pid = os.getpid()
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "key TEXT NOT NULL, word TEXT NOT NULL, data BLOB NOT NULL, "
+                "PRIMARY KEY (key, word)) WITHOUT ROWID"
+            )
+            self._connection.commit()
+        return self._connection
+
+    @staticmethod
+    def key(lexicon: "RootLexicon | str") -> str:
+        """ Returns key of cached entries of the `lexicon`, or of a lexicon with the given fingerprint. """
+        fingerprint = lexicon if isinstance(lexicon, str) else lexicon.fingerprint
+        return f"{__version__}:{fingerprint}"
+
+    def get_many(self, words: Iterable[str], lexicon: RootLexicon) -> dict[str, list[SingleAnalysis]]:
+        """ Returns analyses of the cached `words`. Words that are not in cache are not in the result. """
+        key = self.key(lexicon)
+        words = list(words)
+        result = {}
+        for i in range(0, len(words), self.BATCH_SIZE):
+            batch = words[i:i + self.BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.connection.execute(
+                f"SELECT word, data FROM analyses WHERE key = ? AND word IN ({placeholders})",
+                [key, *batch]
+            )
+            for word, data in rows:
+                result[word] = decode_analyses(data, lexicon)
+        return result
+
+    def put_many(self, analyses: dict[str, list[SingleAnalysis]], lexicon: RootLexicon):
+        """ Stores analyses of words. Already cached words are not overwritten. """
+        if len(analyses) == 0:
+            return
+        key = self.key(lexicon)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO analyses (key, word, data) VALUES (?, ?, ?)",
+                [(key, word, encode_analyses(word_analyses)) for word, word_analyses in analyses.items()]
+            )
+
+    def carry_over(self, fingerprint: str, lexicon: RootLexicon, stale_prefixes: Iterable[str]) -> int:
+        """
+        Copies entries of the lexicon with `fingerprint` to the modified `lexicon`, except entries of words
+        starting with one of the `stale_prefixes`, e.g. stems of the added and removed items.
+        Entries are copied inside the database. Entries of the previous lexicon are kept for processes still
+        using it, unless they were carried over by this cache object themselves: such intermediate lexicons
+        are superseded by the modified one, so their entries are deleted.
+        :return: number of copied entries
+        """
+        stale_prefixes = frozenset(stale_prefixes)
+        source, target = self.key(fingerprint), self.key(lexicon)
+        if source == target:
+            return 0
+        connection = self.connection
+        connection.create_function(
+            "zeyrek_stale", 1, lambda word: starts_with_any(word, stale_prefixes), deterministic=True
+        )
+        # entries of a lexicon cached before, e.g. when a change is undone, are not intermediate.
+        intermediate = connection.execute("SELECT 1 FROM analyses WHERE key = ? LIMIT 1", (target,)).fetchone() is None
+        with connection:
+            copied = connection.execute(
+                "INSERT OR IGNORE INTO analyses (key, word, data) "
+                "SELECT ?, word, data FROM analyses WHERE key = ? AND NOT zeyrek_stale(word)",
+                (target, source)
+            ).rowcount
+            if source in self._carried:
+                connection.execute("DELETE FROM analyses WHERE key = ?", (source,))
+                self._carried.discard(source)
+        if intermediate:
+            self._carried.add(target)
+        return copied
+
+    def clear(self, lexicon: "RootLexicon | None" = None):
+        """ Removes cached entries of the `lexicon`, or all entries if lexicon is not given. """
+        with self.connection:
+            if lexicon is None:
+                self.connection.execute("DELETE FROM analyses")
+            else:
+                self.connection.execute("DELETE FROM analyses WHERE key = ?", (self.key(lexicon),))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
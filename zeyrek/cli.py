@@ -0,0 +1,80 @@
+"""Console commands of zeyrek."""
+from pathlib import Path
+
+import click
+
+from zeyrek.attributes import PrimaryPos
+from zeyrek.generator import generate_corpus
+from zeyrek.lexicon import RootLexicon
+from zeyrek.vocabulary import DEFAULT_VOCABULARY, compile_vocabulary
+
+
+@click.group()
+def main():
+    """Zeyrek: morphological analyzer and lemmatizer for Turkish."""
+
+
+@main.command("compile-vocabulary")
+@click.argument("output", type=click.Path(dir_okay=False, path_type=Path))
+@click.option("-w", "--words", "words_path", type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              default=DEFAULT_VOCABULARY, show_default=True, help="Word list, one word per line.")
+@click.option("-d", "--dictionary", "dictionaries", multiple=True,
+              type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help="Additional dictionary file to add to the default lexicon. Can be repeated.")
+@click.option("-p", "--processes", type=int, default=None, help="Number of worker processes.")
+def compile_vocabulary_command(output, words_path, dictionaries, processes):
+    """Analyzes a word list and writes the analyses to OUTPUT table."""
+    with open(words_path, encoding='utf8') as f:
+        count = compile_vocabulary(f, output, dictionaries=dictionaries, processes=processes)
+    click.echo(f"Compiled {count} words to {output}")
+
+
+@main.command("compile-dict")
+@click.argument("source", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("output", type=click.Path(dir_okay=False, path_type=Path))
+@click.option("-p", "--processes", type=int, default=1, show_default=True,
+              help="Number of worker processes parsing the lines.")
+def compile_dict_command(source, output, processes):
+    """Validates SOURCE text dictionary and writes its items to OUTPUT binary dictionary."""
+    try:
+        lexicon = RootLexicon.from_path(source, processes)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if lexicon.diagnostics:
+        click.echo(str(lexicon.diagnostics), err=True)
+    lexicon.write_binary(output)
+    click.echo(f"Compiled {len(lexicon.id_dict)} items to {output}")
+
+
+@main.command("generate-words")
+@click.argument("output", type=click.File("w", encoding="utf8"))
+@click.option("-n", "--count", type=int, default=100000, show_default=True, help="Number of word forms.")
+@click.option("-s", "--seed", type=int, default=0, show_default=True, help="Random seed.")
+@click.option("--max-derivations", type=int, default=2, show_default=True,
+              help="Maximum number of derivations in a word.")
+@click.option("--max-suffixes", type=int, default=12, show_default=True,
+              help="Maximum number of morphemes after the root.")
+@click.option("--pos", "pos_weights", multiple=True, metavar="POS=WEIGHT",
+              help="Relative frequency of stems with a primary POS, such as Noun=3. Can be repeated.")
+@click.option("-a", "--analysis", is_flag=True, help="Write the expected analysis after each word form.")
+@click.option("-p", "--processes", type=int, default=None, help="Number of worker processes.")
+def generate_words_command(output, count, seed, max_derivations, max_suffixes, pos_weights, analysis, processes):
+    """Generates random valid word forms to OUTPUT file ('-' for standard output)."""
+    weights = {}
+    for pos_weight in pos_weights:
+        name, _, weight = pos_weight.partition("=")
+        try:
+            weights[PrimaryPos(name)] = float(weight or 1)
+        except ValueError:
+            raise click.BadParameter(f"{pos_weight}, expected POS=WEIGHT with a POS such as Noun, Verb, Adj")
+    lines = generate_corpus(
+        count, seed=seed, with_analysis=analysis, processes=processes,
+        max_derivations=max_derivations, max_suffixes=max_suffixes, pos_weights=weights or None,
+    )
+    for line in lines:
+        output.write(line)
+        output.write("\n")
+
+
+if __name__ == '__main__':
+    main()
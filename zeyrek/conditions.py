@@ -8,6 +8,18 @@ class Condition:
     def accept(self, path):
         raise NotImplementedError
 
+    def partial(self, stem_signature: int) -> "Condition | bool":
+        """
+        Evaluates parts of the condition that only depend on the stem of a path.
+        :param stem_signature: outcomes of all stem conditions for the stem, see `StemCondition`
+        :return: True or False if the outcome is decided by the stem,
+        otherwise the condition that still has to be checked for the path.
+        """
+        return self
+
+    def register(self):
+        """ Registers stem conditions that this condition contains, see `StemCondition`. """
+
     def and_(self, other):
         if type(other) == CombinedCondition and other.operator == 'AND':
             return CombinedCondition('AND', [self, *other.conditions])
@@ -40,6 +52,15 @@ class NotCondition(Condition):
     def accept(self, path):
         return not self.condition.accept(path)
 
+    def partial(self, stem_signature):
+        result = self.condition.partial(stem_signature)
+        if result is True or result is False:
+            return not result
+        return self if result is self.condition else NotCondition(result)
+
+    def register(self):
+        self.condition.register()
+
     def __repr__(self):
         return f"Not{self.condition}"
 
@@ -61,6 +82,33 @@ class CombinedCondition(Condition):
         else:
             return any(condition.accept(path) for condition in self.conditions)
 
+    def partial(self, stem_signature):
+        if len(self.conditions) == 0:
+            return True
+        is_and = self.operator == 'AND'
+        remaining = []
+        for condition in self.conditions:
+            result = condition.partial(stem_signature)
+            if result is True:
+                if not is_and:
+                    return True
+            elif result is False:
+                if is_and:
+                    return False
+            else:
+                remaining.append(result)
+        if len(remaining) == 0:
+            return is_and
+        if len(remaining) == 1:
+            return remaining[0]
+        if len(remaining) == len(self.conditions) and all(a is b for a, b in zip(remaining, self.conditions)):
+            return self
+        return CombinedCondition(self.operator, remaining)
+
+    def register(self):
+        for condition in self.conditions:
+            condition.register()
+
     def __len__(self):
         if len(self.conditions) == 0:
             return 0
@@ -84,23 +132,79 @@ def not_have(attribute: Union[RootAttribute, PhoneticAttribute]):
         return HasPhoneticAttribute(attribute).not_()
 
 
-class HasRootAttribute(Condition):
+# Stem conditions, indexed by their bit in stem signatures.
+stem_conditions: list["StemCondition"] = []
+_stem_condition_bits: dict[tuple, int] = {}
+
+
+def evaluate_stem_conditions(stem_transition, start: int = 0) -> int:
+    """
+    Calculates the stem signature: a bit mask of outcomes of registered stem conditions
+    for the `stem_transition`, starting from condition with index `start`.
+    """
+    signature = 0
+    for bit in range(start, len(stem_conditions)):
+        if stem_conditions[bit].accept_stem(stem_transition):
+            signature |= 1 << bit
+    return signature
+
+
+class StemCondition(Condition):
+    """
+    Condition that only depends on the stem transition (dictionary item and root surface) of a path.
+    Once registered, each distinct stem condition gets a bit in stem signatures, so outcomes for a stem
+    are calculated once and conditions of suffix transitions can be partially evaluated for a stem.
+    """
+
+    def __init__(self, *key):
+        self.key = (type(self).__name__, *key)
+        self.bit: "int | None" = None
+
+    def register(self):
+        if self.bit is not None:
+            return
+        try:
+            bit = _stem_condition_bits.get(self.key)
+        except TypeError:
+            # conditions with unhashable arguments are not shared.
+            self.key, bit = (type(self).__name__, id(self)), None
+        if bit is None:
+            bit = len(stem_conditions)
+            _stem_condition_bits[self.key] = bit
+            stem_conditions.append(self)
+        self.bit = bit
+
+    def accept(self, path):
+        return self.accept_stem(path.stem_transition)
+
+    def accept_stem(self, stem_transition):
+        raise NotImplementedError
+
+    def partial(self, stem_signature):
+        if self.bit is None:
+            return self
+        return bool(stem_signature >> self.bit & 1)
+
+
+class HasRootAttribute(StemCondition):
     def __init__(self, attribute):
         self.attribute = attribute
+        super().__init__(attribute)
 
-    def accept(self, path):
-        return path.dict_item.has_attribute(self.attribute)  # TODO test
+    def accept_stem(self, stem_transition):
+        return stem_transition.dict_item.has_attribute(self.attribute)  # TODO test
 
     def __repr__(self):
         return f"HasRootAttribute({self.attribute})"
 
 
-class HasAnyRootAttribute(Condition):
+class HasAnyRootAttribute(StemCondition):
     def __init__(self, attributes):
-        self.attributes = attributes
+        self.attributes = frozenset(attributes)
+        super().__init__(*attributes)
 
-    def accept(self, path):
-        return path.dict_item.has_any_attribute(self.attributes)
+    def accept_stem(self, stem_transition):
+        return stem_transition.dict_item.has_any_attribute(self.attributes)
 
     def __repr__(self):
         return f"HasAnyRootAttribute({self.attributes})"
@@ -109,43 +213,57 @@ class HasAnyRootAttribute(Condition):
 class HasPhoneticAttribute(Condition):
     def __init__(self, attribute):
         self.attribute = attribute
+        # outcomes by phonetic attributes of paths, which are interned frozensets.
+        self._results: dict[frozenset, bool] = {}
 
     def accept(self, path):
-        return self.attribute in path.phonetic_attributes
+        attributes = path.phonetic_attributes
+        result = self._results.get(attributes)
+        if result is None:
+            result = self.attribute in attributes
+            self._results[attributes] = result
+        return result
 
     def __repr__(self):
         return f"HasPhoneticAttribute({self.attribute})"
 
 
-class DictionaryItemIs(Condition):
+class DictionaryItemIs(StemCondition):
     def __init__(self, dict_item):
         self.dict_item = dict_item
+        super().__init__(dict_item)
 
-    def accept(self, path):
-        return self.dict_item is not None and path.dict_item == self.dict_item
+    def accept_stem(self, stem_transition):
+        return self.dict_item is not None and stem_transition.dict_item == self.dict_item
 
     def __repr__(self):
         return f"DictionaryItemIs({self.dict_item})"
 
 
-class SecondaryPosIs(Condition):
+class SecondaryPosIs(StemCondition):
     def __init__(self, pos):
         self.pos = pos
+        super().__init__(pos)
 
-    def accept(self, path):
-        return path.dict_item.secondary_pos == self.pos
+    def accept_stem(self, stem_transition):
+        return stem_transition.dict_item.secondary_pos == self.pos
 
     def __repr__(self):
         return f"SecondaryPosIs[{self.pos}]"
 
 
-class DictionaryItemIsAny(Condition):
+class DictionaryItemIsAny(StemCondition):
     def __init__(self, *items):
         # Temporary:
         self.items = [item for item in items if item is not None]
+        self._items_by_id: "dict | None" = None
+        super().__init__(*self.items)
 
-    def accept(self, path):
-        return path.dict_item in self.items
+    def accept_stem(self, stem_transition):
+        if self._items_by_id is None:
+            self._items_by_id = {item.id_: item for item in self.items}
+        item = self._items_by_id.get(stem_transition.dict_item.id_)
+        return item is not None and item == stem_transition.dict_item
 
     def __repr__(self):
         return f"DictionaryItemIsAny({self.items})"
@@ -170,17 +288,26 @@ class HasTail(Condition):
         return "HasTail{}"
 
 
+def morpheme_mask(morphemes) -> int:
+    """ Bit mask of the indexes of `morphemes`. """
+    mask = 0
+    for morpheme in morphemes:
+        mask |= 1 << morpheme.index
+    return mask
+
+
 class HasTailSequence(Condition):
     def __init__(self, *morphemes):
         self.morphemes = morphemes
+        self.indexes = [m.index for m in morphemes]
 
     def accept(self, path):
         forms = path.transitions
-        if len(forms) < len(self.morphemes):
+        if len(forms) < len(self.indexes):
             return False
         return all(
-            form.morpheme == morph
-            for form, morph in zip(forms[-len(self.morphemes) :], self.morphemes)
+            form.morpheme.index == index
+            for form, index in zip(forms[-len(self.indexes) :], self.indexes)
         )
 
     def __repr__(self):
@@ -190,16 +317,21 @@ class HasTailSequence(Condition):
 class ContainsMorphemeSequence(Condition):
     def __init__(self, *morphemes):
         self.morphemes = morphemes
+        self.indexes = [m.index for m in morphemes]
+        self.mask = morpheme_mask(morphemes)
 
     def accept(self, path):
         forms = path.transitions
-        if len(forms) < len(self.morphemes):
+        if len(forms) < len(self.indexes):
+            return False
+        # the sequence cannot be there if any of its morphemes is missing.
+        if path.morpheme_mask & self.mask != self.mask:
             return False
         m = 0
         for form in forms:
-            if form.morpheme == self.morphemes[m]:
+            if form.morpheme.index == self.indexes[m]:
                 m += 1
-                if m == len(self.morphemes):
+                if m == len(self.indexes):
                     return True
             else:
                 m = 0
@@ -215,7 +347,7 @@ class PreviousMorphemeIs(Condition):
 
     def accept(self, path):
         previous_state = path.previous_state
-        return previous_state is not None and previous_state.morpheme == self.morpheme
+        return previous_state is not None and previous_state.morpheme.index == self.morpheme.index
 
     def __repr__(self):
         return f"PreviousMorphemeIs({self.morpheme.id_})"
@@ -245,23 +377,25 @@ class PreviousStateIsNot(Condition):
         return f"PreviousStateIsNot({self.state})"
 
 
-class RootSurfaceIs(Condition):
+class RootSurfaceIs(StemCondition):
     def __init__(self, surface):
         self.surface = surface
+        super().__init__(surface)
 
-    def accept(self, path):
-        return path.stem_transition.surface == self.surface
+    def accept_stem(self, stem_transition):
+        return stem_transition.surface == self.surface
 
     def __repr__(self):
         return f"RootSurfaceIs({self.surface})"
 
 
-class RootSurfaceIsAny(Condition):
+class RootSurfaceIsAny(StemCondition):
     def __init__(self, *surfaces):
         self.surfaces = surfaces
+        super().__init__(*surfaces)
 
-    def accept(self, path):
-        return any(path.stem_transition.surface == s for s in self.surfaces)
+    def accept_stem(self, stem_transition):
+        return any(stem_transition.surface == s for s in self.surfaces)
 
     def __repr__(self):
         return f"RootSurfaceIsAny({self.surfaces})"
@@ -365,8 +499,11 @@ class PreviousGroupContainsMorpheme(Condition):
 
     def __init__(self, *morphemes):
         self.morphemes = morphemes
+        self.mask = morpheme_mask(morphemes)
 
     def accept(self, path):
+        if path.morpheme_mask & self.mask == 0:
+            return False
         suffixes = path.transitions
         last_index = len(suffixes) - 1
         sf = suffixes[last_index]
@@ -376,7 +513,7 @@ class PreviousGroupContainsMorpheme(Condition):
             last_index -= 1
             sf = suffixes[last_index]
         for sf in reversed(suffixes[:last_index]):
-            if sf.state.morpheme in self.morphemes:
+            if self.mask >> sf.state.morpheme.index & 1:
                 return True
             if sf.state.derivative:
                 return False
@@ -409,10 +546,10 @@ class NoSurfaceAfterDerivation(Condition):
 class ContainsMorpheme(Condition):
     def __init__(self, *morphemes):
         self.morphemes = morphemes
+        self.mask = morpheme_mask(morphemes)
 
     def accept(self, path):
-        suffixes = path.transitions
-        return any(suffix.state.morpheme in self.morphemes for suffix in suffixes)
+        return path.morpheme_mask & self.mask != 0
 
     def __repr__(self):
         morphemes_str = ', '.join([m.id_ for m in self.morphemes])
@@ -423,10 +560,11 @@ class PreviousMorphemeIsAny(Condition):
     """Second before last morpheme"""
     def __init__(self, *morphemes):
         self.morphemes = morphemes
+        self.mask = morpheme_mask(morphemes)
 
     def accept(self, path):
         previous_state = path.previous_state
-        return previous_state is not None and previous_state.morpheme in self.morphemes
+        return previous_state is not None and bool(self.mask >> previous_state.morpheme.index & 1)
 
     def __repr__(self):
         return f"PreviousMorphemeIsAny({self.morphemes})"
@@ -0,0 +1,76 @@
+"""
+Diagnostics of loading dictionaries and generating stems.
+
+Problems found while loading a lexicon, such as duplicated ids or missing reference items, are not fatal,
+the affected items are skipped or loaded as well as possible. Instead of being printed, they are collected
+in a :class:`LoadDiagnostics` report of the lexicon: counts of each kind of problem, with the first few
+examples of each. Nothing is written anywhere while loading.
+
+    >>> lexicon = RootLexicon.from_path('/path/to/dictionary')
+    >>> print(lexicon.diagnostics)
+    duplicate-id: 2 (ayva_Noun, kiraz_Noun)
+"""
+from collections import Counter
+from typing import Any
+
+
+class LoadDiagnostics:
+    """
+    Counts of problems found while loading, by kind, and the first `max_examples` examples of each kind.
+    Examples are stored as they are reported, and only formatted when the report is printed.
+    """
+    # kinds of problems reported by the lexicon loaders and stem generation.
+    PARSE_ERROR = "parse-error"
+    INVALID_ITEM = "invalid-item"
+    ALREADY_DEFINED = "already-defined"
+    DUPLICATE_ID = "duplicate-id"
+    MISSING_REFERENCE = "missing-reference"
+    UNKNOWN_LETTER = "unknown-letter"
+    NO_TRANSITIONS = "no-transitions"
+    CAPITALIZED_STEM = "capitalized-stem"
+
+    MAX_EXAMPLES = 100
+
+    def __init__(self, max_examples: int = MAX_EXAMPLES):
+        self.max_examples = max_examples
+        self.counts: Counter = Counter()
+        self._examples: dict[str, list] = {}
+
+    def add(self, kind: str, example: Any = None):
+        """ Counts a problem of `kind`, and keeps the `example` if there are less than `max_examples` of them. """
+        self.counts[kind] += 1
+        examples = self._examples.get(kind)
+        if examples is None:
+            examples = self._examples[kind] = []
+        if len(examples) < self.max_examples:
+            examples.append(example)
+
+    def merge(self, other: "LoadDiagnostics"):
+        """ Adds counts and examples of `other` report, for example from a worker process. """
+        self.counts.update(other.counts)
+        for kind, examples in other._examples.items():
+            kept = self._examples.setdefault(kind, [])
+            kept.extend(examples[:self.max_examples - len(kept)])
+
+    def count(self, kind: str) -> int:
+        return self.counts[kind]
+
+    def examples(self, kind: str) -> list:
+        return self._examples.get(kind, [])
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def __bool__(self):
+        return self.total > 0
+
+    def __str__(self):
+        lines = []
+        for kind, count in self.counts.items():
+            examples = ', '.join(str(example) for example in self.examples(kind)[:5])
+            lines.append(f"{kind}: {count} ({examples})")
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return f"LoadDiagnostics({dict(self.counts)})"
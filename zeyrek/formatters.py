@@ -319,13 +319,6 @@ class DefaultFormatter(Formatter, ABC):
         self.add_surface = add_surface
 
     def format(self, analysis: SingleAnalysis) -> str:
-        result = f"[{analysis.dict_item.lemma}:{analysis.dict_item.primary_pos.value}"
-        if analysis.dict_item.secondary_pos != SecondaryPos.NONE:
-            result = (
-                f"{result},{analysis.dict_item.secondary_pos.value}] "
-            )  # TODO: check name works
-        else:
-            result = f"{result}] "
         result = format_dict_item(analysis.dict_item.lemma, analysis.dict_item.primary_pos.value,
                                   analysis.dict_item.secondary_pos.value)
         result += self.format_morphemes(stem=analysis.stem, surfaces=analysis.morphemes)
@@ -0,0 +1,418 @@
+"""
+Generation of word forms by walking the morphotactics graph forward.
+
+Analysis consumes letters of an input while walking the graph. Generation starts from stem transitions
+and follows suffix transitions the same way, checking their conditions and generating surfaces of suffix
+templates for the phonetic attributes of the path, but there is no input to match.
+Generated paths keep a placeholder tail, so conditions that require remaining letters can pass.
+
+:class:`RandomWordGenerator` produces random valid word forms, for example for load testing and benchmark
+corpora. :func:`generate_corpus` generates them in parallel processes.
+:class:`WordGenerator` produces word forms of a dictionary item with given morphemes, and caches paradigms.
+"""
+import random
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, NamedTuple
+
+from zeyrek.attributes import PhoneticAttribute, PrimaryPos
+from zeyrek.lexicon import DictionaryItem
+from zeyrek.morphotactics import Morpheme, SearchPath, StemTransition, SuffixTransition, TurkishMorphotactics, \
+    generate_surface, morphemes
+from zeyrek.rulebasedanalyzer import SingleAnalysis, next_phonetic_attributes, parse_analysis
+
+# tail of generated paths.
+GENERATION_TAIL = " "
+
+
+def initial_path(stem_transition: StemTransition) -> SearchPath:
+    return SearchPath.initial(stem_transition, GENERATION_TAIL)
+
+
+def passable_transitions(path: SearchPath) -> list[SuffixTransition]:
+    """ Returns outgoing suffix transitions of the path's state which the path can pass. """
+    return [
+        transition
+        for transition, condition in path.current_state.transitions_for_stem(path.stem_transition)
+        if condition is True or condition.accept(path)
+    ]
+
+
+def extend(path: SearchPath, transition: SuffixTransition) -> SearchPath:
+    """ Returns a new path, created by passing the `transition` with its generated surface. """
+    surface = generate_surface(transition, path.phonetic_attributes)
+    if transition.has_surface_form:
+        attributes = next_phonetic_attributes(
+            path.phonetic_attributes, surface, transition.last_template_token.type_
+        )
+    else:
+        attributes = path.phonetic_attributes
+    return path.copy_for_generation(transition.surface_transition(surface), attributes)
+
+
+def advance(path: SearchPath) -> list[SearchPath]:
+    """ Returns all paths that can be created from the `path` with one transition. """
+    return [extend(path, transition) for transition in passable_transitions(path)]
+
+
+def can_terminate(path: SearchPath) -> bool:
+    return path.is_terminal and PhoneticAttribute.CannotTerminate not in path.phonetic_attributes
+
+
+def ends_with_letters(path: SearchPath) -> bool:
+    """
+    Checks that suffix templates after the last letters of the path do not have letters. Analyzer does not pass
+    transitions with surface templates after the end of a word, even if the generated surface is empty.
+    """
+    for transition in reversed(path.transitions):
+        if len(transition.surface) > 0:
+            return True
+        if isinstance(transition.lexical_transition, SuffixTransition) and transition.lexical_transition.has_surface_form:
+            return False
+    return True
+
+
+def analyzer_finds(history: list[SearchPath]) -> bool:
+    """
+    Checks that the analyzer passes the empty transitions at the end of the last path in `history`,
+    which contains all paths of a walk. Conditions of these transitions are checked again with an empty tail,
+    and the phonetic attributes analyzer has: when a suffix ends the word, analyzer does not update
+    phonetic attributes with its surface.
+    """
+    transitions = history[-1].transitions
+    last = len(transitions) - 1
+    while last > 0 and len(transitions[last].surface) == 0:
+        last -= 1
+    if last == 0 or last == len(transitions) - 1:
+        return True
+    previous = history[last - 1]
+    node = transitions[last]
+    attributes = next_phonetic_attributes(
+        previous.phonetic_attributes, None, node.lexical_transition.last_template_token.type_
+    )
+    path = previous.copy(node, attributes)
+    path.tail = ""
+    for node in transitions[last + 1:]:
+        condition = node.lexical_transition.stem_condition(path.stem_transition)
+        if condition is False or (condition is not True and not condition.accept(path)):
+            return False
+        path = path.copy_for_generation(node, path.phonetic_attributes)
+    return True
+
+
+def surface(path: SearchPath) -> str:
+    """ Surface form of the word generated by the path. """
+    return "".join(transition.surface for transition in path.transitions)
+
+
+class RandomWordGenerator:
+    """
+    Generates random valid word forms by random walks over the morphotactics graph.
+
+    :param morphotactics: morphotactics with the stems to start walks from
+    :param seed: seed of the random number generator, walks with the same seed are repeated exactly
+    :param max_derivations: maximum number of derivational morphemes in a word
+    :param max_suffixes: maximum number of morphemes after the root
+    :param pos_weights: relative frequencies of primary parts of speech of the stems, such as
+        ``{PrimaryPos.Noun: 3, PrimaryPos.Verb: 1}``. By default, all stems are equally likely.
+    :param stop_probability: probability of ending a walk in a state where a word can end
+    """
+
+    def __init__(
+        self,
+        morphotactics: TurkishMorphotactics,
+        seed: "int | None" = None,
+        max_derivations: int = 2,
+        max_suffixes: int = 12,
+        pos_weights: "dict[PrimaryPos, float] | None" = None,
+        stop_probability: float = 0.3,
+    ):
+        self.random = random.Random(seed)
+        self.max_derivations = max_derivations
+        self.max_suffixes = max_suffixes
+        self.stop_probability = stop_probability
+        self.stems: dict[PrimaryPos, list[StemTransition]] = {}
+        # lexicon order depends on string hashing, stems are sorted to repeat walks for a seed.
+        stem_transitions = sorted(
+            morphotactics.stem_transitions.all_transitions(), key=lambda st: (st.dict_item.id_, st.surface)
+        )
+        for stem_transition in stem_transitions:
+            self.stems.setdefault(stem_transition.dict_item.primary_pos, []).append(stem_transition)
+        if pos_weights is None:
+            pos_weights = {pos: len(stems) for pos, stems in sorted(self.stems.items(), key=lambda i: i[0].value)}
+        self.pos_list = [pos for pos in pos_weights if pos in self.stems and pos_weights[pos] > 0]
+        if len(self.pos_list) == 0:
+            raise ValueError("There are no stems for the given parts of speech")
+        self.pos_weights = [pos_weights[pos] for pos in self.pos_list]
+
+    def random_stem(self) -> StemTransition:
+        pos = self.random.choices(self.pos_list, self.pos_weights)[0]
+        return self.random.choice(self.stems[pos])
+
+    def walk(self) -> "SearchPath | None":
+        """
+        Walks the graph from a random stem. Returns the path where the walk ended,
+        or None if the walk did not reach a state where a word can end.
+        """
+        path = initial_path(self.random_stem())
+        history = [path]
+        # analyzer accepts the first path that can terminate after the last letter of a word, paths continuing
+        # with empty transitions after it are not analyses. So the result is the first path that can terminate
+        # after the last suffix with letters.
+        result = path if can_terminate(path) else None
+        derivations = 0
+        for _ in range(self.max_suffixes):
+            transitions = passable_transitions(path)
+            if derivations >= self.max_derivations:
+                transitions = [t for t in transitions if not t.to_.derivative]
+            if len(transitions) == 0:
+                break
+            transition = self.random.choice(transitions)
+            path = extend(path, transition)
+            history.append(path)
+            if transition.to_.derivative:
+                derivations += 1
+            if len(path.last_transition.surface) > 0:
+                result = None
+            if result is None and can_terminate(path) and ends_with_letters(path) and analyzer_finds(history):
+                result = path
+            if result is not None and self.random.random() < self.stop_probability:
+                break
+        return result
+
+    def generate(
+        self, count: "int | None" = None, with_analysis: bool = False
+    ) -> "Iterator[str] | Iterator[tuple[str, SingleAnalysis]]":
+        """
+        Generates `count` word forms, or an endless stream if count is None.
+        If `with_analysis` is True, generates tuples of word forms and their expected analyses.
+        """
+        generated = 0
+        while count is None or generated < count:
+            path = self.walk()
+            if path is None:
+                continue
+            generated += 1
+            if with_analysis:
+                yield surface(path), parse_analysis(path)
+            else:
+                yield surface(path)
+
+
+class GenerationResult(NamedTuple):
+    surface: str
+    path: SearchPath
+
+    @property
+    def analysis(self) -> SingleAnalysis:
+        return parse_analysis(self.path)
+
+
+# inflectional paradigms generated by `WordGenerator.paradigm` by default, by primary part of speech of the item.
+# Other items only have the form without suffixes.
+NOUN_PARADIGM = [
+    (number, possessive, case)
+    for number in ("A3sg", "A3pl")
+    for possessive in ("Pnon", "P1sg", "P2sg", "P3sg", "P1pl", "P2pl", "P3pl")
+    for case in ("Nom", "Acc", "Dat", "Loc", "Abl", "Gen", "Ins")
+]
+VERB_PARADIGM = [
+    (tense, person)
+    for tense in ("Past", "Narr", "Prog1", "Fut", "Aor")
+    for person in ("A1sg", "A2sg", "A3sg", "A1pl", "A2pl", "A3pl")
+]
+PARADIGMS = {PrimaryPos.Noun: NOUN_PARADIGM, PrimaryPos.Verb: VERB_PARADIGM}
+
+
+class _MorphemeTrie:
+    """ Morpheme sequences to generate, sharing their common prefixes. """
+    __slots__ = ('children', 'sequence')
+
+    def __init__(self):
+        self.children: dict[Morpheme, _MorphemeTrie] = {}
+        # the sequence ending at this node, if there is one.
+        self.sequence: "tuple[str, ...] | None" = None
+
+    def add(self, sequence: tuple[str, ...]):
+        node = self
+        for morpheme_id in sequence:
+            morpheme = morphemes.get(morpheme_id)
+            if morpheme is None:
+                raise ValueError(f"Unknown morpheme {morpheme_id} in {sequence}")
+            node = node.children.setdefault(morpheme, _MorphemeTrie())
+        node.sequence = sequence
+
+
+class _GenerationPath(NamedTuple):
+    path: SearchPath
+    node: _MorphemeTrie
+    previous: "_GenerationPath | None"
+
+    def history(self) -> list[SearchPath]:
+        history = []
+        generation_path = self
+        while generation_path is not None:
+            history.append(generation_path.path)
+            generation_path = generation_path.previous
+        history.reverse()
+        return history
+
+
+class WordGenerator:
+    """
+    Generates word forms of dictionary items with given morpheme sequences, like the word generator of Zemberek.
+
+    Morphemes of a sequence are matched with suffix transitions in order. Transitions without a surface
+    to inflectional morphemes can be passed without a morpheme in the sequence, so implicit morphemes
+    such as ``A3sg``, ``Pnon`` and ``Nom`` can be left out: ``("A3pl", "P1pl", "Dat")`` generates
+    ``elmalarımıza`` for ``elma_Noun``. The part of speech of the root can also be left out.
+
+    Generated paradigms of items are kept in a cache of `cache_size` entries, frequently requested
+    paradigms can be generated in advance with :meth:`precompute`.
+    """
+
+    def __init__(self, morphotactics: TurkishMorphotactics, cache_size: int = 10000):
+        self.morphotactics = morphotactics
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple, dict[tuple[str, ...], list[GenerationResult]]] = OrderedDict()
+        self._tries: dict[tuple, _MorphemeTrie] = {}
+
+    def generate(self, item: DictionaryItem, morpheme_ids: Iterable[str]) -> list[GenerationResult]:
+        """ Returns word forms of the `item` with morphemes `morpheme_ids`, such as ``["A3pl", "Dat"]``. """
+        sequence = tuple(morpheme_ids)
+        return self.generate_many(item, [sequence])[sequence]
+
+    def generate_many(
+        self, item: DictionaryItem, sequences: Iterable[Iterable[str]]
+    ) -> dict[tuple[str, ...], list[GenerationResult]]:
+        """
+        Returns word forms of the `item` for each of morpheme `sequences`. Forms of all sequences are
+        generated with one walk over the graph, common prefixes of sequences are matched once.
+        """
+        sequences = tuple(tuple(sequence) for sequence in sequences)
+        trie = self._tries.get(sequences)
+        if trie is None:
+            trie = _MorphemeTrie()
+            for sequence in sequences:
+                trie.add(sequence)
+            # tries of paradigms are reused, other sequences are usually requested once.
+            if len(self._tries) < 100:
+                self._tries[sequences] = trie
+        results = {sequence: [] for sequence in sequences}
+        seen = set()
+        # longest walk: a transition for each morpheme and a few empty transitions around them.
+        max_length = 2 * max((len(sequence) for sequence in results), default=0) + 8
+        current = []
+        for stem_transition in self.morphotactics.stem_transitions.transitions_from_item(item):
+            path = initial_path(stem_transition)
+            current.append(_GenerationPath(path, trie, None))
+            child = trie.children.get(path.current_state.morpheme)
+            if child is not None:
+                current.append(_GenerationPath(path, child, None))
+        while len(current) > 0:
+            new_paths = []
+            for generation_path in current:
+                path, node = generation_path.path, generation_path.node
+                if node.sequence is not None and can_terminate(path) and ends_with_letters(path) and (
+                    len(path.last_transition.surface) > 0 or analyzer_finds(generation_path.history())
+                ):
+                    key = (node.sequence, tuple(path.transitions))
+                    if key not in seen:
+                        seen.add(key)
+                        results[node.sequence].append(GenerationResult(surface(path), path))
+                if len(path.transitions) >= max_length:
+                    continue
+                for transition, condition in path.current_state.transitions_for_stem(path.stem_transition):
+                    # morphemes are matched before conditions, which are more expensive to check.
+                    child = node.children.get(transition.to_.morpheme)
+                    if child is None:
+                        if transition.has_surface_form or transition.to_.morpheme.derivational:
+                            continue
+                        child = node
+                    if condition is not True and not condition.accept(path):
+                        continue
+                    new_paths.append(_GenerationPath(extend(path, transition), child, generation_path))
+            current = new_paths
+        return results
+
+    def paradigm(
+        self, item: DictionaryItem, sequences: "Iterable[Iterable[str]] | None" = None
+    ) -> dict[tuple[str, ...], list[GenerationResult]]:
+        """
+        Returns word forms of the `item` for morpheme `sequences`, by default for the paradigm of its part
+        of speech in `PARADIGMS`. Results are cached, they should not be modified.
+        """
+        if sequences is None:
+            sequences = PARADIGMS.get(item.primary_pos, [()])
+        sequences = tuple(tuple(sequence) for sequence in sequences)
+        key = (item.id_, sequences)
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            return result
+        result = self.generate_many(item, sequences)
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def precompute(self, items: Iterable[DictionaryItem], sequences: "Iterable[Iterable[str]] | None" = None):
+        """ Generates and caches paradigms of `items`, see :meth:`paradigm`. """
+        if sequences is not None:
+            sequences = [tuple(sequence) for sequence in sequences]
+        for item in items:
+            self.paradigm(item, sequences)
+
+    def clear_cache(self, item_ids: "Iterable[str] | None" = None):
+        """ Removes cached paradigms of items with `item_ids`, or all cached paradigms. """
+        if item_ids is None:
+            self._cache.clear()
+            return
+        item_ids = set(item_ids)
+        for key in [key for key in self._cache if key[0] in item_ids]:
+            del self._cache[key]
+
+
+_worker_analyzer = None
+
+
+def _init_worker():
+    global _worker_analyzer
+    from zeyrek.morphology import MorphAnalyzer
+    _worker_analyzer = MorphAnalyzer()
+
+
+def _generate_chunk(chunk: tuple[str, int, bool, dict]) -> list[str]:
+    seed, count, with_analysis, options = chunk
+    generator = RandomWordGenerator(_worker_analyzer.morphotactics, seed=seed, **options)
+    if with_analysis:
+        return [
+            f"{word}\t{_worker_analyzer.formatter.format(analysis)}"
+            for word, analysis in generator.generate(count, with_analysis=True)
+        ]
+    return list(generator.generate(count))
+
+
+def generate_corpus(
+    count: int,
+    seed: int = 0,
+    with_analysis: bool = False,
+    processes: "int | None" = None,
+    chunk_size: int = 10000,
+    **options,
+) -> Iterator[str]:
+    """
+    Generates `count` random word forms with a pool of `processes` workers, each using a default
+    ``MorphAnalyzer``. Words are generated in chunks with seeds derived from `seed`, so the output
+    does not depend on the number of processes.
+    :param with_analysis: if True, lines are word forms and their formatted analyses separated by a tab
+    :param options: parameters of :class:`RandomWordGenerator`
+    :return: lines of the corpus, in order
+    """
+    chunks = [
+        (f"{seed}-{index}", min(chunk_size, count - start), with_analysis, options)
+        for index, start in enumerate(range(0, count, chunk_size))
+    ]
+    with ProcessPoolExecutor(processes, initializer=_init_worker) as executor:
+        for lines in executor.map(_generate_chunk, chunks):
+            yield from lines
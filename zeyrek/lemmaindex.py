@@ -0,0 +1,174 @@
+"""
+Reverse index from lemmas to the surface forms seen in a corpus.
+
+Search engines normalize words to lemmas at index time and expand lemmas back to their surface forms
+at query time. :class:`LemmaIndexBuilder` accumulates surface forms of dictionary items from analyzed
+tokens, and writes them to a memory-mapped :class:`LemmaIndex` file with two mappings: dictionary item id
+to surface forms with their counts, and surface form to dictionary item ids. Items are keyed by
+``RootLexicon`` ids, which do not change between runs. Reading the index does not need an analyzer.
+"""
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from zeyrek import __version__
+from zeyrek.rulebasedanalyzer import SingleAnalysis
+from zeyrek.vocabulary import ANALYSIS_SEPARATOR, FIELD_SEPARATOR, MappedTable
+
+# Prefixes of the keys of the two mappings, stored in the same table.
+ITEM_PREFIX = "I" + FIELD_SEPARATOR
+SURFACE_PREFIX = "S" + FIELD_SEPARATOR
+
+
+class LemmaIndexBuilder:
+    """
+    Accumulates surface forms of dictionary items from a stream of analyzed tokens.
+    Only counts of (item id, surface form) pairs are kept, so memory depends on the number of distinct
+    forms, not on the size of the corpus.
+    """
+
+    def __init__(self):
+        self.forms: dict[str, Counter] = {}
+        self.token_count = 0
+
+    def add(self, surface: str, analyses: Iterable[SingleAnalysis], count: int = 1):
+        """
+        Adds a normalized `surface` form with its analyses. The form is counted once for each
+        distinct dictionary item of the analyses.
+        """
+        self.token_count += count
+        for item_id in {analysis.dict_item.id_ for analysis in analyses}:
+            forms = self.forms.get(item_id)
+            if forms is None:
+                forms = self.forms[item_id] = Counter()
+            forms[surface] += count
+
+    def add_all(self, tokens: Iterable[tuple[str, Iterable[SingleAnalysis]]]):
+        """ Adds (normalized surface, analyses) pairs, such as the results of analyzing a token stream. """
+        for surface, analyses in tokens:
+            self.add(surface, analyses)
+
+    def merge(self, other: "LemmaIndexBuilder"):
+        """ Adds forms accumulated by `other` builder, for example in another process. """
+        self.token_count += other.token_count
+        for item_id, forms in other.forms.items():
+            self.forms.setdefault(item_id, Counter()).update(forms)
+
+    def entries(self) -> dict[str, bytes]:
+        surfaces: dict[str, list[str]] = {}
+        entries = {}
+        for item_id, forms in self.forms.items():
+            # most frequent forms first, ties in alphabetical order.
+            ordered = sorted(forms.items(), key=lambda f: (-f[1], f[0]))
+            entries[ITEM_PREFIX + item_id] = ANALYSIS_SEPARATOR.join(
+                f"{surface}{FIELD_SEPARATOR}{count}" for surface, count in ordered
+            ).encode('utf8')
+            for surface, _ in ordered:
+                surfaces.setdefault(surface, []).append(item_id)
+        for surface, item_ids in surfaces.items():
+            entries[SURFACE_PREFIX + surface] = FIELD_SEPARATOR.join(sorted(item_ids)).encode('utf8')
+        return entries
+
+    def write(self, path: "str | Path", fingerprint: "str | None" = None):
+        """
+        Writes the index to a file at `path`.
+        :param fingerprint: fingerprint of the lexicon used for analysis, stored in the index metadata
+        """
+        metadata = {
+            'kind': 'lemma-index',
+            'fingerprint': fingerprint,
+            'version': __version__,
+            'items': len(self.forms),
+            'tokens': self.token_count,
+        }
+        LemmaIndex.write(path, self.entries(), metadata)
+
+
+class LemmaIndex(MappedTable):
+    """
+    Memory-mapped index of surface forms of dictionary items, written by :class:`LemmaIndexBuilder`.
+
+        >>> index = LemmaIndex('/path/to/index')
+        >>> index.surface_forms('kitap_Noun')
+        ['kitap', 'kitabı', 'kitaplar']
+        >>> index.item_ids('kitabı')
+        ['kitap_Noun']
+    """
+
+    def __init__(self, path: "str | Path"):
+        super().__init__(path)
+        if self.metadata.get('kind') != 'lemma-index':
+            self.close()
+            raise ValueError(f"{self.path} is not a lemma index")
+
+    def surface_form_counts(self, item_id: str) -> list[tuple[str, int]]:
+        """ Returns surface forms of a dictionary item with their counts in the corpus, most frequent first. """
+        data = self.get_bytes(ITEM_PREFIX + item_id)
+        if data is None:
+            return []
+        result = []
+        for encoded in data.decode('utf8').split(ANALYSIS_SEPARATOR):
+            surface, count = encoded.split(FIELD_SEPARATOR)
+            result.append((surface, int(count)))
+        return result
+
+    def surface_forms(self, item_id: str) -> list[str]:
+        """ Returns surface forms of a dictionary item seen in the corpus, most frequent first. """
+        return [surface for surface, _ in self.surface_form_counts(item_id)]
+
+    def item_ids(self, surface: str) -> list[str]:
+        """ Returns ids of dictionary items of a normalized surface form seen in the corpus. """
+        data = self.get_bytes(SURFACE_PREFIX + surface)
+        if data is None:
+            return []
+        return data.decode('utf8').split(FIELD_SEPARATOR)
+
+    def indexed_item_ids(self) -> Iterator[str]:
+        for key in self.keys():
+            if key.startswith(ITEM_PREFIX):
+                yield key[len(ITEM_PREFIX):]
+
+    def indexed_surfaces(self) -> Iterator[str]:
+        for key in self.keys():
+            if key.startswith(SURFACE_PREFIX):
+                yield key[len(SURFACE_PREFIX):]
+
+
+def build_lemma_index(
+    tokens: Iterable[str],
+    path: "str | Path",
+    analyzer: "MorphAnalyzer",
+    chunk_size: int = 10000,
+) -> LemmaIndexBuilder:
+    """
+    Analyzes a stream of `tokens` with the `analyzer` in chunks, and writes a :class:`LemmaIndex` of
+    their surface forms to `path`. Tokens are normalized as in analysis, and only analyzed once per chunk.
+    Capitalized tokens are analyzed separately if the analyzer has deferred dictionaries, as proper nouns
+    of these dictionaries are only found for capitalized words.
+    :return: the builder with the accumulated forms
+    """
+    from zeyrek.morphology import _normalize
+    builder = LemmaIndexBuilder()
+    # counts of (normalized token, capitalized) pairs, and the first token of each pair that is analyzed.
+    chunk: Counter = Counter()
+    tokens_to_analyze: dict[tuple[str, bool], str] = {}
+
+    def add_chunk():
+        keys = list(chunk)
+        words = [tokens_to_analyze[key] for key in keys]
+        for key, analyses in zip(keys, analyzer._parse_many(words)):
+            builder.add(key[0], analyses, chunk[key])
+        chunk.clear()
+        tokens_to_analyze.clear()
+
+    for token in tokens:
+        token = token.strip()
+        if token:
+            key = (_normalize(token), bool(analyzer.deferred_dictionaries) and token[:1].isupper())
+            tokens_to_analyze.setdefault(key, token)
+            chunk[key] += 1
+            if len(chunk) >= chunk_size:
+                add_chunk()
+    add_chunk()
+    builder.write(path, analyzer.lexicon.fingerprint)
+    return builder
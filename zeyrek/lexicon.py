@@ -1,8 +1,18 @@
+import collections
+import hashlib
+import itertools
+import json
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple
 
-from zeyrek.attributes import RootAttribute, PrimaryPos, SecondaryPos, parse_attr_data, infer_morphemic_attributes
-from zeyrek import tr
+from zeyrek.attributes import RootAttribute, PrimaryPos, SecondaryPos, PosInfo, parse_attr_data, \
+    infer_morphemic_attributes, intern_attributes
+from zeyrek import __version__, tr
+from zeyrek.diagnostics import LoadDiagnostics
 from zeyrek.lexicon_helpers import to_turkish_letter_pronunciation, guess_for_abbreviation, \
     parse_line_data, generate_dict_id, generate_root, get_pos_data
 
@@ -17,135 +27,396 @@ class MetaDataId(Enum):
     INDEX = "Index"
 
 
+class ItemData(NamedTuple):
+    """ Data of a dictionary item parsed from a line, before its index is resolved in a lexicon. """
+    word: str
+    root: str
+    pos_info: PosInfo
+    index: int
+    pronunciation: str
+    attributes: set[RootAttribute]
+
+
+def parse_item_data(line_data: dict, diagnostics: "LoadDiagnostics | None" = None) -> ItemData:
+    """
+    Parses POS, root, pronunciation and attributes of a dictionary line parsed with `parse_line_data`.
+    The result does not depend on other lines, so lines can be parsed in any order or process.
+    Problems with guessed pronunciations are added to `diagnostics`.
+    """
+    word = line_data['word']
+    metadata = line_data['metadata']
+    pos_info = get_pos_data(metadata.get(MetaDataId.POS), word)
+    clean_word = generate_root(word, pos_info)
+    index_str = metadata.get(MetaDataId.INDEX)
+    index = 0 if index_str is None else int(index_str)
+    pronunciation = metadata.get(MetaDataId.PRONUNCIATION)
+    pronunciation_guessed = False
+    secondary_pos = pos_info.secondary_pos
+    if pronunciation is None:
+        pronunciation_guessed = True
+        if pos_info.primary_pos == PrimaryPos.Punctuation:
+            pronunciation = "a"
+        elif secondary_pos == SecondaryPos.Abbreviation:
+            pronunciation = guess_for_abbreviation(clean_word, diagnostics)
+        elif tr.contains_vowel(clean_word):
+            pronunciation = clean_word
+        else:
+            pronunciation = to_turkish_letter_pronunciation(clean_word, diagnostics)
+    else:
+        pronunciation = tr.lower(pronunciation)
+
+    attr_data = metadata.get(MetaDataId.ATTRIBUTES)
+    parsed_attributes = parse_attr_data(attr_data) if attr_data is not None else None
+    attributes = infer_morphemic_attributes(pronunciation, pos_info, parsed_attributes)
+    if pronunciation_guessed and (secondary_pos in [SecondaryPos.ProperNoun, SecondaryPos.Abbreviation]):
+        attributes.add(RootAttribute.PronunciationGuessed)
+    return ItemData(word, clean_word, pos_info, index, pronunciation, attributes)
+
+
+class LateEntry(NamedTuple):
+    """ Item data of a dictionary line referring to other items, which is added after all other lines. """
+    # id of the item this item refers to, such as "dakika_Noun" for "dk".
+    ref_id: "str | None"
+    # roots of a compound with P3sg, such as "at-kuyruk" for "atkuyruğu".
+    roots: "str | None"
+    data: ItemData
+
+
+def parse_line(
+    line: str, diagnostics: "LoadDiagnostics | None" = None
+) -> "tuple[bool, ItemData | LateEntry] | None":
+    """
+    Parses a dictionary line. Returns None for empty and comment lines. Otherwise returns a flag which is True
+    for late entries, lines referring to other items, and the `LateEntry` of late entries or
+    the item data of other lines.
+    """
+    line = line.strip()
+    if len(line) == 0 or line.startswith("##"):
+        return None
+    line_data = parse_line_data(line)
+    data = parse_item_data(line_data, diagnostics)
+    # if a line contains references to other lines, we add them to lexicon later.
+    metadata = line_data['metadata']
+    if MetaDataId.REF_ID in metadata or MetaDataId.ROOTS in metadata:
+        return True, LateEntry(metadata.get(MetaDataId.REF_ID), metadata.get(MetaDataId.ROOTS), data)
+    return False, data
+
+
+class LineError(NamedTuple):
+    """ A dictionary line that could not be parsed, with its number in the file at `path`, if it was read from one. """
+    line_number: int
+    line: str
+    message: str
+    path: "str | None" = None
+
+
+def _parse_lines(lines: list[str], diagnostics: LoadDiagnostics) -> list:
+    """
+    Parses dictionary lines, see `parse_line`. Lines that cannot be parsed are returned as `LineError`s,
+    their line numbers are counted by the caller.
+    """
+    result = []
+    for line in lines:
+        try:
+            result.append(parse_line(line, diagnostics))
+        except Exception as e:
+            result.append(LineError(0, line.strip(), f"{type(e).__name__}: {e}"))
+    return result
+
+
+_primary_pos_list = list(PrimaryPos)
+_primary_pos_index = {pos: i for i, pos in enumerate(_primary_pos_list)}
+_secondary_pos_list = list(SecondaryPos)
+_secondary_pos_index = {pos: i for i, pos in enumerate(_secondary_pos_list)}
+_root_attribute_list = list(RootAttribute)
+_root_attribute_index = {attr: i for i, attr in enumerate(_root_attribute_list)}
+_attribute_sets: dict[int, frozenset[RootAttribute]] = {}
+
+
+def _parse_lines_encoded(lines: list[str]) -> tuple[list, LoadDiagnostics]:
+    """
+    Same as `_parse_lines`, but item data is encoded as tuples of strings and integers, which are much
+    faster to send between processes than enum members. Diagnostics of the lines are returned with them.
+    """
+    result = []
+    diagnostics = LoadDiagnostics()
+    for parsed in _parse_lines(lines, diagnostics):
+        if type(parsed) is tuple:
+            late, data = parsed
+            if late:
+                parsed = (True, (data.ref_id, data.roots, _encode_item_data(data.data)))
+            else:
+                parsed = (False, _encode_item_data(data))
+        result.append(parsed)
+    return result, diagnostics
+
+
+def _encode_item_data(data: ItemData) -> tuple:
+    mask = 0
+    for attr in data.attributes:
+        mask |= 1 << _root_attribute_index[attr]
+    return (
+        data.word, data.root, _primary_pos_index[data.pos_info.primary_pos],
+        _secondary_pos_index[data.pos_info.secondary_pos], data.index, data.pronunciation, mask,
+    )
+
+
+def _decode_item_data(encoded: tuple) -> ItemData:
+    word, root, primary_pos, secondary_pos, index, pronunciation, mask = encoded
+    attributes = _attribute_sets.get(mask)
+    if attributes is None:
+        attributes = frozenset(attr for i, attr in enumerate(_root_attribute_list) if mask >> i & 1)
+        _attribute_sets[mask] = attributes
+    pos_info = PosInfo(_primary_pos_list[primary_pos], _secondary_pos_list[secondary_pos])
+    return ItemData(word, root, pos_info, index, pronunciation, attributes)
+
+
 class TextLexiconProcessor:
     """
     Class that processes dictionary lines and returns RootLexicon.
     Main method is ``process_lines``.
+
+    Lines are parsed independently of each other, optionally in a pool of worker processes. Parsed
+    items are then added to the lexicon in the order of lines, where their ids and indexes are resolved,
+    and the late entries referring to other items are processed last.
+
+    Problems found while loading are collected in `diagnostics`, which is also the `diagnostics` of the lexicon.
     """
+    # number of lines parsed at once, by a worker process or between progress reports.
+    CHUNK_SIZE = 5000
 
     def __init__(self):
         self.lexicon = RootLexicon()
-        self.late_entries = []
-
-    def process_lines(self, lines: list[str]) -> 'RootLexicon':
-        for line in lines:
-            line = line.strip()
-            if len(line) > 0 and not line.startswith("##"):
-                line = line.strip()
-                line_data = parse_line_data(line)
-
-                # if a line contains references to other lines, we add them to lexicon later.
-                if MetaDataId.REF_ID not in line_data['metadata'] and MetaDataId.ROOTS not in line_data['metadata']:
-                    dict_item = self._parse_dict_item(line_data)
-                    if dict_item is not None:
-                        self.lexicon.add(dict_item)
-                    else:
-                        print(f"Dict item is none: {line_data}")
-                else:
-                    self.late_entries.append(line_data)
+        self.diagnostics = self.lexicon.diagnostics
+        self.late_entries: list[LateEntry] = []
+        self.line_count = 0
+
+    @property
+    def error_count(self) -> int:
+        return self.diagnostics.count(LoadDiagnostics.PARSE_ERROR)
+
+    @property
+    def errors(self) -> list[LineError]:
+        """ Lines that could not be parsed, the first `LoadDiagnostics.MAX_EXAMPLES` of them. """
+        return self.diagnostics.examples(LoadDiagnostics.PARSE_ERROR)
+
+    def process_lines(self, lines: Iterable[str], processes: int = 1) -> 'RootLexicon':
+        """
+        Adds items of dictionary `lines` to the lexicon.
+        :param processes: number of worker processes parsing the lines. Result is the same for any number.
+        :raises ValueError: if a line cannot be parsed
+        """
+        self.process_stream(lines, processes)
+        self._raise_first_error()
+        return self.lexicon
+
+    def process_files(self, paths: "Iterable[str | Path]", processes: int = 1) -> 'RootLexicon':
+        """
+        Adds items of dictionary files, read line by line. Late entries are processed after all files
+        are read, so they can refer to items of any of them. Errors have the line numbers in their file.
+        :raises ValueError: if a line cannot be parsed
+        """
+        for path in paths:
+            with open(path, encoding='utf8') as f:
+                self._add_lines(f, processes, path=str(path))
+        self._process_late_entries()
+        self._raise_first_error()
+        return self.lexicon
+
+    def _raise_first_error(self):
+        if self.errors:
+            error = self.errors[0]
+            location = error.line_number if error.path is None else f"{error.path}:{error.line_number}"
+            raise ValueError(f"Cannot parse dictionary line {location} '{error.line}': {error.message}")
+
+    def process_stream(
+        self,
+        lines: Iterable[str],
+        processes: int = 1,
+        progress: "Callable[[int, int], None] | None" = None,
+    ) -> 'RootLexicon':
+        """
+        Adds items of dictionary `lines`, such as an open file, to the lexicon. Lines are read in chunks
+        of `CHUNK_SIZE`, and only late entries, lines referring to other items, are kept until the end.
+        Lines that cannot be parsed are skipped, they are counted in `error_count` and the first
+        `LoadDiagnostics.MAX_EXAMPLES` of them are kept in `errors`.
+        :param processes: number of worker processes parsing the lines. Result is the same for any number.
+        :param progress: function called after each chunk with the numbers of lines read and items added.
+        """
+        self._add_lines(lines, processes, progress)
         self._process_late_entries()
         return self.lexicon
 
-    def _parse_dict_item(self, line_data: dict) -> 'DictionaryItem':
-        word = line_data['word']
-        metadata = line_data['metadata']
-        pos_info = get_pos_data(metadata.get(MetaDataId.POS), word)
-        clean_word = generate_root(word, pos_info)
-        index_str = metadata.get(MetaDataId.INDEX)
-        index = 0 if index_str is None else int(index_str)
-        pronunciation = metadata.get(MetaDataId.PRONUNCIATION)
-        pronunciation_guessed = False
+    def _add_lines(
+        self,
+        lines: Iterable[str],
+        processes: int = 1,
+        progress: "Callable[[int, int], None] | None" = None,
+        path: "str | None" = None,
+    ):
+        """ Adds items of `lines`, read from the file at `path` if given, and keeps their late entries. """
+        line_number = 0
+        for parsed, encoded in self._parse_chunks(lines, processes):
+            for result in parsed:
+                self.line_count += 1
+                line_number += 1
+                if result is None:
+                    continue
+                if type(result) is LineError:
+                    self.diagnostics.add(
+                        LoadDiagnostics.PARSE_ERROR, result._replace(line_number=line_number, path=path)
+                    )
+                    continue
+                late, data = result
+                if late:
+                    if encoded:
+                        data = LateEntry(data[0], data[1], _decode_item_data(data[2]))
+                    self.late_entries.append(data)
+                    continue
+                if encoded:
+                    data = _decode_item_data(data)
+                dict_item = self._create_item(data)
+                if dict_item is not None:
+                    self.lexicon.add(dict_item)
+            if progress is not None:
+                progress(self.line_count, len(self.lexicon.id_dict))
+
+    def _parse_chunks(self, lines: Iterable[str], processes: int) -> Iterator[tuple[list, bool]]:
+        """
+        Reads and parses chunks of lines, in a pool of worker processes if there is more than one chunk.
+        Only a few chunks are read ahead of the results, so lines are never all in memory.
+        Yields parsed lines of each chunk, and whether items are encoded by `_parse_lines_encoded`.
+        Diagnostics of worker processes are merged into `diagnostics`.
+        """
+        lines = iter(lines)
+        chunks = iter(lambda: list(itertools.islice(lines, self.CHUNK_SIZE)), [])
+        first = next(chunks, None)
+        if first is None:
+            return
+        if processes <= 1 or len(first) < self.CHUNK_SIZE:
+            yield _parse_lines(first, self.diagnostics), False
+            for chunk in chunks:
+                yield _parse_lines(chunk, self.diagnostics), False
+            return
+        with ProcessPoolExecutor(processes) as executor:
+            pending = collections.deque([executor.submit(_parse_lines_encoded, first)])
+            for chunk in chunks:
+                pending.append(executor.submit(_parse_lines_encoded, chunk))
+                if len(pending) > 2 * processes:
+                    yield self._merge_diagnostics(pending.popleft().result()), True
+            while pending:
+                yield self._merge_diagnostics(pending.popleft().result()), True
+
+    def _merge_diagnostics(self, result: tuple[list, LoadDiagnostics]) -> list:
+        parsed, diagnostics = result
+        self.diagnostics.merge(diagnostics)
+        return parsed
+
+    def _create_item(self, data: ItemData) -> 'DictionaryItem':
+        """ Creates a dictionary item, with index incremented if an item with the same id is in the lexicon. """
+        word, pos_info, index, attributes = data.word, data.pos_info, data.index, data.attributes
         secondary_pos = pos_info.secondary_pos
-        if pronunciation is None:
-            pronunciation_guessed = True
-            if pos_info.primary_pos == PrimaryPos.Punctuation:
-                pronunciation = "a"
-            elif secondary_pos == SecondaryPos.Abbreviation:
-                pronunciation = guess_for_abbreviation(clean_word)
-            elif tr.contains_vowel(clean_word):
-                pronunciation = clean_word
-            else:
-                pronunciation = to_turkish_letter_pronunciation(clean_word)
-        else:
-            pronunciation = tr.lower(pronunciation)
-
-        attr_data = metadata.get(MetaDataId.ATTRIBUTES)
-        parsed_attributes = parse_attr_data(attr_data) if attr_data is not None else None
-        attributes = infer_morphemic_attributes(pronunciation, pos_info, parsed_attributes)
-        if pronunciation_guessed and (secondary_pos in [SecondaryPos.ProperNoun, SecondaryPos.Abbreviation]):
-            attributes.add(RootAttribute.PronunciationGuessed)
-            # here if there is an item with same lemma and pos values but attributes are different,
-            # we increment the index.
+        # here if there is an item with same lemma and pos values but attributes are different,
+        # we increment the index. Ids with indexes only differ in their suffix, so the rest is built once.
+        base_id = generate_dict_id(word, pos_info.primary_pos, secondary_pos, 0)
+        id_dict = self.lexicon.id_dict
         while True:
-            id_ = generate_dict_id(word, pos_info.primary_pos, secondary_pos, index)
-            existing_item = self.lexicon.id_dict.get(id_)
-
-            if existing_item is not None and id_ == existing_item.id_:
-                if attributes & existing_item.attributes == attributes:
-                    print(f"Item already defined: {existing_item}")
-                else:
-                    index += 1
-            else:
+            existing_item = id_dict.get(base_id if index == 0 else f"{base_id}_{index}")
+            if existing_item is None:
+                break
+            if attributes <= existing_item.attributes:
+                self.diagnostics.add(LoadDiagnostics.ALREADY_DEFINED, existing_item.id_)
                 break
+            index += 1
         try:
             return DictionaryItem(
                 lemma=word,
-                root=clean_word,
+                root=data.root,
                 primary_pos=pos_info.primary_pos,
                 secondary_pos=secondary_pos,
                 attrs=attributes,
-                pronunciation=pronunciation,
+                pronunciation=data.pronunciation,
                 index=index)
         except Exception as e:
-            print(f"Could not create {word}/{index}/ {type(index)} dictionary item, error: {e} ")
+            self.diagnostics.add(LoadDiagnostics.INVALID_ITEM, f"{word}/{index}: {type(e).__name__}: {e}")
 
     def _process_late_entries(self):
+        """
+        Adds late entries in the order of lines. Reference items of compounds are looked up once for each
+        lemma, and compounds with the same reference attributes share the attributes of their dummy roots.
+        """
+        id_dict = self.lexicon.id_dict
+        # attributes of the item with the lowest index by lemma, or None if there is no item with the lemma.
+        # An entry is dropped when an item with its lemma is added.
+        lemma_attributes: dict[str, "frozenset[RootAttribute] | None"] = {}
+        dummy_attributes: dict[tuple[frozenset, bool], frozenset[RootAttribute]] = {}
+
+        def add(item: DictionaryItem):
+            self.lexicon.add(item)
+            lemma_attributes.pop(item.lemma, None)
+
         for entry in self.late_entries:
-            if MetaDataId.REF_ID in entry['metadata']:
-                reference_id = entry['metadata'].get(MetaDataId.REF_ID)
+            data = entry.data
+            if entry.ref_id is not None:
+                reference_id = entry.ref_id
                 if '_' not in reference_id:
                     reference_id = f"{reference_id}_Noun"
 
-                ref_item = self.lexicon.id_dict.get(reference_id)
+                ref_item = id_dict.get(reference_id)
                 if ref_item is None:
-                    print("Cannot find reference item id " + reference_id)
-                item = self._parse_dict_item(entry)
-                item.ref_item = ref_item
-                self.lexicon.add(item)
+                    self.diagnostics.add(LoadDiagnostics.MISSING_REFERENCE, reference_id)
+                item = self._create_item(data)
+                if item is not None:
+                    item.ref_item = ref_item
+                    add(item)
             # this is a compound lemma with P3sg in it. Such as atkuyruğu
-            if MetaDataId.ROOTS in entry['metadata']:
-                pos_data_str = entry['metadata'].get(MetaDataId.POS)
-                pos_info = get_pos_data(pos_data_str, entry['word'])
-                generated_id = f"{entry['word']}_{pos_info.primary_pos.value}"
-                item = self.lexicon.id_dict.get(generated_id)
+            if entry.roots is not None:
+                pos_info = data.pos_info
+                item = id_dict.get(f"{data.word}_{pos_info.primary_pos.value}")
                 if item is None:
-                    item = self._parse_dict_item(entry)
-                    self.lexicon.add(item)
-                r = entry['metadata'].get(MetaDataId.ROOTS)  # at-kuyruk
+                    item = self._create_item(data)
+                    if item is None:
+                        continue
+                    add(item)
+                r = entry.roots  # at-kuyruk
                 root = r.replace("-", "")  # atkuyruk
                 if "-" in r:
                     r = r[r.index('-') + 1:]
-                ref_items = self.lexicon.get_matching_items(r)  # check lexicon for [kuyruk]
-                if len(ref_items) > 0:
-                    ref_item = sorted(ref_items, key=lambda ref: ref.index)[0]
-                    attr_set = ref_item.attributes.copy()
+                # check lexicon for [kuyruk]
+                if r in lemma_attributes:
+                    ref_attributes = lemma_attributes[r]
+                else:
+                    ref_items = self.lexicon.get_matching_items(r)
+                    ref_attributes = min(ref_items, key=lambda ref: ref.index).attributes if ref_items else None
+                    lemma_attributes[r] = ref_attributes
+                ext = RootAttribute.Ext in item.attributes
+                if ref_attributes is None:
+                    attributes = _dummy_root_attributes(infer_morphemic_attributes(root, pos_info, set()), ext)
                 else:
-                    attr_set = infer_morphemic_attributes(root, pos_info, set())
-                attr_set.add(RootAttribute.CompoundP3sgRoot)
-                if RootAttribute.Ext in item.attributes:
-                    attr_set.add(RootAttribute.Ext)
+                    attributes = dummy_attributes.get((ref_attributes, ext))
+                    if attributes is None:
+                        attributes = _dummy_root_attributes(ref_attributes, ext)
+                        dummy_attributes[ref_attributes, ext] = attributes
                 index = 0
                 dict_item_id = f"{root}_{item.primary_pos.value}"
-                if self.lexicon.id_dict.get(dict_item_id) is not None:
+                if id_dict.get(dict_item_id) is not None:
                     index = 1
-                    # generate a fake lemma for atkuyruk, use kuyruk's attributes.
-                    # But do not allow voicing.
-                fake_root = DictionaryItem(root, root, item.primary_pos, item.secondary_pos, attr_set, root, index)
-                fake_root.attributes.add(RootAttribute.Dummy)
-                if RootAttribute.Voicing in fake_root.attributes:
-                    fake_root.attributes.remove(RootAttribute.Voicing)
+                # generate a fake lemma for atkuyruk, use kuyruk's attributes.
+                fake_root = DictionaryItem(root, root, item.primary_pos, item.secondary_pos, attributes, root, index)
                 fake_root.ref_item = item
-                self.lexicon.add(fake_root)
+                add(fake_root)
+
+
+def _dummy_root_attributes(attributes: "Iterable[RootAttribute]", ext: bool) -> frozenset[RootAttribute]:
+    """ Attributes of the dummy root of a compound with P3sg, from the attributes of its last root. """
+    attr_set = set(attributes)
+    attr_set.add(RootAttribute.CompoundP3sgRoot)
+    if ext:
+        attr_set.add(RootAttribute.Ext)
+    # But do not allow voicing.
+    attr_set.add(RootAttribute.Dummy)
+    attr_set.discard(RootAttribute.Voicing)
+    return intern_attributes(attr_set)
 
 
 class DictionaryItem:
@@ -160,7 +431,8 @@ class DictionaryItem:
     :type primary_pos: PrimaryPos
     :param secondary_pos: Secondary POS information
     :type secondary_pos: SecondaryPos
-    :param attrs: Attributes that this item carries. Such as voicing or vowel drop.
+    :param attrs: Attributes that this item carries. Such as voicing or vowel drop. They are stored as
+        an interned frozenset shared by all items with the same attributes, so they cannot be modified.
     :type attrs: RootAttribute
     :param pronunciation: Pronunciations of the item. TODO: This should be
     converted to an actual 'Pronunciation' item
@@ -169,12 +441,16 @@ class DictionaryItem:
     :param index:
     :type: int
     """
+    __slots__ = (
+        'pronunciation', 'lemma', 'primary_pos', 'secondary_pos', 'normalized_lemma',
+        'attributes', 'root', 'index', 'id_', 'ref_item',
+    )
 
     def __init__(self, lemma: str,
                  root: str,
                  primary_pos: PrimaryPos,
                  secondary_pos: SecondaryPos,
-                 attrs: set[RootAttribute],
+                 attrs: "Iterable[RootAttribute]",
                  pronunciation: str,
                  index: int
                  ):
@@ -183,27 +459,56 @@ class DictionaryItem:
         If there are multiple items with same POS and Lemma user needs to add an index for
         distinction. Structure of the ID: lemma_POS or lemma_POS_index
         """
-        self.pronunciation = pronunciation
-        self.lemma = lemma
+        # strings are interned, many items share roots, pronunciations and lemmas.
+        self.pronunciation = sys.intern(pronunciation)
+        self.lemma = sys.intern(lemma)
         self.primary_pos = primary_pos
         self.secondary_pos = secondary_pos
         # normalized_lemma: if this is a Verb, removes -mek -mak suffix. Otherwise, returns the `lemma`
-        self.normalized_lemma = self.lemma[:-3] if self.primary_pos == PrimaryPos.Verb else self.lemma
-        self.attributes = attrs
-        self.root = root
+        self.normalized_lemma = sys.intern(self.lemma[:-3]) if self.primary_pos == PrimaryPos.Verb else self.lemma
+        self.attributes: frozenset[RootAttribute] = intern_attributes(attrs)
+        self.root = sys.intern(root)
         self.index = index
         self.id_ = self.generate_id()
         self.ref_item: "DictionaryItem | None" = None
 
+    @classmethod
+    def _restore(
+        cls,
+        lemma: str,
+        root: str,
+        primary_pos: PrimaryPos,
+        secondary_pos: SecondaryPos,
+        attributes: frozenset[RootAttribute],
+        pronunciation: str,
+        index: int,
+        id_: str,
+    ) -> 'DictionaryItem':
+        """
+        Creates an item from interned strings and attributes with its known id, without checking them.
+        Used by `RootLexicon.from_binary`.
+        """
+        item = cls.__new__(cls)
+        item.pronunciation = pronunciation
+        item.lemma = lemma
+        item.primary_pos = primary_pos
+        item.secondary_pos = secondary_pos
+        item.normalized_lemma = sys.intern(lemma[:-3]) if primary_pos == PrimaryPos.Verb else lemma
+        item.attributes = attributes
+        item.root = root
+        item.index = index
+        item.id_ = id_
+        item.ref_item = None
+        return item
+
     def __str__(self):
         return f"{self.lemma} [P:{self.primary_pos.value}]"
 
     def __repr__(self):
         return f"DictionaryItem({self.id_})"
 
-    def has_any_attribute(self, root_attrs: list[RootAttribute]):
-
-        return bool(set(root_attrs) & self.attributes)
+    def has_any_attribute(self, root_attrs: "Iterable[RootAttribute]"):
+        return not self.attributes.isdisjoint(root_attrs)
 
     def has_attribute(self, attr: RootAttribute):
         return attr in self.attributes
@@ -223,8 +528,23 @@ class DictionaryItem:
         return self.id_ == other.id_ and self.lemma == other.lemma and self.index == other.index
 
 
+class DictionaryProfile(NamedTuple):
+    """
+    Optional dictionaries of a lexicon, see `RootLexicon.PROFILES`. Dictionaries in `loaded` are loaded
+    with the core dictionaries, ones in `deferred` are loaded by the analyzer when they are first needed.
+    """
+    loaded: tuple[str, ...] = ()
+    deferred: tuple[str, ...] = ()
+
+
 class RootLexicon:
     RESOURCES_DIR = Path(__file__).parent / 'resources'
+    # binary dictionaries, see `write_binary`.
+    BINARY_MAGIC = b"ZYRKDIC1"
+    _binary_length = struct.Struct("<I")
+    # lemma, root, pronunciation, primary and secondary POS, index, attribute set and reference id,
+    # strings are positions in the string table, a missing reference is -1.
+    _binary_item = struct.Struct("<IIIBBHHi")
     DEFAULT_DICTIONARY_RESOURCES = [
         "tr/master-dictionary.dict",
         "tr/non-tdk.dict",
@@ -233,49 +553,239 @@ class RootLexicon:
         "tr/abbreviations.dict",
         "tr/person-names.dict"
     ]
+    CORE_DICTIONARY_RESOURCES = [
+        "tr/master-dictionary.dict",
+        "tr/non-tdk.dict",
+        "tr/proper.dict",
+        "tr/abbreviations.dict",
+    ]
+    # large dictionaries of proper nouns, which many applications do not need.
+    OPTIONAL_DICTIONARY_RESOURCES = {
+        "proper-from-corpus": "tr/proper-from-corpus.dict",
+        "person-names": "tr/person-names.dict",
+        "locations": "tr/locations-tr.dict",
+    }
+    PROFILES = {
+        "minimal": DictionaryProfile(),
+        "standard": DictionaryProfile(deferred=("proper-from-corpus", "person-names")),
+        "full": DictionaryProfile(loaded=("proper-from-corpus", "person-names", "locations")),
+    }
 
     def __init__(self):
         self.item_set: set[DictionaryItem] = set()
         self.id_dict: dict[str, DictionaryItem] = {}
         self.item_dict: dict[str, list[DictionaryItem]] = {}
+        self._fingerprint: "str | None" = None
+        # problems found while loading the items, see `LoadDiagnostics`.
+        self.diagnostics = LoadDiagnostics()
+        # items in the order they were added, removed items are replaced with None until compaction.
+        # Positions of items in this list are bits of the secondary indexes.
+        self._item_list: list["DictionaryItem | None"] = []
+        self._positions: dict[str, int] = {}
+        # secondary indexes, built on the first query: bit sets of items by part of speech and attribute,
+        # and lists of item positions by root.
+        self._bitsets: "dict[Enum, int] | None" = None
+        self._roots: "dict[str, list[int]] | None" = None
 
     def add_lexicon(self, additional_lexicon: "RootLexicon"):
+        self.diagnostics.merge(additional_lexicon.diagnostics)
         for dict_item in additional_lexicon.items:
             self.add(dict_item)
 
-    def add_dictionary_from_path(self, path_to_dictionary: str) -> 'RootLexicon':
-        # TODO: Add error checking
-        dictionary_lines = Path(path_to_dictionary).read_text(encoding='utf8').split('\n')
-        processor = TextLexiconProcessor()
-        lexicon_from_path = processor.process_lines(dictionary_lines)
+    def add_dictionary_from_path(self, path_to_dictionary: str, processes: int = 1) -> 'RootLexicon':
+        lexicon_from_path = self.from_path(path_to_dictionary, processes)
         self.add_lexicon(lexicon_from_path)
         return lexicon_from_path
 
     @classmethod
-    def default_text_dictionaries(cls) -> 'RootLexicon':
-        lines = []
-        for resource in cls.DEFAULT_DICTIONARY_RESOURCES:
-            dict_path = cls.RESOURCES_DIR / resource
-            new_lines = Path(dict_path).read_text(encoding='utf8').split('\n')
-            lines.extend(new_lines)
-        processor = TextLexiconProcessor()
-        return processor.process_lines(lines)
+    def from_path(cls, path_to_dictionary: "str | Path", processes: int = 1) -> 'RootLexicon':
+        """
+        Creates lexicon from a dictionary file. Text dictionaries are read line by line, binary ones
+        written by `write_binary` are loaded with `from_binary`.
+        """
+        with open(path_to_dictionary, 'rb') as f:
+            is_binary = f.read(len(cls.BINARY_MAGIC)) == cls.BINARY_MAGIC
+        if is_binary:
+            return cls.from_binary(path_to_dictionary)
+        return TextLexiconProcessor().process_files([path_to_dictionary], processes)
+
+    def write_binary(self, path: "str | Path"):
+        """
+        Writes items of the lexicon to a binary dictionary file, which is loaded much faster than text.
+
+        File layout: magic bytes, JSON metadata with its length, length of the string table and the table,
+        and fixed size item records. Strings (lemmas, roots, pronunciations and ids of reference items)
+        are stored once and joined with newlines. Items refer to them by their positions in the table,
+        and to their attribute sets by positions in the metadata. Names of parts of speech and attributes
+        are stored in the metadata, so files do not depend on the order of enum members.
+        """
+        strings: dict[str, int] = {}
+        attribute_sets: dict[frozenset[RootAttribute], int] = {}
+
+        def string_index(string: str) -> int:
+            index = strings.get(string)
+            if index is None:
+                if '\n' in string:
+                    raise ValueError(f"Cannot write {string!r} to a binary dictionary")
+                index = strings[string] = len(strings)
+            return index
+
+        primary_pos_index = {pos: i for i, pos in enumerate(PrimaryPos)}
+        secondary_pos_index = {pos: i for i, pos in enumerate(SecondaryPos)}
+        records = []
+        for item in self.items:
+            attributes = attribute_sets.get(item.attributes)
+            if attributes is None:
+                attributes = attribute_sets[item.attributes] = len(attribute_sets)
+            records.append(self._binary_item.pack(
+                string_index(item.lemma), string_index(item.root), string_index(item.pronunciation),
+                primary_pos_index[item.primary_pos], secondary_pos_index[item.secondary_pos], item.index,
+                attributes, -1 if item.ref_item is None else string_index(item.ref_item.id_),
+            ))
+        metadata = {
+            'kind': 'dictionary',
+            'version': __version__,
+            'items': len(records),
+            'primary_pos': [pos.name for pos in PrimaryPos],
+            'secondary_pos': [pos.name for pos in SecondaryPos],
+            'attribute_sets': [sorted(attr.name for attr in attributes) for attributes in attribute_sets],
+        }
+        metadata_bytes = json.dumps(metadata).encode('utf8')
+        string_bytes = '\n'.join(strings).encode('utf8')
+        with open(path, 'wb') as f:
+            f.write(self.BINARY_MAGIC)
+            f.write(self._binary_length.pack(len(metadata_bytes)))
+            f.write(metadata_bytes)
+            f.write(self._binary_length.pack(len(string_bytes)))
+            f.write(string_bytes)
+            f.write(b''.join(records))
+
+    @classmethod
+    def from_binary(cls, path: "str | Path") -> 'RootLexicon':
+        """
+        Creates lexicon from a binary dictionary file written by `write_binary`. Items are added in the order
+        they were written, and references of items are resolved in the loaded lexicon.
+        """
+        data = Path(path).read_bytes()
+        if data[:len(cls.BINARY_MAGIC)] != cls.BINARY_MAGIC:
+            raise ValueError(f"{path} is not a zeyrek binary dictionary")
+        position = len(cls.BINARY_MAGIC)
+        try:
+            (metadata_length,) = cls._binary_length.unpack_from(data, position)
+            position += cls._binary_length.size
+            metadata_bytes = data[position:position + metadata_length]
+            position += metadata_length
+            (strings_length,) = cls._binary_length.unpack_from(data, position)
+            position += cls._binary_length.size
+            string_bytes = data[position:position + strings_length]
+            position += strings_length
+        except struct.error:
+            raise ValueError(f"{path} is truncated")
+        if position > len(data):
+            raise ValueError(f"{path} is truncated")
+        try:
+            metadata = json.loads(metadata_bytes.decode('utf8'))
+            strings = [sys.intern(string) for string in string_bytes.decode('utf8').split('\n')]
+        except ValueError:
+            raise ValueError(f"{path} is corrupted")
+        if not isinstance(metadata, dict) or metadata.get('kind') != 'dictionary':
+            raise ValueError(f"{path} does not contain a dictionary")
+        try:
+            if len(data) - position != metadata['items'] * cls._binary_item.size:
+                raise ValueError(f"{path} is truncated, expected {metadata['items']} items")
+            primary_pos = [PrimaryPos[name] for name in metadata['primary_pos']]
+            secondary_pos = [SecondaryPos[name] for name in metadata['secondary_pos']]
+            attribute_sets = [
+                intern_attributes(RootAttribute[name] for name in names) for names in metadata['attribute_sets']
+            ]
+        except KeyError as e:
+            raise ValueError(f"{path} was written by another version of zeyrek, unknown value {e}")
+        # ids of items without their index, by primary and secondary POS, see `DictionaryItem.generate_id`.
+        id_suffixes = {}
+        lexicon = cls()
+        references = []
+        for lemma, root, pronunciation, primary, secondary, index, attributes, ref in cls._binary_item.iter_unpack(
+            memoryview(data)[position:]
+        ):
+            lemma = strings[lemma]
+            suffix = id_suffixes.get((primary, secondary))
+            if suffix is None:
+                suffix = id_suffixes[primary, secondary] = DictionaryItem(
+                    "", "", primary_pos[primary], secondary_pos[secondary], (), "", 0
+                ).id_
+            item = DictionaryItem._restore(
+                lemma, strings[root], primary_pos[primary], secondary_pos[secondary], attribute_sets[attributes],
+                strings[pronunciation], index, f"{lemma}{suffix}_{index}" if index > 0 else lemma + suffix,
+            )
+            lexicon.add(item)
+            if ref >= 0:
+                references.append((item, strings[ref]))
+        for item, ref_id in references:
+            item.ref_item = lexicon.id_dict.get(ref_id)
+            if item.ref_item is None:
+                lexicon.diagnostics.add(LoadDiagnostics.MISSING_REFERENCE, ref_id)
+        return lexicon
 
     @classmethod
-    def from_lines(cls, lines: list[str]) -> 'RootLexicon':
+    def default_text_dictionaries(cls, processes: int = 1) -> 'RootLexicon':
+        """
+        Creates lexicon from the default dictionary files.
+        :param processes: number of worker processes parsing dictionary lines, see `TextLexiconProcessor`.
+        """
+        return cls.from_resources(cls.DEFAULT_DICTIONARY_RESOURCES, processes)
+
+    @classmethod
+    def from_resources(cls, resources: Iterable[str], processes: int = 1) -> 'RootLexicon':
+        """ Creates lexicon from dictionary files in the resources directory, such as "tr/proper.dict". """
+        return TextLexiconProcessor().process_files([cls.RESOURCES_DIR / r for r in resources], processes)
+
+    @classmethod
+    def get_profile(cls, profile: str) -> DictionaryProfile:
+        if profile not in cls.PROFILES:
+            raise ValueError(f"Unknown dictionary profile {profile}, expected one of {', '.join(cls.PROFILES)}")
+        return cls.PROFILES[profile]
+
+    @classmethod
+    def from_profile(cls, profile: str, processes: int = 1) -> 'RootLexicon':
+        """
+        Creates lexicon from the core dictionaries and optional dictionaries loaded by the `profile`:
+        "minimal" without optional dictionaries, "standard" with proper noun dictionaries deferred
+        until needed (see `MorphAnalyzer`), or "full" with all optional dictionaries.
+        """
+        optional = cls.get_profile(profile).loaded
+        return cls.from_resources(cls.CORE_DICTIONARY_RESOURCES + cls.optional_resources(optional), processes)
+
+    @classmethod
+    def optional_resources(cls, names: Iterable[str]) -> list[str]:
+        """ Returns resources of optional dictionaries with `names`, see `OPTIONAL_DICTIONARY_RESOURCES`. """
+        resources = []
+        for name in names:
+            if name not in cls.OPTIONAL_DICTIONARY_RESOURCES:
+                raise ValueError(f"Unknown optional dictionary {name}")
+            resources.append(cls.OPTIONAL_DICTIONARY_RESOURCES[name])
+        return resources
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], processes: int = 1) -> 'RootLexicon':
         processor = TextLexiconProcessor()
-        return processor.process_lines(lines)
+        return processor.process_lines(lines, processes)
 
     def add(self, item: DictionaryItem):
         if item.id_ in self.id_dict:
-            print(f"Duplicated item id_ of {item}: {item.id_} with {self.id_dict.get(item.id_)}")
+            self.diagnostics.add(LoadDiagnostics.DUPLICATE_ID, item.id_)
             return
         self.item_set.add(item)
         self.id_dict[item.id_] = item
+        self._fingerprint = None
         if item.lemma in self.item_dict:
             self.item_dict[item.lemma].append(item)
         else:
             self.item_dict[item.lemma] = [item]
+        position = len(self._item_list)
+        self._item_list.append(item)
+        self._positions[item.id_] = position
+        if self._bitsets is not None:
+            self._index_item(item, position)
 
     def get_matching_items(self, lemma: str) -> list[DictionaryItem]:
         return self.item_dict.get(lemma, [])
@@ -283,14 +793,195 @@ class RootLexicon:
     def get_item_by_id(self, id_) -> "DictionaryItem | None":
         return self.id_dict.get(id_)
 
-    def remove(self, item: DictionaryItem):
-        self.item_dict.get(item.lemma)  # TODO: test if works
-        self.id_dict.pop(item.id_)
-        self.item_set.remove(item)
+    def remove(self, item: DictionaryItem) -> DictionaryItem:
+        """ Removes the item with the id of `item` from the lexicon and returns it. """
+        id_ = item.id_
+        item = self.id_dict.pop(id_, None)
+        if item is None:
+            raise ValueError(f"{id_} is not in the lexicon")
+        items = [other for other in self.item_dict[item.lemma] if other is not item]
+        if items:
+            self.item_dict[item.lemma] = items
+        else:
+            self.item_dict.pop(item.lemma)
+        self.item_set.discard(item)
+        self._fingerprint = None
+        position = self._positions.pop(id_)
+        self._item_list[position] = None
+        if self._bitsets is not None:
+            self._unindex_item(item, position)
+        if len(self._positions) * 2 < len(self._item_list):
+            self._compact()
+        return item
+
+    def _compact(self):
+        """ Removes empty positions of removed items. Indexes are built again on the next query. """
+        # not `items`, which also iterates over the base items of an overlay.
+        self._item_list = [item for item in self._item_list if item is not None]
+        self._positions = {item.id_: position for position, item in enumerate(self._item_list)}
+        self._bitsets = self._roots = None
+
+    def _index_item(self, item: DictionaryItem, position: int):
+        bit = 1 << position
+        for key in (item.primary_pos, item.secondary_pos, *item.attributes):
+            self._bitsets[key] = self._bitsets.get(key, 0) | bit
+        self._roots.setdefault(item.root, []).append(position)
+
+    def _unindex_item(self, item: DictionaryItem, position: int):
+        mask = ~(1 << position)
+        for key in (item.primary_pos, item.secondary_pos, *item.attributes):
+            self._bitsets[key] &= mask
+        self._roots[item.root].remove(position)
+
+    def _build_indexes(self):
+        positions: dict[Enum, list[int]] = {}
+        self._roots = {}
+        for position, item in enumerate(self._item_list):
+            if item is not None:
+                for key in (item.primary_pos, item.secondary_pos, *item.attributes):
+                    positions.setdefault(key, []).append(position)
+                self._roots.setdefault(item.root, []).append(position)
+        # bit sets are assembled as bytes, setting bits of a large int one by one copies it every time.
+        self._bitsets = {}
+        for key, key_positions in positions.items():
+            data = bytearray(len(self._item_list) // 8 + 1)
+            for position in key_positions:
+                data[position >> 3] |= 1 << (position & 7)
+            self._bitsets[key] = int.from_bytes(data, 'little')
+
+    def find_items(
+        self,
+        primary_pos: "PrimaryPos | None" = None,
+        secondary_pos: "SecondaryPos | None" = None,
+        attributes: Iterable[RootAttribute] = (),
+        root: "str | None" = None,
+    ) -> Iterator[DictionaryItem]:
+        """
+        Iterates over items with all the given properties, in the order they were added, e.g. verbs
+        with Aorist_A attribute: ``find_items(PrimaryPos.Verb, attributes=[RootAttribute.Aorist_A])``.
+        Indexes are built on the first call and updated when items are added or removed. Attributes
+        of items should not be modified after they are added to the lexicon.
+        """
+        if self._bitsets is None:
+            self._build_indexes()
+        mask = None
+        for key in (primary_pos, secondary_pos, *attributes):
+            if key is not None:
+                bits = self._bitsets.get(key, 0)
+                mask = bits if mask is None else mask & bits
+        if root is not None:
+            positions = [p for p in self._roots.get(root, ()) if mask is None or mask >> p & 1]
+        elif mask is None:
+            return self.items
+        else:
+            positions = _bit_positions(mask)
+        item_list = self._item_list
+        return (item_list[position] for position in positions)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Digest of the lexicon contents: ids, pronunciations and attributes of all items.
+        It is used for checking that stored analyses were generated with the same lexicon.
+        The value is calculated on first access and reset when lexicon is modified.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            self._update_digest(digest)
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _update_digest(self, digest):
+        for id_ in sorted(self.id_dict):
+            item = self.id_dict[id_]
+            attributes = ','.join(sorted(attr.name for attr in item.attributes))
+            digest.update(f"{id_}\t{item.pronunciation}\t{attributes}\n".encode('utf8'))
 
     def __len__(self):
         return len(self.item_dict)
 
     @property
-    def items(self) -> list[DictionaryItem]:
-        return list(self.item_set)
+    def items(self) -> Iterator[DictionaryItem]:
+        """ Iterates over items in the order they were added. """
+        return (item for item in self._item_list if item is not None)
+
+
+def _bit_positions(mask: int) -> Iterator[int]:
+    """ Iterates over positions of set bits of `mask`, from the lowest. """
+    binary = bin(mask)[:1:-1]
+    position = binary.find('1')
+    while position >= 0:
+        yield position
+        position = binary.find('1', position + 1)
+
+
+class LexiconOverlay(RootLexicon):
+    """
+    Lexicon that layers its own items over a shared `base` lexicon, without copying or modifying it.
+    Lookups check the overlay items first, then the base. Items added to the overlay are only visible
+    through it, so many overlays, e.g. with user dictionaries of different customers, can share one base.
+    """
+
+    def __init__(self, base: RootLexicon, items: "Iterable[DictionaryItem]" = ()):
+        super().__init__()
+        self.base = base
+        for item in items:
+            self.add(item)
+
+    def add(self, item: DictionaryItem):
+        if item.id_ in self.base.id_dict:
+            self.diagnostics.add(LoadDiagnostics.DUPLICATE_ID, item.id_)
+            return
+        super().add(item)
+
+    def get_matching_items(self, lemma: str) -> list[DictionaryItem]:
+        items = self.item_dict.get(lemma)
+        if items is None:
+            return self.base.get_matching_items(lemma)
+        return self.base.get_matching_items(lemma) + items
+
+    def get_item_by_id(self, id_) -> "DictionaryItem | None":
+        item = self.id_dict.get(id_)
+        return self.base.get_item_by_id(id_) if item is None else item
+
+    def remove(self, item: DictionaryItem) -> DictionaryItem:
+        if item.id_ not in self.id_dict:
+            raise ValueError(f"{item.id_} is not in the overlay, items of the base lexicon cannot be removed")
+        return super().remove(item)
+
+    @property
+    def overlay_items(self) -> list[DictionaryItem]:
+        """ Items added to the overlay. """
+        return list(super().items)
+
+    @property
+    def fingerprint(self) -> str:
+        """ Fingerprint of the base lexicon if the overlay is empty, else digest of it and the overlay items. """
+        if not self.id_dict:
+            return self.base.fingerprint
+        return super().fingerprint
+
+    def _update_digest(self, digest):
+        # overlay items are hashed after the base fingerprint, which is calculated once for all overlays.
+        digest.update(self.base.fingerprint.encode('utf8'))
+        super()._update_digest(digest)
+
+    def __len__(self):
+        return len(self.base) + sum(1 for lemma in self.item_dict if not self.base.get_matching_items(lemma))
+
+    def find_items(
+        self,
+        primary_pos: "PrimaryPos | None" = None,
+        secondary_pos: "SecondaryPos | None" = None,
+        attributes: Iterable[RootAttribute] = (),
+        root: "str | None" = None,
+    ) -> Iterator[DictionaryItem]:
+        attributes = tuple(attributes)
+        return itertools.chain(
+            self.base.find_items(primary_pos, secondary_pos, attributes, root),
+            super().find_items(primary_pos, secondary_pos, attributes, root),
+        )
+
+    @property
+    def items(self) -> Iterator[DictionaryItem]:
+        return itertools.chain(self.base.items, super().items)
@@ -3,6 +3,7 @@ from pathlib import Path
 
 from zeyrek import tr
 from zeyrek.attributes import PrimaryPos, SecondaryPos, PosInfo, primary_pos_set, secondary_pos_set
+from zeyrek.diagnostics import LoadDiagnostics
 
 RESOURCES_DIR = Path(__file__).parent / 'resources'
 
@@ -23,9 +24,9 @@ en_letter_pron = load_dict(Path(RESOURCES_DIR / "tr" / "phonetics" / "turkish-le
 en_phones_to_tr = load_dict(Path(RESOURCES_DIR / "tr" / "phonetics" / "english-phones-to-turkish.txt"))
 
 
-def to_turkish_letter_pronunciation(word):
+def to_turkish_letter_pronunciation(word, diagnostics: "LoadDiagnostics | None" = None):
     if bool(re.search(r'\d', word)):
-        return to_turkish_letter_pronunciation_with_digit(word)
+        return to_turkish_letter_pronunciation_with_digit(word, diagnostics)
     result = []
     for i in range(len(word)):
         c = word[i].lower()
@@ -36,12 +37,12 @@ def to_turkish_letter_pronunciation(word):
                 result.append("ka")
             else:
                 result.append(tr_letter_pron[c])
-        else:
-            print(f"Cannot guess pronunciation of letter {c} in : {word}")
+        elif diagnostics is not None:
+            diagnostics.add(LoadDiagnostics.UNKNOWN_LETTER, f"{c} in {word}")
     return ''.join(result)
 
 
-def to_turkish_letter_pronunciation_with_digit(word):
+def to_turkish_letter_pronunciation_with_digit(word, diagnostics: "LoadDiagnostics | None" = None):
     pieces = re.split(r'(\d+)', word)
     result = []
     i = 0
@@ -51,7 +52,7 @@ def to_turkish_letter_pronunciation_with_digit(word):
             i += 1
             continue
         if i < len(pieces) - 1:
-            result.append(to_turkish_letter_pronunciation(piece))
+            result.append(to_turkish_letter_pronunciation(piece, diagnostics))
         else:
             result.append(replace_english_specific_chars(piece))
         i += 1
@@ -146,7 +147,7 @@ def replace_english_specific_chars(word):
     return ''.join([replacement.get(sym, sym) for sym in word])
 
 
-def guess_for_abbreviation(word):
+def guess_for_abbreviation(word, diagnostics: "LoadDiagnostics | None" = None):
     """Tries to guess turkish abbreviation pronunciation."""
     syllables = tr.vowel_count(word)
 
@@ -154,7 +155,7 @@ def guess_for_abbreviation(word):
     if len(word) > 2 and tr.contains_vowel(word[:2]):
         first_two_cons = True
     if syllables == 0 or len(word) < 3 or first_two_cons:
-        return to_turkish_letter_pronunciation(word)
+        return to_turkish_letter_pronunciation(word, diagnostics)
     else:
         return replace_english_specific_chars(word)
 
@@ -185,9 +186,9 @@ def parse_line_data(line):
 
 
 def generate_dict_id(lemma: str, primary_pos: PrimaryPos, secondary_pos: SecondaryPos, index: int):
-    result = f"{lemma}_{primary_pos.name}"
+    result = f"{lemma}_{primary_pos.value}"
     if secondary_pos is not None and secondary_pos != SecondaryPos.NONE:
-        result = f"{result}_{secondary_pos.name}"
+        result = f"{result}_{secondary_pos.value}"
     if index > 0:
         result = f"{result}_{index}"
     return result
@@ -1,28 +1,60 @@
 # -*- coding: utf-8 -*-
 import collections
+import copy
+from pathlib import Path
 
 from nltk.tokenize import word_tokenize, sent_tokenize
 from zeyrek import tr
-from zeyrek.attributes import SecondaryPos
-from zeyrek.formatters import UDFormatter, DefaultFormatter
-from zeyrek.lexicon import RootLexicon
-from zeyrek.morphotactics import TurkishMorphotactics, Morpheme
-from zeyrek.rulebasedanalyzer import RuleBasedAnalyzer, SingleAnalysis
-from typing import NamedTuple
+from zeyrek.attributes import PrimaryPos, SecondaryPos
+from zeyrek.diagnostics import LoadDiagnostics
+from zeyrek.formatters import Formatter, UDFormatter, DefaultFormatter
+from zeyrek.generator import WordGenerator
+from zeyrek.lexicon import DictionaryItem, LexiconOverlay, RootLexicon
+from zeyrek.morphotactics import TurkishMorphotactics, Morpheme, morphemes as morpheme_registry
+from zeyrek.rulebasedanalyzer import MorphemeQuery, RuleBasedAnalyzer, SingleAnalysis
+from zeyrek.cache import AnalysisCache, starts_with_any
+from zeyrek.vocabulary import AnalysisTable
+from typing import Callable, Iterable, NamedTuple
 
 """Main module."""
 
 
+class MorphemeList(list):
+    """
+    List of morpheme ids of a Parse. Membership of a morpheme id is checked using a bit mask of
+    morpheme indexes instead of scanning the list, so the list should not be modified.
+    """
+    __slots__ = ('mask',)
+
+    def __init__(self, morphemes: Iterable[Morpheme]):
+        super().__init__()
+        self.mask = 0
+        for morpheme in morphemes:
+            self.append(morpheme.id_)
+            self.mask |= 1 << morpheme.index
+
+    def __contains__(self, item) -> bool:
+        morpheme = morpheme_registry.get(item)
+        if morpheme is None:
+            return False
+        return bool(self.mask >> morpheme.index & 1)
+
+
 class Parse(NamedTuple):
     word: str
     lemma: str
     pos: str
-    morphemes: list[Morpheme]
+    morphemes: list[str]
     formatted: str
     """
     Parse result wrapper. Based on https://github.com/kmike/pymorphy2/blob/master/pymorphy2/analyzer.py
     """
 
+    @classmethod
+    def from_analysis(cls, word: str, analysis: SingleAnalysis, formatter: Formatter) -> "Parse":
+        morpheme_list = MorphemeList(m[0] for m in analysis.morphemes)
+        return cls(word, analysis.dict_item.lemma, analysis.pos.value, morpheme_list, formatter.format(analysis))
+
     def __contains__(self, item: str) -> bool:
         """
         Checks if a morpheme is contained in Parse morphemes
@@ -38,6 +70,54 @@ class Parse(NamedTuple):
         return len(self.morphemes)
 
 
+class LazyParse:
+    """
+    Analysis of a word with the fields of a `Parse`, returned by `MorphAnalyzer.analyze` with `lazy=True`.
+    `pos`, `morphemes` and `formatted` are calculated from the `analysis` when they are first accessed,
+    so formatting costs nothing if the formatted string is not used. `to_parse` returns the `Parse`.
+    """
+    __slots__ = ('word', 'lemma', 'analysis', 'formatter', '_pos', '_morphemes', '_formatted')
+
+    def __init__(self, word: str, analysis: SingleAnalysis, formatter: Formatter):
+        self.word = word
+        self.lemma = analysis.dict_item.lemma
+        self.analysis = analysis
+        self.formatter = formatter
+        self._pos: "str | None" = None
+        self._morphemes: "MorphemeList | None" = None
+        self._formatted: "str | None" = None
+
+    @property
+    def pos(self) -> str:
+        if self._pos is None:
+            self._pos = self.analysis.pos.value
+        return self._pos
+
+    @property
+    def morphemes(self) -> list[str]:
+        if self._morphemes is None:
+            self._morphemes = MorphemeList(m[0] for m in self.analysis.morphemes)
+        return self._morphemes
+
+    @property
+    def formatted(self) -> str:
+        if self._formatted is None:
+            self._formatted = self.formatter.format(self.analysis)
+        return self._formatted
+
+    def to_parse(self) -> Parse:
+        return Parse(self.word, self.lemma, self.pos, self.morphemes, self.formatted)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.morphemes
+
+    def __len__(self):
+        return len(self.morphemes)
+
+    def __repr__(self):
+        return f"LazyParse(word={self.word!r}, lemma={self.lemma!r}, analysis={self.analysis})"
+
+
 def _normalize(word: str) -> str:
     word = tr.normalize_circumflex(tr.lower(word))
     # TODO: Decide what to do with apostrophes
@@ -49,6 +129,14 @@ def _tokenize_text(text: str) -> list[str]:
     return word_tokenize(text.replace("'", "").replace("’", ""), language="turkish")
 
 
+def _pos_set(pos: "str | PrimaryPos | Iterable[str | PrimaryPos] | None") -> "frozenset[PrimaryPos] | None":
+    if pos is None:
+        return None
+    if isinstance(pos, (str, PrimaryPos)):
+        pos = [pos]
+    return frozenset(PrimaryPos(p) for p in pos)
+
+
 class MorphAnalyzer:
     """
     Morphological analyzer for Turkish language.
@@ -67,11 +155,38 @@ class MorphAnalyzer:
 
         >>> lemmer.add_dictionary('/path/to/file')
 
+    Analyses of a known vocabulary can be compiled in advance with
+    :func:`zeyrek.vocabulary.compile_vocabulary` (or ``zeyrek compile-vocabulary`` command).
+    Words found in the compiled table are not searched again:
+
+        >>> lemmer = zeyrek.MorphAnalyzer(analysis_table='/path/to/table')
+
+    Analyses can also be stored in a persistent cache, shared between runs and processes:
+
+        >>> lemmer = zeyrek.MorphAnalyzer(cache='/path/to/cache.sqlite')
+
+    Instead of the default dictionaries, a `profile` of dictionaries can be loaded, see `RootLexicon.PROFILES`.
+    With "standard" profile, large proper noun dictionaries are only loaded when the first capitalized word
+    is analyzed, and they are only used for capitalized words. "minimal" profile does not use them at all:
+
+        >>> lemmer = zeyrek.MorphAnalyzer(profile='minimal')
+
     TrLemmer can analyze or lemmatize words and sentences.
 
         >>> lemmer.lemmatize('beyazlaştırmak')
         ['beyaz']
 
+    Both can be restricted to analyses with some parts of speech, which is faster than filtering
+    the results, as other analyses are not searched:
+
+        >>> lemmer.lemmatize('okuma', pos='Verb')
+        ['okumak']
+
+    It can also generate word forms of dictionary items with given morphemes, or whole paradigms:
+
+        >>> lemmer.generate('elma_Noun', ['A3pl', 'P1pl', 'Dat'])
+        ['elmalarımıza']
+
     #TODO: Add analysis for words with apostrophes
     Methods should be:
     analyze: public method, takes in a string with one/more words, returns list of lists of Parses.
@@ -87,7 +202,18 @@ class MorphAnalyzer:
         lexicon: "RootLexicon | None" = None,
         formatter: "Formatter | None" = None,
         return_all_lemmas: bool = False,
+        analysis_table: "str | Path | AnalysisTable | None" = None,
+        cache: "str | Path | AnalysisCache | None" = None,
+        profile: "str | None" = None,
     ):
+        # optional dictionaries loaded when the first capitalized word is analyzed.
+        self.deferred_dictionaries: tuple[str, ...] = ()
+        self._deferred_analyzer: "MorphAnalyzer | None" = None
+        if profile is not None:
+            if lexicon is not None:
+                raise ValueError("Either a lexicon or a dictionary profile can be given")
+            lexicon = RootLexicon.from_profile(profile)
+            self.deferred_dictionaries = RootLexicon.get_profile(profile).deferred
         self.lexicon = lexicon or RootLexicon.default_text_dictionaries()
 
         self.morphotactics = TurkishMorphotactics(self.lexicon)
@@ -98,11 +224,118 @@ class MorphAnalyzer:
             else MorphAnalyzer.formatters[formatter]()
         )
         self.return_all_lemmas = return_all_lemmas
+        self.analysis_table: "AnalysisTable | None" = None
+        # compiled analyses of words starting with these stems are outdated after lexicon changes.
+        self._stale_prefixes: frozenset[str] = frozenset()
+        if analysis_table is not None:
+            self.load_analysis_table(analysis_table)
+        self.cache = cache if cache is None or isinstance(cache, AnalysisCache) else AnalysisCache(cache)
+        self.generator = WordGenerator(self.morphotactics)
+
+    def load_analysis_table(self, analysis_table: "str | Path | AnalysisTable"):
+        """
+        Sets a table of precompiled analyses to use before searching.
+        Table should be compiled with the same lexicon as the analyzer has.
+        :param analysis_table: AnalysisTable or path to the table file
+        """
+        if not isinstance(analysis_table, AnalysisTable):
+            analysis_table = AnalysisTable(analysis_table)
+        analysis_table.check_lexicon(self.lexicon)
+        self.analysis_table = analysis_table
+        self._stale_prefixes = frozenset()
 
-    def _parse(self, word: str) -> list[SingleAnalysis]:
+    def _parse(self, word: str, pos: "frozenset[PrimaryPos] | None" = None) -> list[SingleAnalysis]:
         """ Parses a word and returns SingleAnalysis result. """
-        normalized_word = _normalize(word)
-        return self.analyzer.analyze(normalized_word)
+        return self._parse_many([word], pos)[0]
+
+    def _parse_many(self, words: list[str], pos: "frozenset[PrimaryPos] | None" = None) -> list[list[SingleAnalysis]]:
+        """
+        Parses words and returns a list of SingleAnalysis results for each of them.
+        Capitalized words are parsed with the deferred dictionaries of the profile, if there are any.
+        """
+        if not self.deferred_dictionaries or not any(word[:1].isupper() for word in words):
+            return self._parse_words(words, pos)
+        capitalized = [word for word in words if word[:1].isupper()]
+        analyses = dict(zip(capitalized, self.deferred_analyzer._parse_words(capitalized, pos)))
+        lowercase = [word for word in words if word not in analyses]
+        analyses.update(zip(lowercase, self._parse_words(lowercase, pos)))
+        return [analyses[word] for word in words]
+
+    @property
+    def deferred_analyzer(self) -> "MorphAnalyzer":
+        """
+        Overlay of this analyzer with the deferred dictionaries of the profile, loaded on first access.
+        """
+        if self._deferred_analyzer is None:
+            resources = RootLexicon.optional_resources(self.deferred_dictionaries)
+            lexicon = RootLexicon.from_resources(resources)
+            view = self.overlay(lexicon.items)
+            view.lexicon.diagnostics.merge(lexicon.diagnostics)
+            view.deferred_dictionaries = ()
+            self._deferred_analyzer = view
+        return self._deferred_analyzer
+
+    def _parse_words(self, words: list[str], pos: "frozenset[PrimaryPos] | None" = None) -> list[list[SingleAnalysis]]:
+        """
+        Parses words with the lexicon of the analyzer.
+        Analyses are taken from the analysis table or the cache first, only the remaining words
+        are searched. Search results are added to the cache.
+        If `pos` is given, only analyses with these parts of speech are returned. Searches are restricted
+        to them, so their results are not added to the cache.
+        """
+        normalized_words = [_normalize(word) for word in words]
+        analyses: dict[str, list[SingleAnalysis]] = {}
+        if self.analysis_table is not None:
+            for word in normalized_words:
+                if word not in analyses and not starts_with_any(word, self._stale_prefixes):
+                    word_analyses = self.analysis_table.get(word, self.lexicon)
+                    if word_analyses is not None:
+                        analyses[word] = word_analyses
+        missing = [word for word in dict.fromkeys(normalized_words) if word not in analyses]
+        if self.cache is not None and missing:
+            analyses.update(self.cache.get_many(missing, self.lexicon))
+            missing = [word for word in missing if word not in analyses]
+        if pos is not None:
+            analyses = {word: [a for a in word_analyses if a.pos in pos] for word, word_analyses in analyses.items()}
+        searched = {word: self.analyzer.analyze(word, pos) for word in missing}
+        analyses.update(searched)
+        if self.cache is not None and searched and pos is None:
+            self.cache.put_many(searched, self.lexicon)
+        return [analyses[word] for word in normalized_words]
+
+    def query(
+        self,
+        word: str,
+        predicate: "str | Iterable[str] | Callable[[list[Morpheme]], bool] | MorphemeQuery",
+        all_analyses: bool = False,
+    ) -> bool:
+        """
+        Checks if some analysis of a word has a morpheme feature, without building all analyses.
+        Search stops as soon as the answer is known.
+
+            >>> lemmer.query('evlerden', 'Abl')
+            True
+
+        :param word: a single word
+        :param predicate: id of a morpheme, e.g. 'Abl', 'Neg', ids of several morphemes one of which should be
+        in the analysis, or a function taking the list of morphemes of an analysis, see `MorphemeQuery`.
+        :param all_analyses: if True, checks that all analyses satisfy the predicate instead.
+        :return: False if the word has no analyses
+        """
+        if not isinstance(predicate, MorphemeQuery):
+            predicate = MorphemeQuery(predicate)
+        if self.deferred_dictionaries and word[:1].isupper():
+            return self.deferred_analyzer.query(word, predicate, all_analyses)
+        word = _normalize(word)
+        analyses = None
+        if self.analysis_table is not None and not starts_with_any(word, self._stale_prefixes):
+            analyses = self.analysis_table.get(word, self.lexicon)
+        if analyses is None and self.cache is not None:
+            analyses = self.cache.get_many([word], self.lexicon).get(word)
+        if analyses is None:
+            return self.analyzer.query(word, predicate, all_analyses)
+        matches = [predicate.matches_analysis(a) for a in analyses]
+        return len(matches) > 0 and all(matches) if all_analyses else any(matches)
 
     def _analyze_text(self, text, verbose=False):
         result = []
@@ -112,41 +345,59 @@ class MorphAnalyzer:
             result.append((sentence, sentence_analysis))
         return result
 
-    def analyze(self, text: str) -> list[list[Parse]]:
+    def analyze(
+        self, text: str, pos: "str | PrimaryPos | Iterable[str | PrimaryPos] | None" = None, lazy: bool = False
+    ) -> "list[list[Parse]] | list[list[Parse | LazyParse]]":
         """
         Public method that returns a list of analyses for each word in given text
         :param text: Text to analyze
+        :param pos: part of speech, e.g. 'Noun', 'Verb', 'Adj', or several of them. If given, only analyses
+        with these parts of speech are returned, other analyses are not searched.
+        :param lazy: if True, found analyses are returned as `LazyParse` objects, which are formatted only
+        when their `formatted` field is read. Words without analyses still get an 'Unk' Parse.
         :return: List of lists of Parse objects for each word
         """
+        return self._analyze_words(_tokenize_text(text), _pos_set(pos), lazy)
+
+    def _analyze_words(
+        self, words: list[str], pos: "frozenset[PrimaryPos] | None" = None, lazy: bool = False
+    ) -> "list[list[Parse]] | list[list[Parse | LazyParse]]":
+        """ Returns a list of analyses for each of the tokenized `words`. """
+        make_parse = LazyParse if lazy else Parse.from_analysis
         result = []
-        for word in _tokenize_text(text):
-            analysis = self._parse(word)
+        for word, analysis in zip(words, self._parse_many(words, pos)):
             if len(analysis) == 0:
                 result.append([Parse(word, 'Unk', 'Unk', ['Unk'], 'Unk')])
+                continue
             word_analysis = []
             for a in analysis:
                 if a is not None:
-                    formatted = self.formatter.format(a)
-                    morpheme_list = [m[0].id_ for m in a.morphemes]
-                    word_analysis.append(Parse(word, a.dict_item.lemma, a.pos.value, morpheme_list, formatted))
+                    word_analysis.append(make_parse(word, a, self.formatter))
                 else:
                     word_analysis.append(Parse(word, 'Unk', 'Unk', ["Unk"], 'Unk'))
             result.append(word_analysis)
         return result
 
-    def lemmatize(self, text: str) -> "list[tuple[str, list]] | list[str]":
+    def lemmatize(
+        self, text: str, pos: "str | PrimaryPos | Iterable[str | PrimaryPos] | None" = None
+    ) -> "list[tuple[str, list]] | list[str]":
         """
         This method will eventually use some form of disambiguation for lemmatizing.
         Currently, it simply returns all lemmas available for each word of the text.
         :param text: The text which needs lemmatization.
+        :param pos: part of speech or parts of speech of analyses to take lemmas from, see `analyze`.
         :return: A list of tuples: sentence and a list of list of
         lemmas for all words of the text
         """
+        return self._lemmatize_words(_tokenize_text(text), _pos_set(pos))
+
+    def _lemmatize_words(
+        self, words: list[str], pos: "frozenset[PrimaryPos] | None" = None
+    ) -> "list[tuple[str, list]] | list[str]":
+        """ Returns lemmas of the tokenized `words`, see `lemmatize`. """
         return_all_lemmas = self.return_all_lemmas
         result = []
-        words = _tokenize_text(text)
-        for word in words:
-            analysis = self._parse(word)
+        for word, analysis in zip(words, self._parse_many(words, pos)):
             if return_all_lemmas:
                 if len(analysis) == 0:
                     word_lemmas = [word]
@@ -161,6 +412,47 @@ class MorphAnalyzer:
                 result.append(analysis[0].dict_item.lemma if analysis else word)
         return result
 
+    def _owner(self, item_id: str) -> "MorphAnalyzer":
+        """ Returns this analyzer, or the deferred analyzer if the item is only in the deferred dictionaries. """
+        if self.deferred_dictionaries and self.lexicon.get_item_by_id(item_id) is None:
+            return self.deferred_analyzer
+        return self
+
+    def _get_item(self, item_id: str) -> DictionaryItem:
+        item = self.lexicon.get_item_by_id(item_id)
+        if item is None:
+            raise ValueError(f"No dictionary item with id {item_id}")
+        return item
+
+    def generate(self, item_id: str, morphemes: Iterable[str]) -> list[str]:
+        """
+        Generates word forms of a dictionary item with the given morphemes.
+        :param item_id: id of the dictionary item, e.g. 'elma_Noun', 'gelmek_Verb'
+        :param morphemes: ids of morphemes after the root, e.g. ['A3pl', 'P1pl', 'Dat']. Morphemes without
+        surfaces, such as 'A3sg', 'Pnon' and 'Nom', can be left out.
+        :return: list of word forms, usually with a single form
+        """
+        owner = self._owner(item_id)
+        return list(dict.fromkeys(r.surface for r in owner.generator.generate(owner._get_item(item_id), morphemes)))
+
+    def paradigm(
+        self, item_id: str, morpheme_sequences: "Iterable[Iterable[str]] | None" = None
+    ) -> dict[tuple[str, ...], list[str]]:
+        """
+        Generates word forms of a dictionary item for several morpheme sequences at once. Paradigms are cached,
+        so repeated requests for the same item are not generated again.
+        :param item_id: id of the dictionary item, e.g. 'elma_Noun'
+        :param morpheme_sequences: sequences of morpheme ids as in `generate`. By default, all numbers,
+        possessives and cases of nouns, or persons of simple tenses of verbs.
+        :return: word forms for each morpheme sequence, as a tuple
+        """
+        owner = self._owner(item_id)
+        paradigm = owner.generator.paradigm(owner._get_item(item_id), morpheme_sequences)
+        return {
+            sequence: list(dict.fromkeys(r.surface for r in results))
+            for sequence, results in paradigm.items()
+        }
+
     @staticmethod
     def filter_proper_nouns(word: str, analysis: list[SingleAnalysis]):
         if word[0].isupper():
@@ -172,7 +464,7 @@ class MorphAnalyzer:
                 analysis = without_proper_nouns
         return analysis
 
-    def add_dictionary(self, path_to_dictionary: str):
+    def add_dictionary(self, path_to_dictionary: str) -> LoadDiagnostics:
         """
         Adds a user-defined dictionary to use for analysis.
         Dictionary should be a text file with one word per line.
@@ -184,7 +476,108 @@ class MorphAnalyzer:
         List of possible root attributes can be found in :py:mod:`attributes.py`
         in :py:class:`~RootAttribute`
 
+        The dictionary can also be a binary file compiled with `zeyrek compile-dict`, which loads faster.
+
         :param path_to_dictionary: string path to the dictionary file
+        :return: problems found in the dictionary, such as duplicated ids. They are also added to
+            `lexicon.diagnostics`, the report of all dictionaries of the analyzer.
+        """
+        lexicon = RootLexicon.from_path(path_to_dictionary)
+        self.lexicon.diagnostics.merge(lexicon.diagnostics)
+        self.add_items(lexicon.items)
+        return lexicon.diagnostics
+
+    def add_items(self, items: Iterable[DictionaryItem]):
+        """
+        Adds dictionary items to the lexicon at runtime. Items with ids already in the lexicon are skipped.
+        Only cached and compiled analyses of words starting with stems of the items are invalidated.
+        """
+        self._change_items([], items)
+
+    def update_items(self, items: Iterable[DictionaryItem]):
+        """ Replaces dictionary items having the same ids as `items`, e.g. with different attributes. """
+        items = list(items)
+        self._change_items([self._get_item(item.id_) for item in items], items)
+
+    def remove_items(self, items: "Iterable[DictionaryItem | str]"):
+        """ Removes dictionary items, given as items or their ids, from the lexicon at runtime. """
+        self._change_items([self._get_item(item if isinstance(item, str) else item.id_) for item in items], [])
+
+    def _change_items(self, removed: list[DictionaryItem], added: Iterable[DictionaryItem]):
+        """
+        Removes and adds items, keeping the lexicon and stem transitions consistent. Cached analyses of
+        words starting with stems of the changed items are dropped, other analyses are carried over.
+        """
+        fingerprint = self.lexicon.fingerprint
+        deferred = self._deferred_analyzer
+        deferred_fingerprint = deferred.lexicon.fingerprint if deferred is not None else None
+        stem_transitions = self.morphotactics.stem_transitions
+        stems = set()
+        changed_ids = set()
+        for item in removed:
+            item = self.lexicon.remove(item)
+            stems.update(transition.surface for transition in stem_transitions.remove_dict_item(item))
+            changed_ids.add(item.id_)
+        for item in added:
+            self.lexicon.add(item)
+            # items with ids already in the lexicon are not added.
+            if self.lexicon.get_item_by_id(item.id_) is item:
+                stems.update(transition.surface for transition in stem_transitions.add_dict_item(item))
+                changed_ids.add(item.id_)
+        if not changed_ids:
+            return
+        self.generator.clear_cache(changed_ids)
+        # compiled analyses of these words may be missing analyses of the new items, or refer to removed ones.
+        self._stale_prefixes = self._stale_prefixes | stems
+        if self.cache is not None:
+            self.cache.carry_over(fingerprint, self.lexicon, stems)
+        if deferred is not None:
+            deferred._sync_base_items(deferred_fingerprint, changed_ids, set(stems))
+
+    def _sync_base_items(self, fingerprint: str, changed_ids: "set[str]", stems: "set[str]"):
+        """
+        Updates an overlay after items with `changed_ids` of its base lexicon were changed. The base lexicon
+        and stem transitions are shared, so only overlay items with ids now in the base are removed, as they
+        would not have been added to a new overlay, and the cached state of the overlay is updated.
+        """
+        lexicon = self.lexicon
+        stem_transitions = self.morphotactics.stem_transitions
+        for id_ in changed_ids:
+            item = lexicon.id_dict.get(id_)
+            if item is not None and id_ in lexicon.base.id_dict:
+                stems.update(transition.surface for transition in stem_transitions.remove_dict_item(item))
+                lexicon.remove(item)
+        # fingerprint of the overlay includes the fingerprint of the base.
+        lexicon._fingerprint = None
+        self.generator.clear_cache(changed_ids)
+        self._stale_prefixes = self._stale_prefixes | stems
+        if self.cache is not None:
+            self.cache.carry_over(fingerprint, lexicon, stems)
+
+    def overlay(self, items: "Iterable[DictionaryItem]" = ()) -> "MorphAnalyzer":
+        """
+        Returns an analyzer with a `LexiconOverlay` of this analyzer's lexicon, e.g. for a user dictionary
+        of one customer. The lexicon, stems and morpheme graph of this analyzer are shared and never modified,
+        so creating an overlay is cheap. Dictionaries added to the overlay with `add_dictionary` are only
+        used by it, and overlays can be overlaid again, for example to add items for a single request:
+
+            >>> customer = lemmer.overlay(RootLexicon.from_lines(['blokzincir']).items)
+            >>> customer.lemmatize('blokzincirler')
+            [('blokzincirler', ['blokzincir'])]
+
+        The analysis table and the cache are shared, cached analyses are kept separately for each lexicon.
+        :param items: dictionary items to add to the overlay
         """
-        lexicon_from_path = self.lexicon.add_dictionary_from_path(path_to_dictionary)
-        self.morphotactics.stem_transitions.add_lexicon_items(lexicon_from_path.items)
+        lexicon = LexiconOverlay(self.lexicon, items)
+        view = copy.copy(self)
+        view.lexicon = lexicon
+        view.morphotactics = self.morphotactics.overlay(lexicon)
+        view.analyzer = RuleBasedAnalyzer(view.morphotactics)
+        view.generator = WordGenerator(view.morphotactics, self.generator.cache_size)
+        view._deferred_analyzer = None
+        if lexicon.overlay_items:
+            # compiled analyses do not contain analyses with the new items.
+            stem_transitions = view.morphotactics.stem_transitions
+            stems = set(stem_transitions.single_stems) | set(stem_transitions.multi_stems)
+            view._stale_prefixes = self._stale_prefixes | stems
+        return view
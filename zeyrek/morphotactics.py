@@ -1,4 +1,6 @@
-from typing import NamedTuple
+import copy
+import sys
+from typing import Iterable, Iterator, NamedTuple
 
 # sys.path.pop(0)
 # print(sys.path)
@@ -11,6 +13,8 @@ from zeyrek.attributes import (
     RootAttribute,
     SecondaryPos,
     calculate_phonetic_attributes,
+    intern_attributes,
+    suffix_phonetic_attributes,
 )
 from zeyrek.conditions import (
     Condition,
@@ -40,8 +44,11 @@ from zeyrek.conditions import (
     HasTail,
     HasAnySuffixSurface,
     PreviousStateIsNot,
+    evaluate_stem_conditions,
+    stem_conditions,
 )
-from zeyrek.lexicon import DictionaryItem, RootLexicon
+from zeyrek.diagnostics import LoadDiagnostics
+from zeyrek.lexicon import DictionaryItem, LexiconOverlay, RootLexicon
 
 
 class Morpheme(NamedTuple):
@@ -50,10 +57,15 @@ class Morpheme(NamedTuple):
     pos: "PrimaryPos | None"
     derivational: bool = False
     informal: bool = False
+    # dense integer id assigned by `add_morpheme`, used in bit masks of morphemes.
+    index: int = -1
 
     def __eq__(self, other):
         return self.id_ == other.id_
 
+    def __hash__(self):
+        return hash(self.id_)
+
 
 class MorphemeState:
     def __init__(self, id_: str, morpheme: Morpheme, terminal=False, derivative=False, pos_root=False):
@@ -64,10 +76,36 @@ class MorphemeState:
         self.pos_root = pos_root
         self.outgoing: list[MorphemeTransition] = []
         self.incoming: list[SuffixTransition] = []
+        # outgoing transitions not rejected by stem conditions and their remaining conditions, by stem signature.
+        self._stem_transitions: "dict[int, list[tuple[SuffixTransition, Condition | bool]]] | None" = None
 
     def __str__(self):
         return f"[{self.id_}:{self.morpheme.id_}]"
 
+    def transitions_for_stem(self, stem_transition: "StemTransition") -> "list[tuple[SuffixTransition, Condition | bool]]":
+        """
+        Returns outgoing suffix transitions that paths starting with `stem_transition` may pass, with their
+        conditions left after evaluating the stem dependent parts (see `SuffixTransition.stem_condition`).
+        """
+        if self._stem_transitions is None:
+            # stem conditions of all transitions are registered first, so stem signatures cover them.
+            for transition in self.outgoing:
+                if isinstance(transition, SuffixTransition) and transition.condition is not None:
+                    transition.condition.register()
+            self._stem_transitions = {}
+        signature = stem_transition.condition_signature
+        result = self._stem_transitions.get(signature)
+        if result is None:
+            result = []
+            for transition in self.outgoing:
+                if not isinstance(transition, SuffixTransition):
+                    continue
+                condition = transition.stem_condition(stem_transition)
+                if condition is not False:
+                    result.append((transition, condition))
+            self._stem_transitions[signature] = result
+        return result
+
     def __repr__(self):
         return f"MorphemeState({self.id_}, {self.morpheme.id_})"
 
@@ -78,12 +116,12 @@ class MorphemeState:
                 continue
 
             self.outgoing.append(transition)
+        self._stem_transitions = None
         return self
 
     def add_incoming(self, suffix_transitions: list["SuffixTransition"]):
         for transition in suffix_transitions:
             if transition in self.incoming:
-                print(f"Incoming transition {transition} already exists in {self}")
                 continue
             self.incoming.append(transition)
         return self
@@ -119,14 +157,18 @@ class MorphemeState:
 
         for transition in transitions:
             self.outgoing.remove(transition)
+        self._stem_transitions = None
 
 
 morphemes: dict[str, Morpheme] = {}
+# registered morphemes by their index.
+morpheme_list: list[Morpheme] = []
 
 
 def add_morpheme(*data):
-    morpheme = Morpheme(*data)
+    morpheme = Morpheme(*data, index=len(morpheme_list))
     morphemes[morpheme.id_] = morpheme
+    morpheme_list.append(morpheme)
     return morpheme
 
 
@@ -812,16 +854,14 @@ class StemTransitionsMapBased:
     def add_lexicon_items(self, items: list[DictionaryItem]):
         for dict_item in items:
             if dict_item is None:
-                print(dict_item)
+                self.lexicon.diagnostics.add(LoadDiagnostics.INVALID_ITEM, dict_item)
             else:
                 self.add_dict_item(dict_item)
 
     def generate_transitions(self, dict_item: DictionaryItem) -> list["StemTransition"]:
 
         def has_modifier_attribute(item: DictionaryItem):
-            return any(
-                attr in StemTransitionsMapBased.modifiers for attr in item.attributes
-            )
+            return not item.attributes.isdisjoint(StemTransitionsMapBased.modifiers)
 
         if dict_item.id_ in StemTransitionsMapBased.special_roots:
             return self.handle_special_roots(dict_item)
@@ -839,7 +879,9 @@ class StemTransitionsMapBased:
         modified_attrs = original_attrs.copy()
         modified_root_state_value: "MorphemeState | None" = None
         unmodified_root_state = None
-        for attr in dict_item.attributes:
+        # attributes are applied in their declaration order, so that result does not depend on set ordering.
+        # For example, `ret` with Voicing and Doubling attributes should produce `redd`, not `retd`.
+        for attr in sorted(dict_item.attributes, key=lambda a: a.value):
             if attr == RootAttribute.Voicing:
                 last = dict_item.pronunciation[-1]
                 voiced = tr.voice(last)
@@ -944,33 +986,34 @@ class StemTransitionsMapBased:
                 raise ValueError(f"No root morpheme state found for {dict_item}")
 
             m = dict_item.root[:-1]
+            modified_attrs = calculate_phonetic_attributes(m)
+            modified_attrs.add(PhoneticAttribute.ExpectsConsonant)
+            modified_attrs.add(PhoneticAttribute.CannotTerminate)
             modified = StemTransition(
                 dict_item,
                 root_for_modified,
-                calculate_phonetic_attributes(m),
+                modified_attrs,
                 surface=m,
             )
-            modified.attrs.add(PhoneticAttribute.ExpectsConsonant)
-            modified.attrs.add(PhoneticAttribute.CannotTerminate)
             return [original, modified]
         elif item_id in ["ben_Pron_Pers", "sen_Pron_Pers"]:
-            original = StemTransition(dict_item, unmodified_root_state, original_attrs)
+            original = StemTransition(
+                dict_item, unmodified_root_state, original_attrs | {PhoneticAttribute.UnModifiedPronoun}
+            )
             if dict_item.lemma == "ben":
                 modified = StemTransition(
                     dict_item,
                     pronPers_Mod_S,
-                    calculate_phonetic_attributes("ban"),
+                    calculate_phonetic_attributes("ban") | {PhoneticAttribute.ModifiedPronoun},
                     surface="ban",
                 )
             else:
                 modified = StemTransition(
                     dict_item,
                     pronPers_Mod_S,
-                    calculate_phonetic_attributes("san"),
+                    calculate_phonetic_attributes("san") | {PhoneticAttribute.ModifiedPronoun},
                     surface="san",
                 )
-            original.attrs.add(PhoneticAttribute.UnModifiedPronoun)
-            modified.attrs.add(PhoneticAttribute.ModifiedPronoun)
             return [original, modified]
         elif item_id in ["demek_Verb", "yemek_Verb"]:
             original = StemTransition(dict_item, vDeYeRoot_S, original_attrs)
@@ -993,16 +1036,16 @@ class StemTransitionsMapBased:
             original = StemTransition(dict_item, imekRoot_S, original_attrs)
             return [original]
         elif item_id in special_item_dict:
-            original = StemTransition(dict_item, pronQuant_S, original_attrs)
+            original = StemTransition(
+                dict_item, pronQuant_S, original_attrs | {PhoneticAttribute.UnModifiedPronoun}
+            )
             modified_root = special_item_dict[item_id]
             modified = StemTransition(
                 dict_item,
                 pronQuantModified_S,
-                calculate_phonetic_attributes(modified_root),
+                calculate_phonetic_attributes(modified_root) | {PhoneticAttribute.ModifiedPronoun},
                 surface=modified_root,
             )
-            original.attrs.add(PhoneticAttribute.UnModifiedPronoun)
-            modified.attrs.add(PhoneticAttribute.ModifiedPronoun)
             return [original, modified]
         else:
             raise ValueError(
@@ -1023,16 +1066,21 @@ class StemTransitionsMapBased:
     def remove_stem_node(self, stem_transition: 'StemTransition'):
         surface_form = stem_transition.surface
         if surface_form in self.multi_stems:
-            self.multi_stems["surface_form"].remove(stem_transition)
+            transitions = [
+                transition for transition in self.multi_stems[surface_form] if transition != stem_transition
+            ]
+            if len(transitions) > 1:
+                self.multi_stems[surface_form] = transitions
+            else:
+                self.multi_stems.pop(surface_form)
+                if transitions:
+                    self.single_stems[surface_form] = transitions[0]
         elif (
             surface_form in self.single_stems
-            and self.single_stems["surface_form"].dict_item == stem_transition.dict_item
+            and self.single_stems[surface_form].dict_item == stem_transition.dict_item
         ):
             self.single_stems.pop(surface_form)
 
-        # if (!differentStemItems.containsEntry(stemTransition.item, stemTransition)) {
-        #   differentStemItems.remove(stemTransition.item, stemTransition)
-
     def transitions_from_stem(self, stem: str) -> list['StemTransition']:
         if stem in self.single_stems:
             return [self.single_stems.get(stem)]
@@ -1041,6 +1089,12 @@ class StemTransitionsMapBased:
         else:
             return []
 
+    def all_transitions(self) -> Iterator['StemTransition']:
+        """ Iterates over all stem transitions in the index. """
+        yield from self.single_stems.values()
+        for transitions in self.multi_stems.values():
+            yield from transitions
+
     def prefix_matches(self, prefix: str) -> list['StemTransition']:
         matches = []
         current_string = ""
@@ -1059,23 +1113,132 @@ class StemTransitionsMapBased:
             if transition.dict_item == dict_item
         ]
 
-    def add_dict_item(self, dict_item: DictionaryItem):
+    def add_dict_item(self, dict_item: DictionaryItem) -> list["StemTransition"]:
+        """ Adds stem transitions of the item to the index and returns them. """
         transitions = self.generate_transitions(dict_item)
         if transitions is None:
-            print(f"Transitions are none for {dict_item}")
+            self.lexicon.diagnostics.add(LoadDiagnostics.NO_TRANSITIONS, dict_item.id_)
+            return []
         for transition in transitions:
+            if transition.surface and tr.is_upper(transition.surface[0]):
+                self.lexicon.diagnostics.add(LoadDiagnostics.CAPITALIZED_STEM, transition.surface)
             self.add_stem_transition(transition)
         if len(transitions) > 1 or (
             len(transitions) == 1 and dict_item.root != transitions[0].surface
         ):
             self.different_stem_items[dict_item] = transitions
+        return transitions
 
-    def remove_dict_item(self, dict_item: DictionaryItem):
-        transitions = self.generate_transitions(dict_item)
+    def remove_dict_item(self, dict_item: DictionaryItem) -> list["StemTransition"]:
+        """ Removes stem transitions of the item from the index and returns them. """
+        transitions = self.transitions_from_item(dict_item)
         for transition in transitions:
             self.remove_stem_node(transition)
+        self.different_stem_items.pop(dict_item, None)
+        return transitions
+
+
+class StemTransitionsOverlay(StemTransitionsMapBased):
+    """
+    Stem transitions of the items of a `LexiconOverlay`, layered over the transitions of its base lexicon.
+    The `base` index is shared and not modified, only the overlay items are indexed.
+    """
+
+    def __init__(self, base: StemTransitionsMapBased, morphotactics: "TurkishMorphotactics"):
+        self.base = base
+        self.lexicon: LexiconOverlay = morphotactics.lexicon
+        self.morphotactics = morphotactics
+        self.multi_stems: dict[str, list[StemTransition]] = {}
+        self.single_stems: dict[str, StemTransition] = {}
+        self.different_stem_items: dict[DictionaryItem, list[StemTransition]] = {}
+        self.add_lexicon_items(self.lexicon.overlay_items)
+
+    def transitions_from_stem(self, stem: str) -> list['StemTransition']:
+        transitions = super().transitions_from_stem(stem)
+        if not transitions:
+            return self.base.transitions_from_stem(stem)
+        return self.base.transitions_from_stem(stem) + transitions
+
+    def all_transitions(self) -> Iterator['StemTransition']:
+        yield from self.base.all_transitions()
+        yield from super().all_transitions()
+
+    def transitions_from_item(self, dict_item: DictionaryItem) -> list['StemTransition']:
+        # items of the base can be equal to overlay items, e.g. when added to the base later.
+        if self.lexicon.id_dict.get(dict_item.id_) is not dict_item:
+            return self.base.transitions_from_item(dict_item)
         if dict_item in self.different_stem_items:
-            self.different_stem_items.pop(dict_item)
+            return self.different_stem_items.get(dict_item)
+        transitions = StemTransitionsMapBased.transitions_from_stem(self, dict_item.root)
+        return [transition for transition in transitions if transition.dict_item is dict_item]
+
+
+def final_pos_of_states(root_states: "Iterable[MorphemeState]") -> dict[MorphemeState, frozenset[PrimaryPos]]:
+    """
+    Calculates parts of speech of analyses that can end after each state reachable from `root_states`.
+    Part of speech of an analysis is the first part of speech morpheme of its last inflectional group,
+    so states are paired with the part of speech of their group, None right after a derivation.
+    """
+    group_pos: dict[MorphemeState, set] = {state: {state.morpheme.pos} for state in root_states}
+    pending = list(group_pos)
+    while pending:
+        state = pending.pop()
+        for transition in state.outgoing:
+            to_ = transition.to_
+            morpheme = to_.morpheme
+            for pos in list(group_pos[state]):
+                if morpheme.derivational:
+                    pos = None
+                elif pos is None:
+                    pos = morpheme.pos
+                known = group_pos.setdefault(to_, set())
+                if pos not in known:
+                    known.add(pos)
+                    pending.append(to_)
+
+    # parts of speech reachable from (state, part of speech of the group) pairs, until nothing changes.
+    reachable = {
+        (state, pos): ({pos} if state.terminal and pos is not None else set())
+        for state, pos_set in group_pos.items() for pos in pos_set
+    }
+    changed = True
+    while changed:
+        changed = False
+        for (state, pos), final in reachable.items():
+            size = len(final)
+            for transition in state.outgoing:
+                morpheme = transition.to_.morpheme
+                next_pos = None if morpheme.derivational else (morpheme.pos if pos is None else pos)
+                final |= reachable[(transition.to_, next_pos)]
+            if len(final) != size:
+                changed = True
+    result: dict[MorphemeState, set] = {}
+    for (state, _), final in reachable.items():
+        result.setdefault(state, set()).update(final)
+    return {state: frozenset(final) for state, final in result.items()}
+
+
+def reachable_morphemes_of_states(root_states: "Iterable[MorphemeState]") -> dict[MorphemeState, int]:
+    """ Calculates masks of morphemes that can follow each state reachable from `root_states`. """
+    states = list(root_states)
+    reachable: dict[MorphemeState, int] = {state: 0 for state in states}
+    while states:
+        state = states.pop()
+        for transition in state.outgoing:
+            if transition.to_ not in reachable:
+                reachable[transition.to_] = 0
+                states.append(transition.to_)
+    changed = True
+    while changed:
+        changed = False
+        for state, mask in reachable.items():
+            new_mask = mask
+            for transition in state.outgoing:
+                new_mask |= 1 << transition.to_.morpheme.index | reachable[transition.to_]
+            if new_mask != mask:
+                reachable[state] = new_mask
+                changed = True
+    return reachable
 
 
 class TurkishMorphotactics:
@@ -1092,6 +1255,48 @@ class TurkishMorphotactics:
             "şöyle_Adv": advForVerbDeriv_ST,
         }
         self.stem_transitions = StemTransitionsMapBased(self)
+        # parts of speech of analyses that may end after each state, calculated on first use.
+        self._final_pos: dict[MorphemeState, frozenset[PrimaryPos]] = {}
+        # masks of morphemes of states reachable from each state, calculated on first use.
+        self._reachable_morphemes: dict[MorphemeState, int] = {}
+
+    def overlay(self, lexicon: LexiconOverlay) -> "TurkishMorphotactics":
+        """
+        Returns morphotactics for a `lexicon` overlaid on the lexicon of this one. The morpheme graph and
+        stem transitions of this instance are shared, only stems of the overlay items are generated.
+        """
+        if lexicon.base is not self.lexicon:
+            raise ValueError("Overlay lexicon should be based on the lexicon of the morphotactics")
+        view = copy.copy(self)
+        view.lexicon = lexicon
+        view.stem_transitions = StemTransitionsOverlay(self.stem_transitions, view)
+        return view
+
+    def final_pos(self, state: MorphemeState) -> frozenset[PrimaryPos]:
+        """
+        Returns parts of speech that analyses passing the `state` may have. Transition conditions are
+        ignored, so the result can contain parts of speech that are never analyzed, but never misses one.
+        """
+        result = self._final_pos.get(state)
+        if result is None:
+            root_states = {stem_transition.to_ for stem_transition in self.stem_transitions.all_transitions()}
+            root_states.add(state)
+            self._final_pos = final_pos_of_states(root_states)
+            result = self._final_pos[state]
+        return result
+
+    def reachable_morphemes(self, state: MorphemeState) -> int:
+        """
+        Returns bit mask of morphemes of the states that can follow the `state`, see `Morpheme.index`.
+        Transition conditions are ignored.
+        """
+        result = self._reachable_morphemes.get(state)
+        if result is None:
+            root_states = {stem_transition.to_ for stem_transition in self.stem_transitions.all_transitions()}
+            root_states.add(state)
+            self._reachable_morphemes = reachable_morphemes_of_states(root_states)
+            result = self._reachable_morphemes[state]
+        return result
 
     def make_graph(self):
         self.connect_noun_states()
@@ -3260,6 +3465,7 @@ class MorphemeTransition:
     For example, if condition is HasPhoneticAttribute(LastLetterVowel), and SearchPath's last
     letter is a consonant, it cannot pass this transition.
     """
+    __slots__ = ('from_', 'to_', 'condition')
 
     def __init__(
         self, from_: MorphemeState, to_: MorphemeState, condition: "Condition | None" = None
@@ -3280,6 +3486,8 @@ class MorphemeTransition:
 
 
 class StemTransition(MorphemeTransition):
+    __slots__ = ('surface', 'dict_item', 'attrs', '_condition_signature', '_signature_size')
+
     def __init__(
         self,
         dict_item: DictionaryItem,
@@ -3288,19 +3496,27 @@ class StemTransition(MorphemeTransition):
         surface: "str | None" = None,
     ):
         super().__init__(root_S, to_, None)
-        if surface:
-            if tr.is_upper(surface[0]):
-                print(f"Something wrong, generating StemTransition capitalized: {surface}")
-        else:
-            if tr.is_upper(dict_item.root[0]):
-                print(f"Something ELSE is wrong: generating StemTransition capitalized from dictitem: {dict_item.root}")
-        self.surface = surface if surface is not None else dict_item.root
+        self.surface = sys.intern(surface) if surface is not None else dict_item.root
         self.dict_item = dict_item
-        self.attrs = (
+        # attributes are interned and shared by search paths, so they should not be modified.
+        self.attrs = intern_attributes(
             calculate_phonetic_attributes(dict_item.pronunciation)
             if attrs is None
-            else attrs.copy()
+            else attrs
         )
+        self._condition_signature = 0
+        self._signature_size = 0
+
+    @property
+    def condition_signature(self) -> int:
+        """
+        Outcomes of stem conditions for this stem, see `StemCondition`.
+        Calculated on first use and extended if new stem conditions are created later.
+        """
+        if self._signature_size != len(stem_conditions):
+            self._condition_signature |= evaluate_stem_conditions(self, self._signature_size)
+            self._signature_size = len(stem_conditions)
+        return self._condition_signature
 
     def __str__(self):
         return f"<(Dict: {self.dict_item}):{self.surface} → {self.to_}>"
@@ -3316,7 +3532,7 @@ class StemTransition(MorphemeTransition):
         )
 
     def __hash__(self):
-        return hash((self.surface, self.dict_item, frozenset(self.attrs)))
+        return hash((self.surface, self.dict_item, self.attrs))
 
 
 class SuffixTransition(MorphemeTransition):
@@ -3338,6 +3554,10 @@ class SuffixTransition(MorphemeTransition):
         self.condition = condition
         self.parse_conditions_from_template()
         self.token_list = list(SuffixTemplateTokenizer(self.surface_template))
+        # conditions left after evaluating stem dependent parts, by stem signature.
+        self._stem_conditions: "dict[int, Condition | bool] | None" = None
+        # shared SurfaceTransition objects of this transition, by surface.
+        self._surface_transitions: "dict[str, SurfaceTransition]" = {}
 
     def __str__(self):
         template_str = f":{self.surface_template}" if self.surface_template else ""
@@ -3359,6 +3579,23 @@ class SuffixTransition(MorphemeTransition):
     def can_pass(self, path: "SearchPath") -> bool:
         return self.condition is None or self.condition.accept(path)
 
+    def stem_condition(self, stem_transition: StemTransition) -> "Condition | bool":
+        """
+        Returns the condition of this transition with the parts depending only on the stem evaluated:
+        True or False if the stem decides the outcome, otherwise the condition that should be checked for the path.
+        """
+        if self.condition is None:
+            return True
+        if self._stem_conditions is None:
+            self.condition.register()
+            self._stem_conditions = {}
+        signature = stem_transition.condition_signature
+        result = self._stem_conditions.get(signature)
+        if result is None:
+            result = self.condition.partial(signature)
+            self._stem_conditions[signature] = result
+        return result
+
     def connect(self):
         self.from_.add_outgoing([self])
         self.to_.add_incoming([self])
@@ -3383,6 +3620,17 @@ class SuffixTransition(MorphemeTransition):
             else:
                 self.condition = c.and_(self.condition)
 
+    def surface_transition(self, surface: str) -> "SurfaceTransition":
+        """
+        Returns the SurfaceTransition of this transition with `surface`. A transition has only a few
+        surface forms, so SurfaceTransition objects are created once and shared by search paths.
+        """
+        node = self._surface_transitions.get(surface)
+        if node is None:
+            node = SurfaceTransition(surface, self)
+            self._surface_transitions[surface] = node
+        return node
+
     def get_copy(self):
         return SuffixTransition(
             self.from_, self.to_, self.surface_template, self.condition
@@ -3401,6 +3649,8 @@ class SuffixTransition(MorphemeTransition):
 
 
 class SurfaceTransition:
+    __slots__ = ('surface', 'lexical_transition')
+
     def __init__(self, surface: str, lexical_transition):
         self.surface = surface
         self.lexical_transition = lexical_transition
@@ -3544,14 +3794,19 @@ class SearchPath:
     and surviving paths are used for generating analysis results.
     :param tail: letters left to parse
     """
+    __slots__ = (
+        'tail', 'current_state', 'transitions', 'phonetic_attributes', 'terminal',
+        'contains_derivation', 'contains_suffix_with_surface', 'morpheme_mask',
+    )
 
     def __init__(
         self,
         tail: str,
         current_state: MorphemeState,
         transitions: list[SurfaceTransition],
-        phonetic_attributes: set[PhoneticAttribute],
+        phonetic_attributes: frozenset[PhoneticAttribute],
         terminal: bool,
+        morpheme_mask: int = 0,
     ):
         self.tail = tail
         self.current_state = current_state
@@ -3560,6 +3815,8 @@ class SearchPath:
         self.terminal = terminal
         self.contains_derivation = False
         self.contains_suffix_with_surface = False
+        # bits of indexes of the morphemes in transitions.
+        self.morpheme_mask = morpheme_mask
 
     @classmethod
     def initial(cls, stem_transition: StemTransition, tail: str) -> "SearchPath":
@@ -3572,6 +3829,7 @@ class SearchPath:
             morphemes_,
             stem_transition.attrs,
             stem_transition.to_.terminal,
+            1 << stem_transition.to_.morpheme.index,
         )
 
     def __str__(self):
@@ -3584,18 +3842,17 @@ class SearchPath:
 
     def copy(self, surface_node: SurfaceTransition, pa: "set[PhoneticAttribute] | None" = None) -> "SearchPath":
         phonetic_attributes = (
-            calculate_phonetic_attributes(
-                surface_node.surface, tuple(self.phonetic_attributes)
-            )
+            suffix_phonetic_attributes(self.phonetic_attributes, surface_node.surface)
             if pa is None
-            else pa
+            else intern_attributes(pa)
         )
         is_terminal = surface_node.state.terminal
         hist = self.transitions[:]
         hist.append(surface_node)
         new_tail = self.tail[len(surface_node.surface):]
         path = SearchPath(
-            new_tail, surface_node.state, hist, phonetic_attributes.copy(), is_terminal
+            new_tail, surface_node.state, hist, phonetic_attributes, is_terminal,
+            self.morpheme_mask | 1 << surface_node.state.morpheme.index,
         )
         path.contains_suffix_with_surface = (
             self.contains_suffix_with_surface or len(surface_node.surface) > 0
@@ -3605,6 +3862,12 @@ class SearchPath:
         )
         return path
 
+    def copy_for_generation(self, surface_node: SurfaceTransition, pa: "set[PhoneticAttribute] | None" = None) -> "SearchPath":
+        """ Same as `copy`, but keeps the tail: paths walked during generation do not consume an input. """
+        path = self.copy(surface_node, pa)
+        path.tail = self.tail
+        return path
+
     @property
     def stem_transition(self) -> StemTransition:
         return self.transitions[0].lexical_transition
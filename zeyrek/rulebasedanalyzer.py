@@ -1,8 +1,10 @@
-from typing import NamedTuple
+from typing import Callable, Iterable, Iterator, NamedTuple
 
-from zeyrek.attributes import PhoneticAttribute, calculate_phonetic_attributes, RootAttribute, PrimaryPos
+from zeyrek.attributes import PhoneticAttribute, RootAttribute, PrimaryPos, intern_attributes, \
+    suffix_phonetic_attributes
 from zeyrek.lexicon import DictionaryItem
-from zeyrek.morphotactics import SurfaceTransition, SearchPath, generate_surface, nom, pnon, Morpheme, SuffixTransition
+from zeyrek.conditions import morpheme_mask
+from zeyrek.morphotactics import SearchPath, generate_surface, nom, pnon, Morpheme, morphemes
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,10 +20,31 @@ class RuleBasedAnalyzer:
         self.morphotactics = morphotactics
         self.stem_transitions = morphotactics.stem_transitions
 
-    def analyze(self, word):
+    def analyze(self, word, pos: "frozenset[PrimaryPos] | None" = None):
+        """
+        Returns analyses of a normalized word.
+        :param pos: if given, only analyses with these parts of speech are searched and returned.
+        Stems and paths that cannot end with one of them are dropped during the search.
+        """
+
+        # search graph.
+        result_paths = self.search(self.initial_paths(word, pos), pos)
+
+        # generate results from successful paths.
+        result = []
+        for path in result_paths:
+            analysis = parse_analysis(path)
+            if pos is not None and analysis.pos not in pos:
+                continue
+            result.append(analysis)
+        return result
 
+    def initial_paths(self, word, pos: "frozenset[PrimaryPos] | None" = None) -> list[SearchPath]:
         # get stem candidates.
         candidates = self.stem_transitions.prefix_matches(word)
+        if pos is not None:
+            final_pos = self.morphotactics.final_pos
+            candidates = [c for c in candidates if not final_pos(c.to_).isdisjoint(pos)]
 
         # generate initial search paths.
         paths = []
@@ -29,21 +52,49 @@ class RuleBasedAnalyzer:
             length = len(candidate.surface)
             tail = word[length:]
             paths.append(SearchPath.initial(candidate, tail))
-        # search graph.
-        result_paths = self.search(paths)
+        return paths
 
-        # generate results from successful paths.
-        result = []
-        for path in result_paths:
-            analysis = parse_analysis(path)
-            result.append(analysis)
-        return result
+    def query(self, word, predicate: "MorphemeQuery", all_analyses: bool = False) -> bool:
+        """
+        Checks if some analysis of a normalized word satisfies the `predicate`, or all of them if
+        `all_analyses` is True. Search stops as soon as the answer is known, and analyses are not built.
+        A word without analyses satisfies neither.
+        """
+        keep = None
+        if not all_analyses and predicate.function is None:
+            # paths without the morphemes which cannot reach them can only end with analyses not satisfying it.
+            reachable = self.morphotactics.reachable_morphemes
+            mask = predicate.mask
+
+            def keep(p: SearchPath) -> bool:
+                return (p.morpheme_mask | reachable(p.current_state)) & mask != 0
+        found = False
+        for path in self.iter_search(self.initial_paths(word), keep):
+            if predicate.matches_path(path) != all_analyses:
+                return not all_analyses
+            found = True
+        return found and all_analyses
+
+    def search(self, current_paths, pos: "frozenset[PrimaryPos] | None" = None):
+        keep = None
+        if pos is not None:
+            final_pos = self.morphotactics.final_pos
+
+            def keep(p: SearchPath) -> bool:
+                return not final_pos(p.current_state).isdisjoint(pos)
+        return list(self.iter_search(current_paths, keep))
 
-    def search(self, current_paths):
-        # searches through morphotactics graph.
+    def iter_search(
+        self, current_paths, keep: "Callable[[SearchPath], bool] | None" = None
+    ) -> Iterator[SearchPath]:
+        """
+        Searches through morphotactics graph, yields result paths as soon as they are found.
+        :param keep: if given, new paths for which it returns False are dropped.
+        """
         if len(current_paths) > 30:
             current_paths = self.prune_cyclic_paths(current_paths)
-        result = []
+        # paths are formatted for debug messages only if they are going to be logged.
+        debug = logger.isEnabledFor(logging.DEBUG)
         # new Paths are generated with matching transitions.
         while len(current_paths) > 0:
             all_new_paths = []
@@ -56,36 +107,41 @@ class RuleBasedAnalyzer:
                     and PhoneticAttribute.CannotTerminate
                     not in path.phonetic_attributes
                 ):
-                    logger.warning(f"APPENDING RESULT: {path}")
-                    result.append(path)
+                    if debug:
+                        logger.debug("APPENDING RESULT: %s", path)
+                    yield path
                     continue
                 # Creates new paths with outgoing and matching transitions.
-                new_paths = self.advance(path)
-                logger.debug(f"\n--\nNew paths are: ")
-                for p in new_paths:
-                    logger.debug(f"-- {p}")
-                logger.debug('')
+                new_paths = self.advance(path, debug)
+                if keep is not None:
+                    new_paths = [p for p in new_paths if keep(p)]
+                if debug:
+                    logger.debug("\n--\nNew paths are: ")
+                    for p in new_paths:
+                        logger.debug("-- %s", p)
+                    logger.debug('')
                 all_new_paths.extend(new_paths)
             current_paths = all_new_paths
-        return result
 
-    def advance(self, path: SearchPath):
+    def advance(self, path: SearchPath, debug: bool = False):
         """
         for all allowed matching outgoing transitions, new paths are generated.
         Transition `conditions` are used for checking if a `search path`
         is allowed to pass a transition.
         :param path:
+        :param debug: logs rejected and created paths.
         :return:
         """
         new_paths = []
         # for all outgoing transitions.
         # print(f"\n\n ADVANCE {path} for {len(path.current_state.outgoing)} transitions")
-        for transition in path.current_state.outgoing:
-            if not isinstance(transition, SuffixTransition):
-                continue
+        # transitions rejected by the stem are left out, parts of conditions depending only on the stem
+        # are evaluated once per stem.
+        for transition, condition in path.current_state.transitions_for_stem(path.stem_transition):
             # if tail is empty and this transitions surface is not empty, no need to check.
             if len(path.tail) == 0 and transition.has_surface_form:
-                logger.debug(f"Rejecting path {path}: Path and transition surface mismatch: ")
+                if debug:
+                    logger.debug("Rejecting path %s: Path and transition surface mismatch: ", path)
                 continue
 
             surface = generate_surface(
@@ -95,47 +151,41 @@ class RuleBasedAnalyzer:
             # no need to go further if generated surface form is not a prefix of the paths's tail.
             tail_starts_with = path.tail.startswith(surface)
             if not tail_starts_with:
-                logger.debug(f"Rejecting path {path}: tail doesnt start with {path.tail}-{surface}")
+                if debug:
+                    logger.debug("Rejecting path %s: tail doesnt start with %s-%s", path, path.tail, surface)
                 continue
 
             # check conditions.
-            if not transition.can_pass(path):
-                logger.debug(f"Rejecting path {path}-{transition}: can't pass")
+            if condition is not True and not condition.accept(path):
+                if debug:
+                    logger.debug("Rejecting path %s-%s: can't pass", path, transition)
                 continue
 
             # epsilon (empty) transition. Add and continue. Use existing attributes.
             if not transition.has_surface_form:
-                blank_surface_transition = SurfaceTransition("", transition)
-                new_path = path.copy(blank_surface_transition, path.phonetic_attributes)
+                new_path = path.copy(transition.surface_transition(""), path.phonetic_attributes)
                 new_paths.append(new_path)
-                logger.debug(f"Appending path {new_path}")
+                if debug:
+                    logger.debug("Appending path %s", new_path)
                 continue
 
-            surface_transition = SurfaceTransition(surface, transition)
+            surface_transition = transition.surface_transition(surface)
 
             # if tail is equal to surface, no need to calculate phonetic attributes.
             tail_equals_surface = path.tail == surface
-            attributes = path.phonetic_attributes if tail_equals_surface \
-                else calculate_phonetic_attributes(surface, tuple(path.phonetic_attributes))
-
-            # This is required for suffixes like `cik` and `ciğ`
-            # an extra attribute is added if "cik" or "ciğ" is generated and matches the tail.
-            # if "cik" is generated, ExpectsConsonant attribute is added, so only a consonant starting
-            # suffix can follow. Likewise, if "ciğ" is produced, a vowel starting suffix is allowed.
-            if PhoneticAttribute.CannotTerminate in attributes:
-                attributes.discard(PhoneticAttribute.CannotTerminate)
-            last_token = transition.last_template_token
-            if last_token.type_ == 'LAST_VOICED':
-                attributes.add(PhoneticAttribute.ExpectsConsonant)
-            elif last_token.type_ == 'LAST_NOT_VOICED':
-                attributes.add(PhoneticAttribute.ExpectsVowel)
-                attributes.add(PhoneticAttribute.CannotTerminate)
+            attributes = next_phonetic_attributes(
+                path.phonetic_attributes,
+                None if tail_equals_surface else surface,
+                transition.last_template_token.type_
+            )
             p = path.copy(surface_transition, attributes)
-            logger.debug(f"P path: {p}")
+            if debug:
+                logger.debug("P path: %s", p)
             new_paths.append(p)
-        logger.debug(f"FINAL: ")
-        for i, p in enumerate(new_paths):
-            logger.debug(f"\t {i}: {p}")
+        if debug:
+            logger.debug("FINAL: ")
+            for i, p in enumerate(new_paths):
+                logger.debug("\t %s: %s", i, p)
         # print()
         return new_paths
 
@@ -159,6 +209,75 @@ class RuleBasedAnalyzer:
         return result
 
 
+class MorphemeQuery:
+    """
+    Predicate on morphemes of an analysis, used by `RuleBasedAnalyzer.query`.
+
+        >>> MorphemeQuery('Abl')  # contains the ablative morpheme
+        >>> MorphemeQuery(['Neg', 'Without'])  # contains any of the morphemes
+        >>> MorphemeQuery(lambda morphemes: morphemes[-1].id_ == 'A3pl')  # any function of the morphemes
+
+    As in analyses, `Nom` and `Pnon` morphemes are left out.
+    """
+
+    def __init__(self, predicate: "str | Iterable[str] | Callable[[list[Morpheme]], bool]"):
+        self.function = None
+        self.mask = 0
+        if callable(predicate):
+            self.function = predicate
+        else:
+            ids = [predicate] if isinstance(predicate, str) else predicate
+            unknown = [id_ for id_ in ids if id_ not in morphemes]
+            if unknown:
+                raise ValueError(f"Unknown morphemes {unknown}")
+            self.mask = morpheme_mask(morphemes[id_] for id_ in ids if id_ not in (nom.id_, pnon.id_))
+
+    def matches_path(self, path: SearchPath) -> bool:
+        if self.function is None:
+            return path.morpheme_mask & self.mask != 0
+        return self.function([t.morpheme for t in path.transitions if t.morpheme not in (nom, pnon)])
+
+    def matches_analysis(self, analysis: "SingleAnalysis") -> bool:
+        if self.function is None:
+            return morpheme_mask(m for m, _ in analysis.morphemes) & self.mask != 0
+        return self.function([m for m, _ in analysis.morphemes])
+
+
+# (path attributes, appended surface or None, last template token type) -> attributes of the new path.
+_next_attributes: dict[tuple, frozenset[PhoneticAttribute]] = {}
+
+
+def next_phonetic_attributes(
+    attributes: frozenset[PhoneticAttribute],
+    surface: "str | None",
+    last_token_type: str
+) -> frozenset[PhoneticAttribute]:
+    """
+    Returns phonetic attributes of a path after a suffix transition with a surface is passed.
+    :param attributes: interned attributes of the path before the transition
+    :param surface: generated surface of the transition, or None if attributes should not be recalculated.
+    :param last_token_type: type of the last token of the transition's surface template
+    """
+    key = (attributes, surface, last_token_type)
+    result = _next_attributes.get(key)
+    if result is not None:
+        return result
+    new_attributes = set(attributes) if surface is None else set(suffix_phonetic_attributes(attributes, surface))
+    # This is required for suffixes like `cik` and `ciğ`
+    # an extra attribute is added if "cik" or "ciğ" is generated and matches the tail.
+    # if "cik" is generated, ExpectsConsonant attribute is added, so only a consonant starting
+    # suffix can follow. Likewise, if "ciğ" is produced, a vowel starting suffix is allowed.
+    new_attributes.discard(PhoneticAttribute.CannotTerminate)
+    if last_token_type == 'LAST_VOICED':
+        new_attributes.add(PhoneticAttribute.ExpectsConsonant)
+    elif last_token_type == 'LAST_NOT_VOICED':
+        new_attributes.add(PhoneticAttribute.ExpectsVowel)
+        new_attributes.add(PhoneticAttribute.CannotTerminate)
+    result = intern_attributes(new_attributes)
+    _next_attributes[key] = result
+    return result
+
+
 # Single Analysis contains more information about the word analysis that is not necessary for API:
 class SingleAnalysis(NamedTuple):
     dict_item: DictionaryItem
@@ -183,11 +302,8 @@ def parse_analysis(search_path: SearchPath) -> SingleAnalysis:
     - group_boundaries: groupBoundaries holds the index values of morphemes that start inflection groups.
     """
     morphemes = []
-    derivation_count = 0
 
     for transition in search_path.transitions:
-        if transition.is_derivative:
-            derivation_count += 1
         morpheme: Morpheme = transition.morpheme
         # we skip these two morphemes as they create visual noise and does not carry much information.
         if morpheme in [nom, pnon]:
@@ -198,6 +314,23 @@ def parse_analysis(search_path: SearchPath) -> SingleAnalysis:
             continue
         morpheme_data = (morpheme, transition.surface)
         morphemes.append(morpheme_data)
+    dict_item = search_path.dict_item
+    # if dictionary item is `Dummy`, use the referenced item.
+    # `Dummy` items are usually generated for some compound words. For example for `zeytinyağı`
+    # a DictionaryItem is generated with root "zeytinyağ". But here we switch to the original.
+    if search_path.dict_item.has_attribute(RootAttribute.Dummy):
+        dict_item = search_path.dict_item.ref_item
+    return build_analysis(dict_item, morphemes)
+
+
+def build_analysis(dict_item: DictionaryItem, morphemes: list[tuple[Morpheme, str]]) -> SingleAnalysis:
+    """
+    Creates a SingleAnalysis from a dictionary item and its morphemes with their surfaces.
+    Group boundaries, suffix ending and part of speech are calculated from the morphemes.
+    :param dict_item: Dictionary Item of the analysis (already resolved for `Dummy` items)
+    :param morphemes: list of Morphemes and their surface forms, starting with the root
+    """
+    derivation_count = sum(1 for m in morphemes if m[0].derivational)
     group_boundaries = [
         0 for _ in range(derivation_count + 1)
     ]  # we assume there is always an IG
@@ -207,12 +340,6 @@ def parse_analysis(search_path: SearchPath) -> SingleAnalysis:
         if mdata[0].derivational:
             group_boundaries[derivation_counter] = morpheme_counter
             derivation_counter += 1
-    dict_item = search_path.dict_item
-    # if dictionary item is `Dummy`, use the referenced item.
-    # `Dummy` items are usually generated for some compound words. For example for `zeytinyağı`
-    # a DictionaryItem is generated with root "zeytinyağ". But here we switch to the original.
-    if search_path.dict_item.has_attribute(RootAttribute.Dummy):
-        dict_item = search_path.dict_item.ref_item
     ending = ''.join([_[1] for _ in morphemes[1:]]) if len(morphemes) > 1 else ''
     pos = 'Unknown'
     for m in morphemes[group_boundaries[-1]:]:
@@ -0,0 +1,239 @@
+"""
+Precompiled analyses for a known vocabulary.
+
+Most of the analyzed text comes from a limited vocabulary. Analyses of these words can be calculated
+once, with :func:`compile_vocabulary`, and stored in a memory-mapped file. :class:`AnalysisTable`
+reads such a file without loading it into memory, so it can be shared by many processes.
+``MorphAnalyzer`` consults the table before searching the morphotactics graph.
+"""
+import json
+import mmap
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+from zeyrek import __version__
+from zeyrek.lexicon import RootLexicon
+from zeyrek.morphotactics import morphemes as morpheme_registry
+from zeyrek.rulebasedanalyzer import SingleAnalysis, build_analysis
+
+DEFAULT_VOCABULARY = RootLexicon.RESOURCES_DIR / "tr" / "first-10K"
+
+# Separators used in serialized analyses. They never appear in dictionary ids or surfaces.
+ANALYSIS_SEPARATOR = "\x1e"
+FIELD_SEPARATOR = "\x1f"
+
+
+def encode_analyses(analyses: list[SingleAnalysis]) -> bytes:
+    """
+    Serializes analyses of a word: dictionary item id, followed by morpheme ids and their surfaces.
+    Group boundaries, ending and part of speech are not stored, they are recalculated on decoding.
+    """
+    encoded = []
+    for analysis in analyses:
+        fields = [analysis.dict_item.id_]
+        for morpheme, surface in analysis.morphemes:
+            fields.append(morpheme.id_)
+            fields.append(surface)
+        encoded.append(FIELD_SEPARATOR.join(fields))
+    return ANALYSIS_SEPARATOR.join(encoded).encode('utf8')
+
+
+def decode_analyses(data: bytes, lexicon: RootLexicon) -> list[SingleAnalysis]:
+    """
+    Restores analyses serialized with :func:`encode_analyses`. Dictionary items are taken from the `lexicon`.
+    """
+    if len(data) == 0:
+        return []
+    result = []
+    for encoded in data.decode('utf8').split(ANALYSIS_SEPARATOR):
+        fields = encoded.split(FIELD_SEPARATOR)
+        dict_item = lexicon.get_item_by_id(fields[0])
+        if dict_item is None:
+            raise KeyError(f"Dictionary item {fields[0]} of stored analysis is not in lexicon")
+        morphemes = [
+            (morpheme_registry[fields[i]], fields[i + 1]) for i in range(1, len(fields), 2)
+        ]
+        result.append(build_analysis(dict_item, morphemes))
+    return result
+
+
+class MappedTable:
+    """
+    Read-only string to bytes mapping stored in a memory-mapped file.
+
+    File layout: magic bytes, JSON metadata with its length, entry count, offsets of entries and
+    the entries themselves, sorted by key. Each entry is key length, value length, key and value.
+    Lookup is a binary search over the offsets, so only the touched pages are read from disk.
+    """
+    MAGIC = b"ZYRKTBL1"
+    _length = struct.Struct("<I")
+    _entry_header = struct.Struct("<II")
+
+    def __init__(self, path: "str | Path"):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(self.MAGIC)] != self.MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a zeyrek table file")
+        position = len(self.MAGIC)
+        (metadata_length,) = self._length.unpack_from(self._mmap, position)
+        position += self._length.size
+        self.metadata: dict = json.loads(self._mmap[position:position + metadata_length].decode('utf8'))
+        position += metadata_length
+        (self._count,) = self._length.unpack_from(self._mmap, position)
+        position += self._length.size
+        offsets_end = position + 8 * self._count
+        self._offsets = memoryview(self._mmap)[position:offsets_end].cast('Q')
+
+    @classmethod
+    def write(cls, path: "str | Path", entries: "dict[str, bytes]", metadata: "dict | None" = None):
+        """ Writes `entries` to a table file at `path`. """
+        encoded = sorted((key.encode('utf8'), value) for key, value in entries.items())
+        metadata_bytes = json.dumps(metadata or {}).encode('utf8')
+        header_length = len(cls.MAGIC) + 2 * cls._length.size + len(metadata_bytes) + 8 * len(encoded)
+        offsets = []
+        position = header_length
+        for key, value in encoded:
+            offsets.append(position)
+            position += cls._entry_header.size + len(key) + len(value)
+        with open(path, 'wb') as f:
+            f.write(cls.MAGIC)
+            f.write(cls._length.pack(len(metadata_bytes)))
+            f.write(metadata_bytes)
+            f.write(cls._length.pack(len(encoded)))
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            for key, value in encoded:
+                f.write(cls._entry_header.pack(len(key), len(value)))
+                f.write(key)
+                f.write(value)
+
+    def _key_at(self, index: int) -> bytes:
+        offset = self._offsets[index]
+        key_length, _ = self._entry_header.unpack_from(self._mmap, offset)
+        start = offset + self._entry_header.size
+        return self._mmap[start:start + key_length]
+
+    def get_bytes(self, key: str) -> "bytes | None":
+        """ Returns stored value of the `key`, or None if the key is not in table. """
+        target = key.encode('utf8')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._count:
+            return None
+        offset = self._offsets[low]
+        key_length, value_length = self._entry_header.unpack_from(self._mmap, offset)
+        start = offset + self._entry_header.size
+        if self._mmap[start:start + key_length] != target:
+            return None
+        start += key_length
+        return self._mmap[start:start + value_length]
+
+    def keys(self) -> Iterable[str]:
+        for index in range(self._count):
+            yield self._key_at(index).decode('utf8')
+
+    def __contains__(self, key: str) -> bool:
+        return self.get_bytes(key) is not None
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._offsets.release()
+        self._mmap.close()
+
+
+class AnalysisTable(MappedTable):
+    """
+    Table of precompiled analyses, keyed by normalized word.
+    A table can only be used with the lexicon and zeyrek version it was compiled with, this is checked using
+    lexicon fingerprint and version stored in the table metadata.
+    """
+
+    def check_lexicon(self, lexicon: RootLexicon):
+        if self.metadata.get('kind') != 'analyses':
+            raise ValueError(f"{self.path} does not contain analyses")
+        if self.metadata.get('fingerprint') != lexicon.fingerprint:
+            raise ValueError(f"Analysis table {self.path} was compiled with a different lexicon")
+        if self.metadata.get('version') != __version__:
+            raise ValueError(f"Analysis table {self.path} was compiled with zeyrek {self.metadata.get('version')}")
+
+    def get(self, word: str, lexicon: RootLexicon) -> "list[SingleAnalysis] | None":
+        """
+        Returns analyses of a normalized `word`, or None if the word is not in table.
+        An empty list means that the word was compiled, but has no analyses.
+        """
+        data = self.get_bytes(word)
+        if data is None:
+            return None
+        return decode_analyses(data, lexicon)
+
+
+_worker_analyzer = None
+
+
+def _init_worker(dictionaries: list[str]):
+    global _worker_analyzer
+    from zeyrek.morphology import MorphAnalyzer
+    _worker_analyzer = MorphAnalyzer()
+    for dictionary in dictionaries:
+        _worker_analyzer.add_dictionary(dictionary)
+
+
+def _analyze_chunk(words: list[str]) -> tuple[str, dict[str, bytes]]:
+    return (
+        _worker_analyzer.lexicon.fingerprint,
+        {word: encode_analyses(_worker_analyzer.analyzer.analyze(word)) for word in words}
+    )
+
+
+def compile_vocabulary(
+    words: Iterable[str],
+    path: "str | Path",
+    dictionaries: Iterable[str] = (),
+    processes: "int | None" = None,
+    analyzer: "MorphAnalyzer | None" = None,
+    chunk_size: int = 500,
+) -> int:
+    """
+    Analyzes `words` and writes the analyses to an :class:`AnalysisTable` file at `path`.
+
+    By default, words are analyzed in a pool of `processes` workers, each of them creating a default
+    ``MorphAnalyzer`` and adding `dictionaries` to it. If an `analyzer` is given, it is used for
+    analyzing all words in the current process instead, `dictionaries` are added to an overlay of it,
+    so the given analyzer is not modified.
+    :return: number of words in the table
+    """
+    from zeyrek.morphology import _normalize
+    unique_words = sorted({_normalize(w.strip()) for w in words if w.strip()})
+    dictionaries = [str(d) for d in dictionaries]
+    entries: dict[str, bytes] = {}
+    if analyzer is not None:
+        if dictionaries:
+            analyzer = analyzer.overlay()
+        for dictionary in dictionaries:
+            analyzer.add_dictionary(dictionary)
+        fingerprint = analyzer.lexicon.fingerprint
+        for word in unique_words:
+            entries[word] = encode_analyses(analyzer.analyzer.analyze(word))
+    else:
+        chunks = [unique_words[i:i + chunk_size] for i in range(0, len(unique_words), chunk_size)]
+        fingerprints = set()
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(dictionaries,)) as executor:
+            for chunk_fingerprint, chunk_entries in executor.map(_analyze_chunk, chunks):
+                fingerprints.add(chunk_fingerprint)
+                entries.update(chunk_entries)
+        if len(fingerprints) > 1:
+            raise RuntimeError("Worker processes created analyzers with different lexicons")
+        fingerprint = fingerprints.pop() if fingerprints else None
+    metadata = {'kind': 'analyses', 'fingerprint': fingerprint, 'version': __version__}
+    AnalysisTable.write(path, entries, metadata)
+    return len(entries)